@@ -0,0 +1,185 @@
+# benchmarks/bench.py
+"""
+Benchmark offline degli scraper sulle fixture registrate con benchmarks/recorder.py.
+
+Esempi:
+    python -m benchmarks.bench clickar                              # fixture in benchmarks/fixtures/clickar
+    python -m benchmarks.bench clickar --latency 0 100 300 --max-pages 5 --repeat 3
+
+Per ogni combinazione di latenza e pagine misura tempo di login, pagine/min, righe/s e comandi
+WebDriver per riga; i risultati sono accodati in benchmarks/results/<portale>.jsonl per confrontare
+le modifiche (es. attese, blocco risorse, modalità HTTP) su dati identici.
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Sessioni, statistiche e diagnostiche dei benchmark non toccano quelle reali
+os.environ.setdefault('CARBIT_DATA_DIR', tempfile.mkdtemp(prefix='carbit-bench-'))
+os.environ.setdefault('CARBIT_DIAGNOSTICS', 'off')
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def portal_keys() -> List[str]:
+    """Chiavi dei portali registrati (nomi delle directory delle fixture)"""
+    from scrapers.registry import get_plugin, portal_names
+    return sorted(get_plugin(name)['key'] for name in portal_names(enabled_only=False))
+
+
+class CommandCounter:
+    """Conta i comandi inviati a ChromeDriver (ogni comando è un round-trip)"""
+
+    def __init__(self):
+        self.count = 0
+        self._original = None
+
+    def __enter__(self) -> 'CommandCounter':
+        from selenium.webdriver.remote.webdriver import WebDriver
+        self._original = WebDriver.execute
+        counter = self
+
+        def counting_execute(driver, driver_command, params=None):
+            counter.count += 1
+            return counter._original(driver, driver_command, params)
+
+        WebDriver.execute = counting_execute
+        return self
+
+    def __exit__(self, *exc) -> None:
+        from selenium.webdriver.remote.webdriver import WebDriver
+        WebDriver.execute = self._original
+
+
+def run_benchmark(portal: str, fixtures: str, latency_ms: int = 0, max_pages: int = None,
+                  headless: bool = True, http_mode: bool = None) -> Dict:
+    """
+    Esegue uno scraper contro il server di replay
+    Args:
+        portal: Chiave del portale (es. 'clickar')
+        fixtures: Directory delle fixture registrate
+        latency_ms: Latenza aggiunta a ogni risposta
+        max_pages: Pagine di risultati esposte dal server
+        headless: Esegue Chromium senza interfaccia
+        http_mode: Forza la modalità HTTP (None = default dello scraper)
+    Returns:
+        Dict: Metriche del run
+    """
+    from benchmarks.replay_server import ReplayServer
+    from scrapers.events import EventBus, EventSink
+    from scrapers.registry import load_scraper_class
+
+    server = ReplayServer(fixtures, latency_ms, max_pages).start()
+
+    # Pagine lette: il massimo 'current' degli avanzamenti pubblicati dallo scraper
+    class PageSink(EventSink):
+        pages = 0
+
+        def write(self, events):
+            for event in events:
+                if event.kind == 'progress' and event.data.get('phase') in ('pages', 'auctions'):
+                    PageSink.pages = max(PageSink.pages, event.data.get('current') or 0)
+
+    bus = EventBus.get_instance()
+    page_sink = PageSink()
+    bus.subscribe(page_sink)
+
+    scraper = load_scraper_class(portal)(
+        headless=headless, use_pool=False, http_mode=http_mode,
+        base_url=server.base_url_for(server.index['base_url'])
+    )
+    scraper.restore_session = lambda account: False
+
+    timings = {'login': 0.0}
+    original_login = scraper.login
+
+    def timed_login(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_login(*args, **kwargs)
+        finally:
+            timings['login'] += time.perf_counter() - start
+    scraper.login = timed_login
+
+    rows = 0
+    error = None
+    start = time.perf_counter()
+    try:
+        with CommandCounter() as commands:
+            for batch in scraper.iter_vehicles('bench', 'bench'):
+                rows += len(batch)
+    except Exception as e:
+        error = str(e)
+    finally:
+        elapsed = time.perf_counter() - start
+        bus.unsubscribe(page_sink)
+        server.stop()
+
+    scraping = max(elapsed - timings['login'], 1e-6)
+    return {
+        'portal': portal,
+        'ts': time.time(),
+        'latency_ms': latency_ms,
+        'max_pages': max_pages,
+        'http_mode': http_mode,
+        'elapsed': round(elapsed, 2),
+        'login_time': round(timings['login'], 2),
+        'pages': PageSink.pages,
+        'rows': rows,
+        'pages_per_min': round(PageSink.pages / scraping * 60, 1),
+        'rows_per_sec': round(rows / scraping, 2),
+        'commands': commands.count,
+        'commands_per_row': round(commands.count / rows, 1) if rows else None,
+        'requests': server.stats['requests'],
+        'misses': server.stats['misses'],
+        'error': error
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline degli scraper")
+    parser.add_argument('portal', choices=portal_keys())
+    parser.add_argument('--fixtures', help="Directory delle fixture (default benchmarks/fixtures/<portale>)")
+    parser.add_argument('--latency', type=int, nargs='+', default=[0], help="Latenze in ms da provare")
+    parser.add_argument('--max-pages', type=int, nargs='+', default=[None], help="Pagine esposte da provare")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--http-mode', choices=('on', 'off'), help="Forza la modalità HTTP dello scraper")
+    parser.add_argument('--show-browser', action='store_true')
+    parser.add_argument('--out', help="File JSONL dei risultati (default benchmarks/results/<portale>.jsonl)")
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or os.path.join(BENCH_DIR, 'fixtures', args.portal)
+    if not os.path.exists(os.path.join(fixtures, 'index.json')):
+        print(f"Fixture non trovate in {fixtures}: registrarle con python -m benchmarks.recorder {args.portal}")
+        return 1
+    http_mode = None if args.http_mode is None else args.http_mode == 'on'
+    out = args.out or os.path.join(BENCH_DIR, 'results', f"{args.portal}.jsonl")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+
+    results: List[Dict] = []
+    for latency in args.latency:
+        for max_pages in args.max_pages:
+            for _ in range(args.repeat):
+                result = run_benchmark(args.portal, fixtures, latency, max_pages,
+                                       headless=not args.show_browser, http_mode=http_mode)
+                results.append(result)
+                with open(out, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(result) + '\n')
+                print(
+                    f"latenza {latency}ms, pagine {max_pages or 'tutte'}: "
+                    f"login {result['login_time']}s, {result['pages_per_min']} pagine/min, "
+                    f"{result['rows_per_sec']} righe/s, {result['commands_per_row']} comandi/riga"
+                    + (f", {result['misses']} richieste non registrate" if result['misses'] else '')
+                    + (f" ❌ {result['error']}" if result['error'] else '')
+                )
+
+    print(f"Risultati in {out}")
+    return 0 if all(not result['error'] for result in results) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# benchmarks/cold_start.py
+"""
+Benchmark dell'avvio a freddo dell'app: primo render di main.py (Dashboard) in un processo nuovo.
+
+Esempi:
+    python -m benchmarks.cold_start                     # 5 render, mediana e moduli pesanti caricati
+    python -m benchmarks.cold_start --repeat 10 --importtime
+
+Ogni render gira in un interprete separato (cache dei moduli vuota) con streamlit.testing.AppTest;
+i risultati sono accodati in benchmarks/results/cold_start.jsonl insieme al commit corrente,
+per confrontare l'avvio prima e dopo una modifica degli import.
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Moduli il cui caricamento pesa sull'avvio: al primo render della Dashboard non dovrebbero servire
+HEAVY_MODULES = ['selenium', 'firebase_admin', 'google.cloud.firestore', 'pandas', 'PyPDF2', 'lxml', 'requests']
+
+# Moduli dell'app di cui misurare il costo di import con -X importtime
+IMPORT_MODULES = ['scrapers.registry', 'scrapers.portals.clickar', 'scrapers.portals.ayvens',
+                  'utils.firebase_manager', 'scrapers.pipeline', 'pandas']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+loaded = time.perf_counter()
+app = AppTest.from_file({script!r}, default_timeout={timeout})
+app.run()
+done = time.perf_counter()
+print(json.dumps({{
+    'streamlit_import': loaded - start,
+    'first_render': done - loaded,
+    'total': done - start,
+    'exceptions': [str(e.value) for e in app.exception],
+    'modules': [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+
+def run_probe(script: str, timeout: float) -> Dict:
+    """Primo render dello script in un interprete nuovo"""
+    env = dict(os.environ)
+    # Sessioni e diagnostiche del benchmark non toccano quelle reali
+    env.setdefault('CARBIT_DATA_DIR', tempfile.mkdtemp(prefix='carbit-cold-'))
+    env.setdefault('CARBIT_DIAGNOSTICS', 'off')
+    code = PROBE.format(script=script, timeout=timeout, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, env=env,
+                          capture_output=True, text=True, timeout=timeout + 60)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'probe fallito')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def import_time(module: str) -> float:
+    """
+    Secondi di import del modulo (cumulativi, dipendenze comprese) in un interprete nuovo
+    secondo -X importtime
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                          cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return -1.0
+    for line in reversed(proc.stderr.splitlines()):
+        # Formato: "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1_000_000
+    return -1.0
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dell'avvio a freddo dell'app")
+    parser.add_argument('--script', default='main.py', help="Script Streamlit da renderizzare")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60, help="Secondi massimi per il render")
+    parser.add_argument('--importtime', action='store_true', help="Misura anche l'import dei moduli dell'app")
+    parser.add_argument('--out', help="File JSONL dei risultati (default benchmarks/results/cold_start.jsonl)")
+    args = parser.parse_args()
+
+    runs: List[Dict] = []
+    for i in range(args.repeat):
+        try:
+            run = run_probe(args.script, args.timeout)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"Render {i + 1}: ❌ {str(e)}")
+            return 2
+        runs.append(run)
+        print(f"Render {i + 1}: {run['total']:.2f}s (primo render {run['first_render']:.2f}s)"
+              + (f" ⚠️ {run['exceptions'][0]}" if run['exceptions'] else ''))
+
+    result = {
+        'timestamp': time.time(),
+        'revision': git_revision(),
+        'script': args.script,
+        'repeat': args.repeat,
+        'median_total': round(statistics.median(run['total'] for run in runs), 3),
+        'median_first_render': round(statistics.median(run['first_render'] for run in runs), 3),
+        'min_total': round(min(run['total'] for run in runs), 3),
+        'heavy_modules': runs[-1]['modules']
+    }
+    if args.importtime:
+        result['import_times'] = {module: round(import_time(module), 3) for module in IMPORT_MODULES}
+
+    print(f"Mediana: {result['median_total']}s totali, {result['median_first_render']}s primo render")
+    print(f"Moduli pesanti caricati: {', '.join(result['heavy_modules']) or 'nessuno'}")
+    for module, seconds in result.get('import_times', {}).items():
+        print(f"  import {module}: " + (f"{seconds:.3f}s" if seconds >= 0 else "non disponibile"))
+
+    out = args.out or os.path.join(BENCH_DIR, 'results', 'cold_start.jsonl')
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result) + '\n')
+    print(f"Risultati in {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# benchmarks/recorder.py
+"""
+Registra le risposte HTML e XHR di una sessione reale di un portale, per il replay offline.
+
+Esempio:
+    python -m benchmarks.recorder clickar --out benchmarks/fixtures/clickar
+
+Le credenziali arrivano da config/credentials.py. Le fixture possono contenere dati personali
+e token di sessione: non vanno versionate (benchmarks/fixtures/ è in .gitignore).
+"""
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+
+# Tipi di risorsa registrati: pagine, frame e chiamate AJAX
+RECORDED_TYPES = ('Document', 'XHR', 'Fetch')
+
+
+def request_key(method: str, url: str, post_data: Optional[str] = None) -> str:
+    """
+    Chiave di una richiesta registrata: metodo, host, path e query, hash del corpo POST
+    (il corpo non viene salvato: può contenere le credenziali)
+    """
+    parts = urlsplit(url)
+    target = parts.path or '/'
+    if parts.query:
+        target += f"?{parts.query}"
+    key = f"{method.upper()} {parts.netloc}{target}"
+    if post_data:
+        key += f" #{hashlib.sha1(post_data.encode('utf-8')).hexdigest()[:12]}"
+    return key
+
+
+class SessionRecorder:
+    """Ascolta gli eventi DevTools letti da WaitEngine e salva i corpi delle risposte"""
+
+    def __init__(self, scraper, directory: str):
+        self.scraper = scraper
+        self.directory = directory
+        self.entries = []
+        self._requests: Dict[str, Dict] = {}
+        os.makedirs(os.path.join(directory, 'bodies'), exist_ok=True)
+
+    def attach(self) -> None:
+        """Collega il registratore al driver dello scraper (dopo setup_driver)"""
+        self.scraper.waits.listeners.append(self.on_message)
+        driver = self.scraper.driver
+        original_get = driver.get
+
+        # Prima di ogni navigazione si leggono i corpi della pagina corrente, ancora in memoria
+        def recording_get(url):
+            self.drain()
+            original_get(url)
+            self.drain()
+        driver.get = recording_get
+
+    def drain(self) -> None:
+        try:
+            self.scraper.waits.drain_network()
+        except Exception as e:
+            print(f"Errore lettura eventi: {str(e)}")
+
+    def on_message(self, message: Dict) -> None:
+        method = message.get('method')
+        params = message.get('params', {})
+        request_id = params.get('requestId')
+
+        if method == 'Network.requestWillBeSent':
+            redirect = params.get('redirectResponse')
+            if redirect and request_id in self._requests:
+                # Redirect: registrato come risposta con Location verso la nuova URL
+                previous = self._requests[request_id]
+                self._add_entry(previous, redirect.get('status', 302), redirect.get('mimeType', ''),
+                                None, location=params['request']['url'])
+            self._requests[request_id] = {
+                'method': params['request'].get('method', 'GET'),
+                'url': params['request']['url'],
+                'post_data': params['request'].get('postData'),
+                'type': params.get('type')
+            }
+        elif method == 'Network.responseReceived':
+            request = self._requests.get(request_id)
+            if request:
+                request['type'] = params.get('type') or request['type']
+                request['status'] = params['response'].get('status', 200)
+                request['mime'] = params['response'].get('mimeType', '')
+        elif method == 'Network.loadingFinished':
+            request = self._requests.pop(request_id, None)
+            if not request or request.get('type') not in RECORDED_TYPES or 'status' not in request:
+                return
+            try:
+                body = self.scraper.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception:
+                # Corpo già rilasciato dal browser
+                return
+            content = base64.b64decode(body['body']) if body.get('base64Encoded') else body['body'].encode('utf-8')
+            self._add_entry(request, request['status'], request['mime'], content)
+
+    def _add_entry(self, request: Dict, status: int, mime: str, content: Optional[bytes],
+                   location: str = None) -> None:
+        filename = None
+        if content is not None:
+            filename = f"{len(self.entries):05d}.body"
+            with open(os.path.join(self.directory, 'bodies', filename), 'wb') as f:
+                f.write(content)
+        self.entries.append({
+            'key': request_key(request['method'], request['url'], request.get('post_data')),
+            'url': request['url'],
+            'method': request['method'],
+            'status': status,
+            'mime': mime,
+            'file': filename,
+            'location': location
+        })
+
+    def save(self, portal: str, base_url: str) -> str:
+        """Scrive l'indice delle risposte registrate"""
+        path = os.path.join(self.directory, 'index.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'portal': portal,
+                'base_url': base_url,
+                'hosts': sorted({urlsplit(entry['url']).netloc for entry in self.entries}),
+                'entries': self.entries
+            }, f, indent=1)
+        return path
+
+
+def main() -> int:
+    from benchmarks.bench import portal_keys
+    from scrapers.registry import load_scraper_class
+    from config.credentials import get_portal_credentials
+
+    parser = argparse.ArgumentParser(description="Registra una sessione reale per il replay offline")
+    parser.add_argument('portal', choices=portal_keys())
+    parser.add_argument('--out', help="Directory delle fixture (default benchmarks/fixtures/<portale>)")
+    parser.add_argument('--show-browser', action='store_true')
+    args = parser.parse_args()
+
+    credentials = get_portal_credentials(args.portal)
+    if not credentials:
+        print(f"Credenziali {args.portal} non configurate")
+        return 1
+
+    directory = args.out or os.path.join(os.path.dirname(__file__), 'fixtures', args.portal)
+    # Tutto passa dal browser, senza pool e senza sessioni salvate: ogni risposta viene registrata
+    scraper = load_scraper_class(args.portal)(headless=not args.show_browser, use_pool=False, http_mode=False)
+    scraper.restore_session = lambda account: False
+    if not scraper.setup_driver():
+        return 1
+
+    recorder = SessionRecorder(scraper, directory)
+    recorder.attach()
+    vehicles = 0
+    for batch in scraper.iter_vehicles(credentials.username, credentials.password):
+        vehicles += len(batch)
+        recorder.drain()
+
+    path = recorder.save(args.portal, scraper.base_url)
+    print(f"Registrate {len(recorder.entries)} risposte ({vehicles} veicoli) in {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
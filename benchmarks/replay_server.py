@@ -0,0 +1,197 @@
+# benchmarks/replay_server.py
+"""
+Server locale che ripropone le risposte registrate da benchmarks/recorder.py.
+
+Esempio:
+    python -m benchmarks.replay_server benchmarks/fixtures/clickar --latency 80 --max-pages 5
+
+Le URL assolute dei portali nelle risposte vengono riscritte verso il server: l'host principale
+è servito alla radice, gli altri host (es. il frame di login) sotto /__host__/<host>/.
+"""
+from benchmarks.recorder import request_key
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import argparse
+import json
+import os
+import re
+import threading
+import time
+
+HOST_PREFIX = '/__host__/'
+
+# Link di paginazione dei portali: rimossi oltre max_pages
+PAGINATION_RE = re.compile(
+    rb'<(a|span)\b[^>]*class="[^"]*\b(?:pageNumber|page-item)\b[^"]*"[^>]*>\s*(\d+)\s*</\1>',
+    re.IGNORECASE
+)
+TEXT_MIME_MARKERS = ('html', 'xml', 'json', 'javascript', 'text')
+
+
+class ReplayServer:
+    """Serve le fixture di un portale con latenza e numero di pagine configurabili"""
+
+    def __init__(self, directory: str, latency_ms: int = 0, max_pages: int = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            directory: Directory con index.json e bodies/ prodotti dal recorder
+            latency_ms: Ritardo aggiunto a ogni risposta
+            max_pages: Pagine di risultati esposte (None = tutte quelle registrate)
+            host: Interfaccia di ascolto
+            port: Porta (0 = libera)
+        """
+        self.directory = directory
+        self.latency = latency_ms / 1000
+        self.max_pages = max_pages
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+
+        self.primary_host = urlsplit(self.index['base_url']).netloc
+        self.responses: Dict[str, List[Dict]] = {}
+        for entry in self.index['entries']:
+            for key in self._lookup_keys(entry['key']):
+                self.responses.setdefault(key, []).append(entry)
+        self.stats = {'requests': 0, 'misses': 0}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_url_for(self, original_url: str) -> str:
+        """URL locale corrispondente a una URL del portale registrato (es. il base_url dello scraper)"""
+        return self._rewrite_url(original_url)
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='replay', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @staticmethod
+    def _lookup_keys(key: str) -> List[str]:
+        """Chiave esatta e ripieghi: senza hash del corpo e senza query string"""
+        keys = [key]
+        without_body = key.split(' #')[0]
+        if without_body != key:
+            keys.append(without_body)
+        without_query = without_body.split('?')[0]
+        if without_query != without_body:
+            keys.append(without_query)
+        return keys
+
+    def _rewrite_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += f"?{parts.query}"
+        if parts.netloc == self.primary_host:
+            return f"{self.url}{path}"
+        return f"{self.url}{HOST_PREFIX}{parts.netloc}{path}"
+
+    def _rewrite_body(self, content: bytes) -> bytes:
+        """Riscrive verso il server le URL assolute di tutti gli host registrati"""
+        for host in self.index['hosts']:
+            local = (self.url if host == self.primary_host else f"{self.url}{HOST_PREFIX}{host}").encode()
+            for scheme in (b'https://', b'http://'):
+                content = content.replace(scheme + host.encode(), local)
+            content = content.replace(b'//' + host.encode(), local.split(b':', 1)[1])
+        if self.max_pages:
+            content = PAGINATION_RE.sub(
+                lambda match: match.group(0) if int(match.group(2)) <= self.max_pages else b'',
+                content
+            )
+        return content
+
+    def resolve(self, method: str, path: str, body: Optional[bytes]) -> Optional[Dict]:
+        """Trova la risposta registrata per una richiesta locale; richieste ripetute ciclano tra le registrazioni"""
+        host = self.primary_host
+        if path.startswith(HOST_PREFIX):
+            host, _, rest = path[len(HOST_PREFIX):].partition('/')
+            path = f"/{rest}"
+        url = f"https://{host}{path}"
+        post_data = body.decode('utf-8', 'replace') if body else None
+
+        for key in self._lookup_keys(request_key(method, url, post_data)):
+            entries = self.responses.get(key)
+            if entries:
+                with self._lock:
+                    served = self._served.get(key, 0)
+                    self._served[key] = served + 1
+                return entries[served % len(entries)]
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                if server.latency:
+                    time.sleep(server.latency)
+
+                entry = server.resolve(self.command, self.path, body)
+                with server._lock:
+                    server.stats['requests'] += 1
+                    if entry is None:
+                        server.stats['misses'] += 1
+                if entry is None:
+                    self.send_error(404, "Risposta non registrata")
+                    return
+
+                content = b''
+                if entry.get('file'):
+                    with open(os.path.join(server.directory, 'bodies', entry['file']), 'rb') as f:
+                        content = f.read()
+                    if any(marker in (entry.get('mime') or '') for marker in TEXT_MIME_MARKERS):
+                        content = server._rewrite_body(content)
+
+                self.send_response(entry.get('status') or 200)
+                if entry.get('location'):
+                    self.send_header('Location', server._rewrite_url(entry['location']))
+                if entry.get('mime'):
+                    self.send_header('Content-Type', entry['mime'])
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(content)
+
+            do_GET = do_POST = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay locale delle fixture di un portale")
+    parser.add_argument('directory')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=int, default=0, help="Millisecondi aggiunti a ogni risposta")
+    parser.add_argument('--max-pages', type=int, help="Pagine di risultati esposte")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.directory, args.latency, args.max_pages, port=args.port).start()
+    print(f"Replay di {args.directory} su {server.base_url_for(server.index['base_url'])}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# config/credentials.py
+from config.settings import CREDENTIALS_FILE
+from typing import Dict, NamedTuple, Optional
+import json
+import os
+
+
+class PortalCredentials(NamedTuple):
+    username: str
+    password: str
+
+
+def _load_file() -> Dict:
+    try:
+        with open(CREDENTIALS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_secrets(section: str) -> Optional[Dict]:
+    """Sezione di st.secrets, solo se Streamlit e secrets.toml sono disponibili"""
+    try:
+        import streamlit as st
+        return dict(st.secrets[section])
+    except Exception:
+        return None
+
+
+def get_portal_credentials(portal: str) -> Optional[PortalCredentials]:
+    """
+    Credenziali di un portale, nell'ordine:
+    CARBIT_<PORTALE>_USERNAME/PASSWORD, sezione del file CREDENTIALS_FILE, st.secrets.credentials
+    Args:
+        portal: Nome del portale (es. 'clickar' o 'Clickar')
+    Returns:
+        Optional[PortalCredentials]: Credenziali o None se non configurate
+    """
+    key = portal.lower()
+    username = os.environ.get(f"CARBIT_{key.upper()}_USERNAME")
+    password = os.environ.get(f"CARBIT_{key.upper()}_PASSWORD")
+    if username and password:
+        return PortalCredentials(username, password)
+
+    entry = _load_file().get('credentials', {}).get(key)
+    if not entry:
+        entry = (_load_secrets('credentials') or {}).get(key)
+    if entry and entry.get('username') and entry.get('password'):
+        return PortalCredentials(entry['username'], entry['password'])
+    return None
+
+
+def get_firebase_credentials() -> Optional[Dict]:
+    """
+    Service account Firebase, nell'ordine:
+    CARBIT_FIREBASE_CREDENTIALS (percorso o JSON), GOOGLE_APPLICATION_CREDENTIALS,
+    sezione 'firebase' del file CREDENTIALS_FILE, st.secrets["firebase"]
+    Returns:
+        Optional[Dict]: Dizionario del service account o None
+    """
+    for env_name in ('CARBIT_FIREBASE_CREDENTIALS', 'GOOGLE_APPLICATION_CREDENTIALS'):
+        value = os.environ.get(env_name, '').strip()
+        if not value:
+            continue
+        if value.startswith('{'):
+            return json.loads(value)
+        with open(value, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    return _load_file().get('firebase') or _load_secrets('firebase')
@@ -1,4 +1,4 @@
-import streamlit as st
+import os
 
 # URL portali
 PORTAL_URLS = {
@@ -6,15 +6,183 @@ PORTAL_URLS = {
     'ayvens': 'https://carmarket.ayvens.com'
 }
 
-PORTAL_CREDENTIALS = {
-    'clickar': st.secrets.credentials.clickar,
-    'ayvens': st.secrets.credentials.ayvens
+# Plugin dei portali (scrapers/registry.py): il modulo dello scraper viene importato solo quando serve
+PORTAL_PLUGINS = {
+    'Clickar': {
+        'key': 'clickar',
+        'module': 'scrapers.portals.clickar',
+        'class': 'ClickarScraper',
+        'enabled': True
+    },
+    'Ayvens': {
+        'key': 'ayvens',
+        'module': 'scrapers.portals.ayvens',
+        'class': 'AyvensScraper',
+        'enabled': True
+    }
+}
+
+# Resilienza per portale (scrapers/resilience.py): i valori del portale sostituiscono i default
+RESILIENCE_SETTINGS = {
+    'default': {
+        'rate': 5.0,                # Richieste al secondo (token bucket)
+        'burst': 10,                # Richieste consecutive senza attesa
+        'min_concurrency': 1,       # Concorrenza adattiva (AIMD)
+        'initial_concurrency': 2,
+        'max_concurrency': 8,
+        'latency_target': 5.0,      # Secondi: risposte più lente dimezzano la concorrenza
+        'error_rate': 0.2,          # Quota di errori nella finestra che dimezza la concorrenza
+        'window': 20,               # Ultime risposte considerate
+        'max_attempts': 3,          # Tentativi per operazione (Max tentativi nelle Opzioni Avanzate)
+        'backoff_base': 1.0,        # Secondi, raddoppiati a ogni tentativo, con jitter
+        'backoff_max': 30.0,
+        'failure_threshold': 5,     # Errori consecutivi che aprono il circuito
+        'reset_timeout': 60         # Secondi prima della richiesta di prova
+    },
+    'clickar': {
+        'rate': 2.0,
+        'burst': 4,
+        'max_concurrency': 4
+    },
+    'ayvens': {
+        'rate': 4.0,
+        'burst': 8
+    }
+}
+
+# Blocco risorse per portale (Network.setBlockedURLs): dalle pagine si leggono solo testo e attributi src
+BLOCKING_SETTINGS = {
+    'enabled': os.environ.get('CARBIT_BLOCKING', '1') != '0',  # CARBIT_BLOCKING=0 per un run di riferimento
+    'baseline_weight': 0.3    # Peso di ogni run senza blocco nella media di riferimento
+}
+
+BLOCKING_PROFILES = {
+    'clickar': {
+        'images': True,
+        'fonts': True,
+        'media': True,
+        'stylesheets': False,   # I controlli di cliccabilità del login dipendono dal layout
+        'third_party': [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'facebook.net', 'hotjar.com', 'clarity.ms'
+        ],
+        'patterns': []
+    },
+    'ayvens': {
+        'images': True,         # Le immagini veicolo servono solo come URL
+        'fonts': True,
+        'media': True,
+        'stylesheets': False,
+        'third_party': [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'facebook.net', 'hotjar.com', 'cookielaw.org', 'onetrust.com'
+        ],
+        'patterns': []
+    }
+}
+
+# Worker paralleli per portale (schede/driver o sessioni HTTP)
+PORTAL_CONCURRENCY = {
+    'clickar': 4,       # Pagine Introvabili scaricate in parallelo
+    'ayvens': 4
+}
+
+# Directory locale per sessioni, cache e diagnostica
+DATA_DIR = os.environ.get('CARBIT_DATA_DIR', '.carbit')
+
+# Credenziali portali e Firebase: variabili d'ambiente, poi file JSON, poi st.secrets (vedi config/credentials.py)
+CREDENTIALS_FILE = os.environ.get('CARBIT_CREDENTIALS_FILE', os.path.join(DATA_DIR, 'credentials.json'))
+
+# Checkpoint dei run (DATA_DIR/checkpoints): un run interrotto riprende dalle pagine o aste mancanti
+CHECKPOINT_SETTINGS = {
+    'enabled': True,
+    'max_age_hours': 6      # Oltre, l'elenco del portale è cambiato troppo e si riparte da zero
+}
+
+# Worker di scraping fuori da Streamlit (worker.py)
+WORKER_SETTINGS = {
+    'portals': [name for name, plugin in PORTAL_PLUGINS.items() if plugin['enabled']],
+    'interval_minutes': 60,     # Intervallo tra due run in modalità daemon
+    'timeout_minutes': 45,      # Tempo massimo per portale
+    'headless': True,
+    'lock_file': os.path.join(DATA_DIR, 'worker.lock')
+}
+
+# Sessioni autenticate cifrate su disco
+SESSION_SETTINGS = {
+    'enabled': True,
+    'key_env': 'CARBIT_SESSION_KEY',   # Chiave Fernet; se assente viene generata in DATA_DIR
+    'ttl_minutes': {                   # Scadenza per portale
+        'clickar': 120,
+        'ayvens': 240
+    }
+}
+
+# Modalità HTTP: dopo il login le pagine vengono scaricate con requests
+HTTP_SETTINGS = {
+    'enabled': True,
+    'pool_size': 10,    # Connessioni keep-alive per host
+    'timeout': 20,      # Secondi per richiesta
+    'max_retries': 2
+}
+
+# Download in background delle perizie (cache su disco per URL + ETag/Last-Modified)
+DOCUMENT_SETTINGS = {
+    'enabled': True,
+    'max_workers': 4,       # Download paralleli
+    'wait_timeout': 120,    # Secondi di attesa a fine scraping per download e analisi in corso
+    'parse_damage_reports': True,
+    'parse_workers': 2      # Processi per l'analisi dei PDF
+}
+
+# Diagnostica: 'off', 'on_error' (solo catture di errore) o 'full' (ogni step)
+DIAGNOSTICS_SETTINGS = {
+    'level': os.environ.get('CARBIT_DIAGNOSTICS', 'on_error'),
+    'html_snapshots': False,   # Salva anche l'HTML della pagina
+    'jpeg_quality': 60,
+    'max_files': 100,          # Catture tenute su disco (ring buffer)
+    'max_mb': 50,              # Spazio massimo occupato
+    'queue_size': 20           # Catture in attesa di scrittura, oltre vengono scartate
+}
+
+# Bus degli eventi degli scraper (scrapers/events.py)
+EVENT_SETTINGS = {
+    'flush_interval': 0.25,     # Secondi tra due consegne ai sink
+    'max_batch': 200,           # Eventi oltre i quali si consegna subito
+    'loguru': True,
+    'loguru_level': os.environ.get('CARBIT_LOG_LEVEL', 'info'),
+    'jsonl': True,              # DATA_DIR/events.jsonl
+    'streamlit_refresh': 0.3,   # Secondi minimi tra due aggiornamenti della pagina
+    'streamlit_lines': 12       # Messaggi recenti mostrati nella pagina
+}
+
+# Scritture su Firestore (FirebaseManager.save_auction_batch)
+FIREBASE_SETTINGS = {
+    'batch_vehicles': 200,          # Veicoli per batch: 2 scritture ciascuno, Firestore accetta al più 500 scritture
+    'max_workers': 4,               # Batch inviati in parallelo
+    'max_attempts': 3,              # Tentativi per batch sugli errori transitori
+    'backoff_base': 0.5,            # Secondi, raddoppiati a ogni tentativo
+    'bulk_writer_threshold': 1000,  # Oltre questi veicoli si usa il BulkWriter dell'SDK (0 per disattivarlo)
+    'hash_max_age_days': 7,         # Hash dei veicoli salvati (DATA_DIR/vehicle_hashes.json) riverificati su Firestore
+    'read_workers': 8,              # Storici prezzi letti in parallelo
+    'history_limit': 30,            # Prezzi più recenti restituiti per veicolo (0 per tutti)
+    'watchlist_page_size': 50       # Veicoli per pagina della watchlist
+}
+
+# Mirror locale SQLite della collection vehicles (utils/vehicle_mirror.py)
+MIRROR_SETTINGS = {
+    'enabled': True,
+    'page_size': 500,           # Documenti per pagina della sincronizzazione incrementale
+    'overlap_seconds': 300,     # Margine sull'high-water mark per gli orologi dei processi che scrivono
+    'full_sync_hours': 24,      # Ricaricamento completo periodico (rimuove i veicoli cancellati)
+    'min_sync_interval': 60     # Secondi minimi tra due sincronizzazioni non forzate
 }
 
 # Configurazioni cache
 CACHE_SETTINGS = {
     'enabled': True,
-    'expiry_minutes': 30
+    'expiry_minutes': 30,
+    'max_entries': 256      # Letture Firestore in cache per processo, oltre si scarta la meno usata
 }
 
 # Altre configurazioni
@@ -23,6 +191,15 @@ SELENIUM_SETTINGS = {
     'page_load_timeout': 30
 }
 
+# Pool di driver Chromium pre-avviati
+DRIVER_POOL_SETTINGS = {
+    'enabled': True,
+    'size': 2,                  # Driver tenuti caldi per processo
+    'acquire_timeout': 60,      # Secondi di attesa per un driver libero
+    'max_page_loads': 200,      # Riciclo dopo N caricamenti pagina
+    'max_memory_mb': 512        # Riciclo oltre questa heap JS
+}
+
 # Configurazioni UI
 UI_SETTINGS = {
     'items_per_page': 20,
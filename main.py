@@ -1,8 +1,9 @@
+# pandas, firebase_admin e gli scraper vengono importati solo dalle sezioni che li usano:
+# la Dashboard si apre senza caricarli (vedi benchmarks/cold_start.py)
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from utils.firebase_config import FirebaseConfig
-from utils.firebase_manager import FirebaseManager
+from config.credentials import get_portal_credentials
+from scrapers.registry import portal_names
 import time
 import traceback
 import subprocess
@@ -20,12 +21,20 @@ st.set_page_config(
     }
 )
 
-# Inizializzazione Firebase e stato globale
-if 'firebase_initialized' not in st.session_state:
-    st.session_state.firebase_initialized = FirebaseConfig.initialize_firebase()
+def get_firebase_mgr():
+    """Inizializza Firebase al primo utilizzo nella sessione e restituisce il manager (None se non disponibile)"""
+    if 'firebase_initialized' not in st.session_state:
+        from utils.firebase_config import FirebaseConfig
+        st.session_state.firebase_initialized = FirebaseConfig.initialize_firebase()
+    
+    if st.session_state.get('firebase_initialized') and 'firebase_mgr' not in st.session_state:
+        from utils.firebase_manager import FirebaseManager
+        st.session_state.firebase_mgr = FirebaseManager()
+    return st.session_state.get('firebase_mgr')
 
-if st.session_state.get('firebase_initialized') and 'firebase_mgr' not in st.session_state:
-    st.session_state.firebase_mgr = FirebaseManager()
+def firebase_failed():
+    """True se l'inizializzazione di Firebase è stata tentata ed è fallita"""
+    return st.session_state.get('firebase_initialized') is False
 
 def setup_permissions():
     try:
@@ -46,10 +55,30 @@ def show_debug_info():
         col1, col2 = st.columns(2)
         with col1:
             st.caption("Firebase:")
-            st.caption("✅ OK" if st.session_state.get('firebase_initialized') else "❌ ERROR")
+            if firebase_failed():
+                st.caption("❌ ERROR")
+            else:
+                st.caption("✅ OK" if st.session_state.get('firebase_initialized') else "⏸️ Non ancora usato")
         with col2:
             st.caption("Ultimo update:")
             st.caption(datetime.now().strftime("%H:%M:%S"))
+        
+        from utils.cache import cache_stats
+        for name, stats in cache_stats().items():
+            st.caption(
+                f"Cache {name}: {stats['hits']} hit, {stats['misses']} miss, "
+                f"{stats['evictions']} evict, {stats['entries']} voci"
+            )
+
+def warm_driver_pool():
+    """Avvia in background i driver Chromium del pool per la prossima ricerca"""
+    try:
+        from config.settings import DRIVER_POOL_SETTINGS
+        if DRIVER_POOL_SETTINGS['enabled']:
+            from scrapers.driver_pool import DriverPool
+            DriverPool.get_instance(headless=True).warm_up()
+    except Exception as e:
+        st.warning(f"⚠️ Pool driver non disponibile: {str(e)}")
 
 def show_dashboard():
     st.header("📊 Dashboard")
@@ -103,7 +132,8 @@ def show_dashboard():
         
     with col2:
         st.subheader("🎯 Top Opportunità")
-        if st.session_state.get('firebase_initialized'):
+        if not firebase_failed():
+            import pandas as pd
             st.dataframe(
                 pd.DataFrame({
                     'Veicolo': ['Audi A3', 'BMW X1', 'Mercedes C220'],
@@ -118,6 +148,17 @@ def show_dashboard():
 def show_search():
     st.header("🔍 Ricerca Aste", divider="blue")
     
+    # Di default solo lettura dei risultati del worker: nessun browser all'apertura della pagina
+    data_source = st.radio(
+        "Origine dati",
+        ["📦 Risultati del worker", "🚀 Ricerca live"],
+        horizontal=True,
+        help="Il worker (python worker.py) esegue lo scraping in background e salva su Firebase"
+    )
+    if data_source == "📦 Risultati del worker":
+        show_precomputed_results()
+        return
+    
     # Area Controlli in un box
     with st.container():
         st.markdown("""
@@ -128,15 +169,19 @@ def show_search():
         
         col1, col2, col3 = st.columns(3)
         
+        # Un checkbox per ogni portale abilitato in PORTAL_PLUGINS, alternati sulle prime due colonne
+        selected_portals = []
+        for i, portal in enumerate(portal_names()):
+            with (col1, col2)[i % 2]:
+                if st.checkbox(f"🔄 {portal}", value=True, key=f"portal_{portal}",
+                               help=f"Abilita ricerca su {portal}"):
+                    selected_portals.append(portal)
+        
         with col1:
-            clickar = st.checkbox("🔄 Clickar", value=True, 
-                                help="Abilita ricerca su Clickar")
             debug_mode = st.checkbox("🐛 Debug Mode", value=True,
                                    help="Mostra log dettagliati")
             
         with col2:
-            ayvens = st.checkbox("🔄 Ayvens", value=True,
-                               help="Abilita ricerca su Ayvens")
             headless = st.checkbox("🤖 Headless", value=False,
                                  help="Esegui senza interfaccia browser")
             
@@ -144,6 +189,12 @@ def show_search():
             with st.expander("⚙️ Opzioni Avanzate"):
                 retry_count = st.number_input("Max tentativi", 1, 5, 3)
                 wait_time = st.number_input("Timeout (sec)", 10, 60, 20)
+                concurrent = st.checkbox("⚡ Portali in parallelo", value=True,
+                                       help="Un processo e un browser per ogni portale")
+        
+        # In modalità sequenziale gli scraper girano in questo processo: pool pre-avviato
+        if not (concurrent and len(selected_portals) > 1):
+            warm_driver_pool()
 
         # Progress bar placeholder
         progress_bar = st.progress(0)
@@ -161,55 +212,83 @@ def show_search():
 
         # Bottone avvio ricerca
         if st.button("🚀 Avvia Ricerca", type="primary", use_container_width=True):
+            events_sink = None
+            pipeline = None
             try:
                 # Check Firebase
-                if not st.session_state.get('firebase_mgr'):
+                firebase_mgr = get_firebase_mgr()
+                if not firebase_mgr:
                     st.error("❌ Firebase non inizializzato")
                     return
                 
-                all_vehicles = []
+                from scrapers.pipeline import VehiclePipeline, DataFrameSink, FirebaseSink
+                from scrapers.events import EventBus, StreamlitSink
+                from scrapers.registry import create_scraper
+                
                 sources = []
                 
-                if clickar:
-                    sources.append(("Clickar", st.secrets.credentials.clickar))
-                if ayvens:
-                    sources.append(("Ayvens", st.secrets.credentials.ayvens))
+                for source_name in selected_portals:
+                    credentials = get_portal_credentials(source_name)
+                    if credentials:
+                        sources.append((source_name, credentials))
+                    else:
+                        st.error(f"❌ Credenziali {source_name} non configurate")
                 
                 total_steps = len(sources) * 4  # Login, Navigate, Scrape, Save
                 current_step = 0
                 
+                # I veicoli vengono mostrati e salvati su Firebase pagina per pagina
+                st.session_state.pop('vehicles_data', None)
+                st.session_state['search_started_at'] = time.time()
+                
+                # Messaggi degli scraper coalescenti in un unico riquadro
+                events_sink = StreamlitSink(st.empty())
+                EventBus.get_instance().subscribe(events_sink)
+                
+                firebase_sink = FirebaseSink(firebase_mgr)
+                pipeline = VehiclePipeline([
+                    DataFrameSink(st.empty()),
+                    firebase_sink
+                ])
+                
+                # Opzioni Avanzate: tentativi con backoff e timeout di attesa degli scraper
+                # e run_id del riquadro eventi, che mostra solo i messaggi di questa ricerca
+                options = {'max_attempts': retry_count, 'timeout': wait_time, 'run_id': events_sink.run_id}
+                
+                # Modalità parallela: un processo per portale, risultati in streaming
+                if concurrent and len(sources) > 1:
+                    run_sources_concurrently(
+                        sources, pipeline, events_sink, progress_bar, status_text, log_area, debug_mode, options
+                    )
+                    sources = []
+                
                 for source_name, credentials in sources:
                     try:
                         status_text.text(f"Elaborazione {source_name}...")
                         
-                        # Importa scraper dinamicamente
-                        if source_name == "Clickar":
-                            from scrapers.portals.clickar import ClickarScraper
-                            scraper = ClickarScraper()
-                        else:
-                            from scrapers.portals.ayvens import AyvensScraper
-                            scraper = AyvensScraper()
+                        # Il modulo del portale viene importato solo ora (config PORTAL_PLUGINS)
+                        scraper = create_scraper(source_name)
+                        scraper.configure(**options)
                         
                         # Setup e debug mode
                         if debug_mode:
                             log_area.text(f"🔧 Inizializzazione {source_name}...")
                         
-                        # Esegui scraping
-                        vehicles = scraper.scrape(
-                            credentials.username,
-                            credentials.password
+                        # Esegui scraping in streaming
+                        def on_batch(added, total, source_name=source_name):
+                            status_text.text(f"Elaborazione {source_name}: {total} veicoli...")
+                        
+                        found = pipeline.consume(
+                            source_name,
+                            scraper.iter_vehicles(credentials.username, credentials.password),
+                            on_batch
                         )
+                        events_sink.render()
                         
-                        if vehicles:
-                            # Aggiunge fonte
-                            for v in vehicles:
-                                v['fonte'] = source_name
-                            all_vehicles.extend(vehicles)
-                            
-                            if debug_mode:
-                                log_area.text(f"✅ {source_name}: {len(vehicles)} veicoli trovati")
-                        else:
-                            if debug_mode:
+                        if debug_mode:
+                            if found:
+                                log_area.text(f"✅ {source_name}: {found} veicoli trovati")
+                            else:
                                 log_area.text(f"⚠️ {source_name}: Nessun veicolo trovato")
                         
                         current_step += 1
@@ -220,11 +299,13 @@ def show_search():
                         if debug_mode:
                             st.code(traceback.format_exc())
                         continue
-                        
+                
                 # Mostra risultati
-                if all_vehicles:
-                    st.session_state['vehicles_data'] = pd.DataFrame(all_vehicles)
-                    status_text.text(f"✅ Trovati {len(all_vehicles)} veicoli totali")
+                if pipeline.stats['vehicles']:
+                    status_text.text(
+                        f"✅ Trovati {pipeline.stats['vehicles']} veicoli totali - "
+                        f"Firebase: {firebase_sink.stats['written']} scritti, {firebase_sink.stats['unchanged']} invariati"
+                    )
                 else:
                     status_text.text("⚠️ Nessun veicolo trovato")
                     
@@ -233,12 +314,120 @@ def show_search():
                 if debug_mode:
                     st.code(traceback.format_exc())
             finally:
+                # La tabella dei risultati viene composta alla chiusura, anche dopo un errore
+                if pipeline is not None:
+                    pipeline.close()
+                if events_sink:
+                    EventBus.get_instance().unsubscribe(events_sink)
+                    events_sink.close()
                 progress_bar.progress(100)
         
+        # Catture diagnostiche degli errori dell'ultima ricerca
+        if 'search_started_at' in st.session_state:
+            show_error_captures(st.session_state['search_started_at'])
+        
         # Mostra risultati se presenti
         if 'vehicles_data' in st.session_state:
             show_search_results(st.session_state['vehicles_data'])
 
+def show_precomputed_results():
+    """Mostra i veicoli salvati su Firebase dall'ultimo run del worker"""
+    firebase_mgr = get_firebase_mgr()
+    if not firebase_mgr:
+        st.warning("⚠️ Firebase non inizializzato")
+        return
+    import pandas as pd
+    
+    col1, col2 = st.columns([4, 1])
+    with col2:
+        refresh = st.button("🔄 Aggiorna", use_container_width=True)
+    
+    # Lettura una volta per sessione: i rerun dei filtri non interrogano Firebase
+    if refresh or 'precomputed_data' not in st.session_state:
+        st.session_state['precomputed_run'] = firebase_mgr.get_last_run()
+        st.session_state['precomputed_data'] = pd.DataFrame(firebase_mgr.get_all_vehicles(refresh=refresh))
+    
+    last_run = st.session_state['precomputed_run']
+    with col1:
+        if last_run:
+            started_at = last_run.get('started_at')
+            started_text = started_at.strftime('%d/%m/%Y %H:%M') if hasattr(started_at, 'strftime') else str(started_at)
+            st.caption(
+                f"Ultimo run del worker: {started_text} - {last_run.get('status')} - "
+                f"{last_run.get('vehicles', 0)} veicoli"
+            )
+        else:
+            st.info("Nessun run del worker registrato: avvia `python worker.py --once`")
+    
+    df = st.session_state['precomputed_data']
+    if not df.empty:
+        show_search_results(df)
+
+def run_sources_concurrently(sources, pipeline, events_sink, progress_bar, status_text, log_area, debug_mode,
+                             options=None):
+    """
+    Esegue i portali in parallelo e inoltra alla pipeline i blocchi di veicoli man mano che arrivano
+    Returns:
+        int: Veicoli raccolti da tutti i portali
+    """
+    from scrapers.runner import ConcurrentRunner
+    from scrapers.events import ScraperEvent
+    
+    completed = 0
+    status_text.text(f"Elaborazione in parallelo: {', '.join(name for name, _ in sources)}...")
+    
+    for kind, source_name, payload in ConcurrentRunner(sources, options=options).run():
+        if kind == 'status':
+            if debug_mode:
+                log_area.text(payload)
+        elif kind == 'events':
+            events_sink.write([ScraperEvent(**event) for event in payload])
+        elif kind == 'batch':
+            pipeline.push(source_name, payload)
+            if debug_mode:
+                log_area.text(f"📦 {source_name}: {pipeline.counts[source_name]} veicoli ricevuti")
+        elif kind == 'error':
+            message, _, details = payload.partition('\n')
+            st.error(f"❌ Errore in {source_name}: {message}")
+            if debug_mode and details:
+                st.code(details)
+        elif kind == 'done':
+            completed += 1
+            progress_bar.progress(completed / len(sources))
+            if debug_mode:
+                found = pipeline.counts.get(source_name, 0)
+                log_area.text(
+                    f"✅ {source_name}: {found} veicoli trovati" if found
+                    else f"⚠️ {source_name}: Nessun veicolo trovato"
+                )
+    
+    return pipeline.stats['vehicles']
+
+def show_error_captures(since):
+    """Elenca le catture di errore dell'ultima ricerca; l'immagine viene caricata solo su richiesta"""
+    from scrapers.diagnostics import DiagnosticsRecorder
+    
+    captures = DiagnosticsRecorder.list_captures(errors_only=True, since=since)
+    if not captures:
+        return
+    
+    with st.expander(f"📸 Diagnostica errori ({len(captures)})"):
+        labels = {
+            meta['id']: f"{meta['portal']} - {meta['name']} ({datetime.fromtimestamp(meta['created_at']).strftime('%H:%M:%S')})"
+            for meta in captures
+        }
+        selected_id = st.selectbox("Cattura", options=list(labels), format_func=labels.get)
+        meta = next(meta for meta in captures if meta['id'] == selected_id)
+        st.caption(meta.get('url', ''))
+        
+        if st.button("🔍 Mostra cattura", key='show-capture'):
+            image = DiagnosticsRecorder.load_file(meta, 'image')
+            if image:
+                st.image(image, caption=meta['name'])
+            html = DiagnosticsRecorder.load_file(meta, 'html')
+            if html:
+                st.download_button("📥 Scarica HTML", html, f"{meta['id']}.html", "text/html")
+
 def show_search_results(df):
     """Mostra i risultati della ricerca"""
     st.divider()
@@ -259,9 +448,19 @@ def show_search_results(df):
         with col3:
             sources = sorted(df['fonte'].unique()) if 'fonte' in df.columns else []
             source_filter = st.multiselect("🔄 Fonte", options=sources)
+        
+        # Costo danni stimato dalle perizie analizzate
+        damage_filter = None
+        if 'damage_cost' in df.columns and df['damage_cost'].notna().any():
+            max_cost = float(df['damage_cost'].max())
+            # Con tutti i costi a zero lo slider avrebbe minimo uguale al massimo
+            if max_cost > 0:
+                damage_filter = st.slider("🔧 Costo danni massimo (€)", 0.0, max_cost, max_cost)
     
     # Applica filtri
     filtered_df = df.copy()
+    if damage_filter is not None:
+        filtered_df = filtered_df[filtered_df['damage_cost'].isna() | (filtered_df['damage_cost'] <= damage_filter)]
     if brand_filter:
         filtered_df = filtered_df[filtered_df['brand_model'].str.split().str[0].isin(brand_filter)]
     if location_filter:
@@ -282,6 +481,7 @@ def show_search_results(df):
             "base_price": st.column_config.NumberColumn("💰 Prezzo Base", format="€%.2f"),
             "km": "🛣️ Kilometraggio",
             "damages": "🔧 Danni",
+            "damage_cost": st.column_config.NumberColumn("🔧 Costo Danni", format="€%.2f"),
             "status": "📊 Stato",
             "fonte": "🔄 Fonte"
         },
@@ -317,12 +517,22 @@ def show_analysis():
         
     with tab3:
         st.subheader("📊 Statistiche")
-        st.info("Sezione in sviluppo")
+        # Conteggi dal mirror locale dei veicoli: nessuna lettura dell'intera collection
+        firebase_mgr = get_firebase_mgr()
+        counts = firebase_mgr.get_vehicle_counts() if firebase_mgr else {}
+        if counts:
+            cols = st.columns(len(counts) + 1)
+            cols[0].metric("Veicoli totali", sum(counts.values()))
+            for col, (fonte, count) in zip(cols[1:], counts.items()):
+                col.metric(fonte, count)
+        else:
+            st.info("Sezione in sviluppo")
 
 def show_watchlist():
     st.header("👀 Watchlist", divider="blue")
     
-    if st.session_state.get('firebase_initialized'):
+    if get_firebase_mgr():
+        import pandas as pd
         # Cards per statistiche watchlist
         col1, col2, col3 = st.columns(3)
         
@@ -387,7 +597,7 @@ def main():
     """, unsafe_allow_html=True)
     
     # Warning Firebase se non inizializzato
-    if not st.session_state.get('firebase_initialized'):
+    if firebase_failed():
         st.warning("⚠️ Firebase non inizializzato. Alcune funzionalità potrebbero essere limitate.", icon="⚠️")
     
     # Menu principale nella sidebar con stile
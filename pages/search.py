@@ -1,7 +1,7 @@
 # pages/search.py
 import streamlit as st
-from scrapers.portals.clickar import ClickarScraper
-from scrapers.portals.ayvens import AyvensScraper
+from scrapers.registry import create_scraper
+from config.credentials import get_portal_credentials
 import pandas as pd
 from datetime import datetime
 import sys
@@ -13,7 +13,7 @@ def debug_scraper(portal_name, username, password, log_container):
         with log_container:
             st.write(f"🔍 DEBUG {portal_name}")
             st.write("1️⃣ Inizializzazione scraper...")
-            scraper = ClickarScraper() if portal_name == "Clickar" else AyvensScraper()
+            scraper = create_scraper(portal_name)
             st.success("✅ Scraper inizializzato")
             
             st.write("2️⃣ Setup driver...")
@@ -106,20 +106,26 @@ def main():
             # Test di connessione e debug
             if debug_mode:
                 st.info("🔧 Modalità debug attiva")
-                if clickar_enabled:
+                clickar_credentials = get_portal_credentials("Clickar")
+                if clickar_enabled and not clickar_credentials:
+                    st.error("Credenziali Clickar non configurate")
+                elif clickar_enabled:
                     vehicles = debug_scraper("Clickar", 
-                                          st.secrets.credentials.clickar.username,
-                                          st.secrets.credentials.clickar.password,
+                                          clickar_credentials.username,
+                                          clickar_credentials.password,
                                           log_container)
                     if vehicles:
                         for v in vehicles:
                             v['fonte'] = 'Clickar'
                         all_vehicles.extend(vehicles)
                 
-                if ayvens_enabled:
+                ayvens_credentials = get_portal_credentials("Ayvens")
+                if ayvens_enabled and not ayvens_credentials:
+                    st.error("Credenziali Ayvens non configurate")
+                elif ayvens_enabled:
                     vehicles = debug_scraper("Ayvens",
-                                          st.secrets.credentials.ayvens.username,
-                                          st.secrets.credentials.ayvens.password,
+                                          ayvens_credentials.username,
+                                          ayvens_credentials.password,
                                           log_container)
                     if vehicles:
                         for v in vehicles:
@@ -176,6 +182,7 @@ def main():
                     "base_price": st.column_config.NumberColumn("Prezzo Base", format="€%.2f"),
                     "km": "Kilometraggio",
                     "damages": "Danni",
+                    "damage_cost": st.column_config.NumberColumn("Costo Danni", format="€%.2f"),
                     "status": "Stato",
                     "fonte": "Fonte"
                 },
@@ -1,77 +1,203 @@
 # scrapers/base.py
 from abc import ABC, abstractmethod
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import streamlit as st
+from scrapers.driver_pool import DriverPool, create_chrome_driver
+from scrapers.session_store import SessionStore
+from scrapers.waits import WaitEngine
+from scrapers.http_client import HttpClient
+from scrapers.diagnostics import DiagnosticsRecorder
+from scrapers.blocking import BlockingReport, apply_blocking_profile
+from scrapers.events import EventBus, ScraperEvent
+from scrapers.resilience import PortalGuard
+from scrapers.checkpoints import RunCheckpoint
+from config.settings import DRIVER_POOL_SETTINGS, SESSION_SETTINGS, HTTP_SETTINGS
+from typing import Dict, Iterator, List, Optional
 import platform
 import os
 import subprocess
 
 class BaseScraper(ABC):
-    def __init__(self, headless: bool = True):
+    # Campi cookie accettati da Network.setCookies
+    COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+    def __init__(self, headless: bool = True, use_pool: bool = None, http_mode: bool = None):
+        self.portal_key = None
+        self.base_url = None
         self.driver = None
         self.wait_time = 20
         self.wait = None
+        self.waits = None
         self.debug = True
         self.headless = headless
+        self.use_pool = DRIVER_POOL_SETTINGS['enabled'] if use_pool is None else use_pool
+        self.pool = None
+        self.http_mode = HTTP_SETTINGS['enabled'] if http_mode is None else http_mode
+        self.http = None
+        self.last_error_capture = None
+        self.blocking = False
+        self.blocking_report = None
+        self.checkpoint = None
+        self.run_id = None
+
+    @property
+    def guard(self) -> PortalGuard:
+        """Limite di richieste, retry e circuit breaker del portale, condivisi nel processo"""
+        return PortalGuard.for_portal(self.portal_key)
+
+    def configure(self, max_attempts: int = None, timeout: int = None, run_id: str = None) -> None:
+        """
+        Applica le Opzioni Avanzate della ricerca
+        Args:
+            max_attempts: Tentativi per operazione verso il portale
+            timeout: Secondi massimi di attesa per elementi e richieste
+            run_id: Ricerca a cui appartengono gli eventi pubblicati (riquadro Streamlit della sessione)
+        """
+        if run_id:
+            self.run_id = run_id
+        if timeout:
+            self.wait_time = timeout
+        if max_attempts:
+            PortalGuard.configure(self.portal_key, max_attempts=max_attempts)
+
+    def open_checkpoint(self) -> RunCheckpoint:
+        """Apre il checkpoint del run, riprendendo quello di un run interrotto se presente"""
+        self.checkpoint = RunCheckpoint(self.portal_key)
+        if self.checkpoint.resumed:
+            self.log(f"♻️ Ripresa run interrotto: {self.checkpoint.summary()}")
+        return self.checkpoint
 
     def setup_driver(self) -> bool:
         try:
-            st.write("🔧 Setup Chrome Driver:")
+            self.log("🔧 Setup Chrome Driver:")
             
             # Info sistema
-            st.write(f"Sistema Operativo: {platform.system() or 'Unknown'} {platform.release() or ''}")
-            st.write(f"Python Version: {platform.python_version()}")
-            
-            # Opzioni Chrome
-            chrome_options = Options()
-            if self.headless:
-                chrome_options.add_argument('--headless=new')
-            
-            # Opzioni base necessarie
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
+            self.log(f"Sistema Operativo: {platform.system() or 'Unknown'} {platform.release() or ''}")
+            self.log(f"Python Version: {platform.python_version()}")
             
-            # Opzioni anti-detection
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            if self.use_pool:
+                # Driver pre-avviato e già verificato dal pool
+                self.log("Prelievo Chrome dal pool...")
+                self.pool = DriverPool.get_instance(self.headless)
+                self.driver = self.pool.acquire()
+            else:
+                self.log("Inizializzazione Chrome...")
+                self.driver = create_chrome_driver(self.headless)
+                # Verifica leggera, senza navigazione esterna
+                self.driver.execute_script("return 1")
             
-            # Per Chromium su Debian/Ubuntu
-            chrome_options.binary_location = '/usr/bin/chromium'
-            
-            # Usa il chromedriver di sistema
-            service = Service('/usr/bin/chromedriver')
-            
-            st.write("Inizializzazione Chrome...")
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.wait = WebDriverWait(self.driver, self.wait_time)
+            self.waits = WaitEngine(self.driver, self.wait_time, self.portal_key)
             
-            # Test di navigazione
-            st.write("Test di navigazione...")
-            self.driver.get("https://www.google.com")
-            st.success("✅ Driver inizializzato correttamente")
+            # Immagini, font, media e tracker del portale non vengono scaricati
+            try:
+                self.blocking = apply_blocking_profile(self.driver, self.portal_key)
+            except Exception as e:
+                self.log(f"⚠️ Blocco risorse non disponibile: {str(e)}", 'warning')
+            self.log("✅ Driver inizializzato correttamente", 'success')
             return True
             
         except Exception as e:
-            st.error(f"❌ Errore setup driver: {type(e).__name__}")
-            st.error(str(e))
+            self.log(f"❌ Errore setup driver: {type(e).__name__}", 'error')
+            self.log(str(e), 'error')
             return False
 
     def cleanup(self):
+        # Le catture in coda vanno scritte prima che il processo worker termini
+        DiagnosticsRecorder.flush_pending()
+        if self.http:
+            self.http.close()
+            self.http = None
         if self.driver:
+            if self.waits:
+                self.report_blocking()
+                self.waits.save_stats()
             try:
-                self.driver.quit()
-                st.write("✅ Driver chiuso correttamente")
+                if self.pool:
+                    self.pool.release(self.driver, self.log)
+                    self.log("✅ Driver restituito al pool")
+                else:
+                    self.driver.quit()
+                    self.log("✅ Driver chiuso correttamente")
             except Exception as e:
-                st.error(f"❌ Errore chiusura driver: {str(e)}")
+                self.log(f"❌ Errore chiusura driver: {str(e)}", 'error')
+            finally:
+                self.driver = None
+                self.wait = None
+                self.waits = None
+        EventBus.get_instance().flush()
+
+    def log(self, message: str, level: str = 'info', **data) -> None:
+        """
+        Pubblica un messaggio sul bus degli eventi (loguru, JSONL e riquadro Streamlit se attivo)
+        Args:
+            message: Testo del messaggio
+            level: 'debug', 'info', 'success', 'warning' o 'error'
+            data: Campi strutturati aggiuntivi
+        """
+        EventBus.get_instance().publish(ScraperEvent(
+            'log', self.portal_key or 'scraper', message, level, data, run_id=self.run_id
+        ))
+
+    def progress(self, phase: str, message: str, current: int = None, total: int = None) -> None:
+        """
+        Pubblica l'avanzamento di una fase; gli aggiornamenti ravvicinati della stessa fase si coalescono
+        Args:
+            phase: Fase (es. 'pages', 'auctions')
+            message: Descrizione dello stato corrente
+            current: Elementi completati
+            total: Elementi totali, se noti
+        """
+        EventBus.get_instance().publish(ScraperEvent(
+            'progress', self.portal_key or 'scraper', message, 'info',
+            {'phase': phase, 'current': current, 'total': total}, run_id=self.run_id
+        ))
+
+    def capture(self, name: str, error: bool = False) -> Optional[str]:
+        """
+        Cattura diagnostica della pagina corrente, scritta in background secondo il livello configurato
+        Args:
+            name: Step o errore
+            error: True se la cattura documenta un errore
+        Returns:
+            Optional[str]: ID della cattura o None
+        """
+        if not self.driver:
+            return None
+        try:
+            capture_id = DiagnosticsRecorder.get_instance().capture(
+                self.driver, self.portal_key or 'unknown', name, error
+            )
+            if capture_id and error:
+                self.last_error_capture = capture_id
+            return capture_id
+        except Exception as e:
+            print(f"Errore cattura diagnostica {name}: {str(e)}")
+            return None
+
+    def report_blocking(self) -> None:
+        """Riepiloga il traffico del run e il risparmio dovuto al profilo di blocco"""
+        if not self.portal_key:
+            return
+        try:
+            self.waits.drain_network()
+            self.blocking_report = BlockingReport().record(self.portal_key, self.waits.traffic, self.blocking)
+        except Exception as e:
+            print(f"Errore riepilogo traffico: {str(e)}")
+            return
+
+        report = self.blocking_report
+        message = (
+            f"📉 Traffico {self.portal_key}: {report['bytes'] / 1024:.0f} KB in {report['page_loads']} pagine, "
+            f"{report['blocked_requests']} richieste bloccate"
+        )
+        if report['bytes_saved'] is not None:
+            message += (
+                f", risparmiati ~{report['bytes_saved'] / 1024:.0f} KB "
+                f"e ~{report['load_time_saved']:.1f}s di caricamento"
+            )
+        self.log(message)
 
     def wait_for_element(self, by: By, value: str, timeout: int = None) -> bool:
         try:
@@ -88,6 +214,122 @@ class BaseScraper(ABC):
         except:
             return False
 
+    def export_session_state(self) -> Dict:
+        """
+        Esporta cookie (tutti i domini) e localStorage della sessione corrente
+        Returns:
+            Dict: Stato sessione serializzabile
+        """
+        cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        local_storage = self.driver.execute_script(
+            "var data = {};"
+            "for (var i = 0; i < localStorage.length; i++) {"
+            "  var key = localStorage.key(i); data[key] = localStorage.getItem(key);"
+            "}"
+            "return data;"
+        )
+        return {'cookies': cookies, 'local_storage': local_storage or {}}
+
+    def import_session_state(self, state: Dict) -> None:
+        """
+        Ripristina cookie e localStorage nel browser e carica la pagina del portale
+        Args:
+            state: Stato ottenuto da export_session_state()
+        """
+        cookies = []
+        for cookie in state.get('cookies', []):
+            params = {key: cookie[key] for key in self.COOKIE_FIELDS if key in cookie}
+            # I cookie di sessione non hanno scadenza
+            if cookie.get('session') or params.get('expires', -1) < 0:
+                params.pop('expires', None)
+            cookies.append(params)
+        self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+        self.driver.get(self.base_url)
+        if state.get('local_storage'):
+            self.driver.execute_script(
+                "var data = arguments[0]; for (var key in data) { localStorage.setItem(key, data[key]); }",
+                state['local_storage']
+            )
+            self.driver.refresh()
+
+    def restore_session(self, account: str) -> bool:
+        """
+        Prova a riutilizzare una sessione salvata prima del login completo
+        Args:
+            account: Username della sessione
+        Returns:
+            bool: True se la sessione ripristinata risulta autenticata
+        """
+        if not SESSION_SETTINGS['enabled'] or not self.portal_key:
+            return False
+
+        try:
+            store = SessionStore()
+            state = store.load(self.portal_key, account)
+            if not state:
+                return False
+
+            self.log("♻️ Ripristino sessione salvata...")
+            self.import_session_state(state)
+            if self.is_session_valid():
+                self.log("✅ Sessione ripristinata, login saltato", 'success')
+                return True
+
+            # Sessione scaduta lato portale: si procede con il login completo
+            store.invalidate(self.portal_key, account)
+            self.log("⚠️ Sessione salvata non più valida")
+        except Exception as e:
+            self.log(f"⚠️ Ripristino sessione fallito: {str(e)}", 'warning')
+        return False
+
+    def save_session(self, account: str) -> None:
+        """Salva la sessione corrente dopo un login riuscito"""
+        if not SESSION_SETTINGS['enabled'] or not self.portal_key:
+            return
+
+        try:
+            state = self.export_session_state()
+            SessionStore().save(self.portal_key, account, state['cookies'], state['local_storage'])
+        except Exception as e:
+            self.log(f"⚠️ Salvataggio sessione fallito: {str(e)}", 'warning')
+
+    def is_session_valid(self) -> bool:
+        """Verifica rapida che il browser risulti autenticato sul portale"""
+        return False
+
+    def handoff_to_http(self) -> bool:
+        """
+        Passa la sessione autenticata del browser a un client HTTP
+        Returns:
+            bool: True se il client HTTP è pronto all'uso
+        """
+        if not self.http_mode or not self.driver:
+            return False
+        try:
+            self.http = HttpClient.from_driver(self.driver, timeout=self.wait_time, guard=self.guard)
+            return True
+        except Exception as e:
+            self.log(f"⚠️ Modalità HTTP non disponibile: {str(e)}", 'warning')
+            self.http = None
+            return False
+
+    def iter_vehicles(self, username: str, password: str) -> Iterator[List[Dict]]:
+        """
+        Scraping in streaming: i veicoli arrivano a blocchi (una pagina o un'asta) appena estratti,
+        così chi consuma può mostrarli e salvarli senza attendere la fine del portale.
+        Un veicolo può ricomparire in un blocco successivo con dati aggiornati: va aggiornato per chiave.
+        Di default un unico blocco con il risultato di scrape()
+        Args:
+            username: Username per il login
+            password: Password per il login
+        Yields:
+            List[Dict]: Blocco di veicoli
+        """
+        vehicles = self.scrape(username, password)
+        if vehicles:
+            yield vehicles
+
     @abstractmethod
     def login(self, username: str, password: str) -> bool:
         pass
@@ -0,0 +1,113 @@
+# scrapers/blocking.py
+from config.settings import BLOCKING_PROFILES, BLOCKING_SETTINGS, DATA_DIR
+from typing import Dict, List, Optional
+import json
+import os
+import time
+
+# Estensioni per tipo di risorsa
+RESOURCE_EXTENSIONS = {
+    'images': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp', 'avif'),
+    'fonts': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov'),
+    'stylesheets': ('css',)
+}
+
+
+def blocked_url_patterns(profile: Dict) -> List[str]:
+    """
+    Traduce un profilo di blocco nei pattern di Network.setBlockedURLs
+    Args:
+        profile: Profilo da BLOCKING_PROFILES
+    Returns:
+        List[str]: Pattern con wildcard '*'
+    """
+    patterns = []
+    for kind, extensions in RESOURCE_EXTENSIONS.items():
+        if profile.get(kind):
+            for extension in extensions:
+                # Con e senza query string (es. logo.png?v=3)
+                patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    for domain in profile.get('third_party', []):
+        patterns.append(f"*://*.{domain}/*")
+        patterns.append(f"*://{domain}/*")
+    patterns.extend(profile.get('patterns', []))
+    return patterns
+
+
+def apply_blocking_profile(driver, portal: Optional[str]) -> bool:
+    """
+    Applica al driver il profilo di blocco del portale
+    Returns:
+        bool: True se il blocco è attivo
+    """
+    profile = BLOCKING_PROFILES.get(portal or '')
+    if not BLOCKING_SETTINGS['enabled'] or not profile:
+        return False
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(profile)})
+    return True
+
+
+class BlockingReport:
+    """Stima byte e tempo di caricamento risparmiati rispetto ai run senza blocco dello stesso portale"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DATA_DIR, 'blocking_baseline.json')
+        self.baseline = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.baseline, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, portal: str, traffic: Dict, blocking: bool) -> Dict:
+        """
+        Registra il traffico di un run
+        Args:
+            portal: Portale
+            traffic: Contatori di WaitEngine.traffic
+            blocking: True se il profilo di blocco era attivo
+        Returns:
+            Dict: Riepilogo del run con bytes_saved e load_time_saved (None senza riferimento)
+        """
+        loads = traffic.get('page_loads', 0)
+        report = {
+            'portal': portal,
+            'blocking': blocking,
+            'page_loads': loads,
+            'bytes': traffic.get('bytes', 0),
+            'blocked_requests': traffic.get('blocked', 0),
+            'bytes_saved': None,
+            'load_time_saved': None
+        }
+        if not loads:
+            return report
+
+        bytes_per_load = traffic['bytes'] / loads
+        time_per_load = traffic['load_time'] / loads
+        reference = self.baseline.get(portal)
+
+        if not blocking:
+            # Run di riferimento: media mobile per pagina
+            weight = BLOCKING_SETTINGS['baseline_weight'] if reference else 1.0
+            reference = reference or {'bytes_per_load': 0.0, 'time_per_load': 0.0}
+            self.baseline[portal] = {
+                'bytes_per_load': reference['bytes_per_load'] * (1 - weight) + bytes_per_load * weight,
+                'time_per_load': reference['time_per_load'] * (1 - weight) + time_per_load * weight,
+                'updated_at': time.time()
+            }
+            self._save()
+        elif reference:
+            report['bytes_saved'] = int(max(reference['bytes_per_load'] - bytes_per_load, 0) * loads)
+            report['load_time_saved'] = round(max(reference['time_per_load'] - time_per_load, 0) * loads, 2)
+        return report
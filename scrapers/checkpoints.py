@@ -0,0 +1,165 @@
+# scrapers/checkpoints.py
+from config.settings import CHECKPOINT_SETTINGS, DATA_DIR
+from typing import Dict, List, Optional
+import json
+import os
+import threading
+import time
+
+
+def checkpoint_key(vehicle: Dict) -> str:
+    """Chiave di un veicolo nel checkpoint, come vehicle_key della pipeline"""
+    return f"{vehicle.get('fonte', '')}|{vehicle.get('plate') or vehicle.get('id') or ''}"
+
+
+class RunCheckpoint:
+    """
+    Checkpoint locale di un run di un portale: unità completate (pagine o aste), cursore e veicoli raccolti.
+    Un run interrotto lascia il checkpoint su disco e il run successivo lo riprende saltando le unità completate.
+    In memoria restano solo unità e cursore; i veicoli vengono accodati a un file JSONL, unità per unità,
+    e riletti solo alla ripresa
+    """
+
+    def __init__(self, portal: str, path: str = None, enabled: bool = None, max_age_hours: float = None):
+        """
+        Args:
+            portal: Portale (es. 'clickar')
+            path: File del checkpoint (default DATA_DIR/checkpoints/<portale>.json); i veicoli sono
+                nel file .jsonl accanto
+            enabled: Abilita il checkpoint (default CHECKPOINT_SETTINGS)
+            max_age_hours: Età oltre cui un checkpoint non viene ripreso
+        """
+        self.portal = portal
+        self.path = path or os.path.join(DATA_DIR, 'checkpoints', f"{portal}.json")
+        self.vehicles_path = f"{os.path.splitext(self.path)[0]}.jsonl"
+        self.enabled = CHECKPOINT_SETTINGS['enabled'] if enabled is None else enabled
+        max_age = (max_age_hours or CHECKPOINT_SETTINGS['max_age_hours']) * 3600
+        self._lock = threading.Lock()
+
+        self.state = self._load(max_age) if self.enabled else None
+        self.resumed = self.state is not None
+        if self.state is None:
+            if self.enabled:
+                # Veicoli rimasti da un checkpoint scaduto o senza stato: non appartengono a questo run
+                self.discard()
+            now = time.time()
+            self.state = {
+                'run_id': f"{time.strftime('%Y%m%d-%H%M%S')}-{portal}",
+                'portal': portal,
+                'started_at': now,
+                'updated_at': now,
+                'units': {},
+                'cursor': {}
+            }
+
+    def _load(self, max_age: float) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - state.get('updated_at', 0) > max_age:
+            # Elenco del portale ormai diverso: si riparte da zero
+            self.discard()
+            return None
+        legacy = state.pop('vehicles', None)
+        if legacy:
+            # Checkpoint del formato precedente, con i veicoli nello stato: passano al file JSONL
+            with open(self.vehicles_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(
+                    json.dumps({'unit': None, 'vehicle': vehicle}, default=str) + '\n' for vehicle in legacy.values()
+                ))
+        return state
+
+    @property
+    def run_id(self) -> str:
+        return self.state['run_id']
+
+    @property
+    def cursor(self) -> Dict:
+        return self.state['cursor']
+
+    def is_done(self, unit) -> bool:
+        return str(unit) in self.state['units']
+
+    def vehicles(self) -> List[Dict]:
+        """
+        Veicoli raccolti dalle unità completate, letti in streaming dal file JSONL; per ogni veicolo
+        vale l'ultima versione accodata (es. quella con la perizia)
+        """
+        done = set(self.state['units'])
+        vehicles: Dict[str, Dict] = {}
+        with self._lock:
+            try:
+                with open(self.vehicles_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Riga troncata da un'interruzione durante la scrittura
+                        # Veicoli di un'unità accodati prima che l'unità risultasse completata
+                        if record.get('unit') is not None and record['unit'] not in done:
+                            continue
+                        vehicle = record['vehicle']
+                        vehicles[checkpoint_key(vehicle)] = vehicle
+            except OSError:
+                pass
+        return list(vehicles.values())
+
+    def complete(self, unit, vehicles: List[Dict], **cursor) -> None:
+        """
+        Registra un'unità completata e i suoi veicoli; i veicoli vengono marcati con l'ID del run
+        (scrape_run), così le scritture ripetute dello stesso run restano idempotenti
+        Args:
+            unit: Pagina o asta completata
+            vehicles: Veicoli estratti dall'unità
+            cursor: Posizione del run da ricordare (es. last_page)
+        """
+        with self._lock:
+            # Prima i veicoli, poi lo stato: un'interruzione nel mezzo lascia l'unità da rifare
+            self._append(vehicles, str(unit))
+            self.state['units'][str(unit)] = {'vehicles': len(vehicles), 'at': time.time()}
+            self.state['cursor'].update(cursor)
+            self.save()
+
+    def update(self, vehicles: List[Dict]) -> None:
+        """Aggiorna veicoli già registrati (es. dopo l'analisi della perizia) accodandone la nuova versione"""
+        with self._lock:
+            self._append(vehicles, None)
+
+    def _append(self, vehicles: List[Dict], unit: Optional[str]) -> None:
+        for vehicle in vehicles:
+            vehicle['scrape_run'] = self.run_id
+        if not self.enabled or not vehicles:
+            return
+        os.makedirs(os.path.dirname(self.vehicles_path) or '.', exist_ok=True)
+        with open(self.vehicles_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(
+                json.dumps({'unit': unit, 'vehicle': vehicle}, default=str) + '\n' for vehicle in vehicles
+            ))
+
+    def save(self) -> None:
+        """Riscrive lo stato (unità e cursore, senza veicoli)"""
+        if not self.enabled:
+            return
+        self.state['updated_at'] = time.time()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def finish(self) -> None:
+        """Run completato: il checkpoint non serve più"""
+        self.discard()
+
+    def discard(self) -> None:
+        for path in (self.path, self.vehicles_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def summary(self) -> str:
+        count = sum(unit.get('vehicles', 0) for unit in self.state['units'].values())
+        return f"{len(self.state['units'])} unità e {count} veicoli dal run {self.run_id}"
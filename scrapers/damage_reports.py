@@ -0,0 +1,199 @@
+# scrapers/damage_reports.py
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from config.settings import DATA_DIR, DOCUMENT_SETTINGS
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import multiprocessing as mp
+import os
+import re
+import threading
+
+# Importi in formato italiano, con simbolo prima o dopo: "€ 1.234,56" / "1.234,56 EUR"
+COST_RE = re.compile(
+    r'(?:€|EUR)\s*(\d{1,3}(?:\.\d{3})*(?:,\d{1,2})?)'
+    r'|(\d{1,3}(?:\.\d{3})*(?:,\d{1,2})?)\s*(?:€|EUR)',
+    re.IGNORECASE
+)
+TOTAL_RE = re.compile(r'\b(totale|total|importo complessivo)\b', re.IGNORECASE)
+
+
+def parse_euro(value: str) -> float:
+    """Converte '1.234,56' in 1234.56"""
+    return float(value.replace('.', '').replace(',', '.'))
+
+
+def parse_damage_report(path: str) -> Dict:
+    """
+    Estrae voci di danno e costi stimati da una perizia PDF (eseguita nel process pool)
+    Args:
+        path: Percorso locale del PDF
+    Returns:
+        Dict: damage_items (descrizione, costo), damage_cost totale e riepilogo damages
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+    items: List[Dict] = []
+    declared_total: Optional[float] = None
+    for line in text.splitlines():
+        match = COST_RE.search(line)
+        if not match:
+            continue
+        cost = parse_euro(match.group(1) or match.group(2))
+        description = ' '.join(line[:match.start()].split()).strip(' .:-€')
+
+        if TOTAL_RE.search(description):
+            declared_total = cost
+        elif description:
+            items.append({'description': description, 'cost': cost})
+
+    total = declared_total if declared_total is not None else round(sum(item['cost'] for item in items), 2)
+    summary = ', '.join(item['description'] for item in items[:5])
+    if len(items) > 5:
+        summary += f" (+{len(items) - 5})"
+
+    return {
+        'damage_items': items,
+        'damage_cost': total,
+        'damages': summary or None
+    }
+
+
+class DamageReportParser:
+    """Analizza le perizie in un process pool, memorizzando i risultati per hash del documento"""
+
+    def __init__(self, max_workers: int = None, directory: str = None,
+                 log: Callable[..., None] = None):
+        """
+        Args:
+            max_workers: Analisi in parallelo
+            directory: Directory dei risultati memorizzati (default DATA_DIR/damage_reports)
+            log: Log dello scraper (es. scraper.log) per errori e ripieghi
+        """
+        self.directory = directory or os.path.join(DATA_DIR, 'damage_reports')
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_workers = max_workers or DOCUMENT_SETTINGS['parse_workers']
+        self.log = log
+        if mp.current_process().daemon:
+            # I processi dei portali (ConcurrentRunner) sono daemon e non possono avere figli
+            self._log("Analisi perizie in thread: il processo del portale non può avviare un process pool", 'info')
+            self.executor = self._thread_executor()
+        else:
+            # spawn: il processo Streamlit è multi-thread, il fork non è sicuro
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context('spawn')
+            )
+        self.stats = {'parsed': 0, 'memoized': 0, 'failed': 0}
+        self._memo: Dict[str, Dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._targets: List[Tuple[Dict, str]] = []
+        self._lock = threading.RLock()
+
+    def _thread_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='damage-report')
+
+    def _log(self, message: str, level: str = 'info') -> None:
+        if self.log:
+            self.log(message, level)
+        else:
+            print(message)
+
+    def _submit_parse(self, path: str) -> Future:
+        try:
+            return self.executor.submit(parse_damage_report, path)
+        except Exception as e:
+            if isinstance(self.executor, ThreadPoolExecutor):
+                raise
+            # Process pool non avviabile o rotto: le analisi proseguono in thread
+            self._log(f"Process pool delle perizie non disponibile, analisi in thread: {str(e)}", 'error')
+            self.executor.shutdown(wait=False)
+            self.executor = self._thread_executor()
+            return self.executor.submit(parse_damage_report, path)
+
+    def _memo_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _load_memo(self, digest: str) -> Optional[Dict]:
+        if digest in self._memo:
+            return self._memo[digest]
+        try:
+            with open(self._memo_path(digest), 'r', encoding='utf-8') as f:
+                self._memo[digest] = json.load(f)
+                return self._memo[digest]
+        except (OSError, ValueError):
+            return None
+
+    def _save_memo(self, digest: str, result: Dict) -> None:
+        self._memo[digest] = result
+        tmp_path = f"{self._memo_path(digest)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, self._memo_path(digest))
+
+    def submit(self, vehicle: Dict, entry: Dict) -> Optional[Future]:
+        """
+        Accoda l'analisi della perizia di un veicolo; i campi estratti vengono scritti sul veicolo
+        Args:
+            vehicle: Veicolo da aggiornare con damage_items, damage_cost e damages
+            entry: Voce della DocumentCache (sha256 e path)
+        Returns:
+            Optional[Future]: Future dell'analisi, None se il risultato era già memorizzato
+        """
+        digest = entry['sha256']
+        with self._lock:
+            result = self._load_memo(digest)
+            if result is None:
+                future = self._futures.get(digest)
+                if future is None:
+                    future = self._submit_parse(entry['path'])
+                    future.add_done_callback(lambda done: self._on_parsed(digest, done))
+                    self._futures[digest] = future
+                self._targets.append((vehicle, digest))
+            else:
+                self.stats['memoized'] += 1
+
+        if result is not None:
+            vehicle.update(result)
+            return None
+
+        future.add_done_callback(lambda done: self._apply(vehicle, digest))
+        return future
+
+    def _on_parsed(self, digest: str, future: Future) -> None:
+        with self._lock:
+            try:
+                self._save_memo(digest, future.result())
+                self.stats['parsed'] += 1
+            except Exception as e:
+                self._log(f"Errore analisi perizia {digest[:12]}: {str(e)}", 'error')
+                self.stats['failed'] += 1
+
+    def _apply(self, vehicle: Dict, digest: str) -> None:
+        with self._lock:
+            result = self._memo.get(digest)
+        if result:
+            vehicle.update(result)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Attende le analisi in corso
+        Returns:
+            bool: True se tutte le analisi sono terminate entro il timeout
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+            targets = list(self._targets)
+        _, pending = wait_futures(futures, timeout=timeout)
+
+        # Le callback possono girare dopo il ritorno di wait: i risultati pronti vengono applicati qui
+        for vehicle, digest in targets:
+            future = self._futures[digest]
+            if future.done() and not future.exception():
+                vehicle.update(future.result())
+        return not pending
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,210 @@
+# scrapers/diagnostics.py
+from config.settings import DATA_DIR, DIAGNOSTICS_SETTINGS
+from typing import Dict, List, Optional
+import base64
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+# Livelli: nessuna cattura, solo sugli errori, ogni step
+LEVELS = ('off', 'on_error', 'full')
+
+
+class DiagnosticsRecorder:
+    """
+    Catture diagnostiche (screenshot ed eventuale HTML) scritte da un thread in background
+    in un ring buffer su disco con limiti di numero e dimensione
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, level: str = None, directory: str = None, html_snapshots: bool = None,
+                 max_files: int = None, max_mb: int = None):
+        self.level = level or DIAGNOSTICS_SETTINGS['level']
+        if self.level not in LEVELS:
+            self.level = 'on_error'
+        self.directory = directory or os.path.join(DATA_DIR, 'diagnostics')
+        self.html_snapshots = DIAGNOSTICS_SETTINGS['html_snapshots'] if html_snapshots is None else html_snapshots
+        self.max_files = max_files or DIAGNOSTICS_SETTINGS['max_files']
+        self.max_bytes = (max_mb or DIAGNOSTICS_SETTINGS['max_mb']) * 1024 * 1024
+        self.stats = {'captured': 0, 'dropped': 0, 'failed': 0, 'evicted': 0}
+        self._queue = queue.Queue(maxsize=DIAGNOSTICS_SETTINGS['queue_size'])
+        self._writer = None
+
+    @classmethod
+    def get_instance(cls) -> 'DiagnosticsRecorder':
+        """Recorder del processo, con un solo thread di scrittura"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def flush_pending(cls, timeout: float = 5) -> None:
+        """Scrive le catture in coda del recorder del processo, se esiste"""
+        if cls._instance is not None:
+            cls._instance.flush(timeout)
+
+    def enabled(self, error: bool = False) -> bool:
+        return self.level == 'full' or (self.level == 'on_error' and error)
+
+    def capture(self, driver, portal: str, name: str, error: bool = False) -> Optional[str]:
+        """
+        Accoda una cattura della pagina corrente
+        Args:
+            driver: WebDriver da cui catturare
+            portal: Portale (es. 'clickar')
+            name: Step o errore (es. 'pre_login', 'submit_error')
+            error: True per le catture di errore, le sole registrate con livello 'on_error'
+        Returns:
+            Optional[str]: ID della cattura, None se non registrata
+        """
+        if not self.enabled(error):
+            return None
+
+        # Il driver non è thread-safe: la cattura avviene qui, decodifica e scrittura nel thread
+        screenshot = driver.execute_cdp_cmd(
+            'Page.captureScreenshot', {'format': 'jpeg', 'quality': DIAGNOSTICS_SETTINGS['jpeg_quality']}
+        ).get('data')
+        html = driver.page_source if self.html_snapshots else None
+
+        capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}_{portal}_{name}_{uuid.uuid4().hex[:6]}"
+        meta = {
+            'id': capture_id,
+            'portal': portal,
+            'name': name,
+            'error': error,
+            'url': driver.current_url,
+            'created_at': time.time()
+        }
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((meta, screenshot, html))
+        except queue.Full:
+            # Meglio perdere una cattura che rallentare lo scraping
+            self.stats['dropped'] += 1
+            return None
+        return capture_id
+
+    def _ensure_writer(self) -> None:
+        with self._instance_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='diagnostics', daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            meta, screenshot, html = self._queue.get()
+            try:
+                self._write(meta, screenshot, html)
+                self.stats['captured'] += 1
+                self._evict()
+            except Exception as e:
+                print(f"Errore scrittura diagnostica {meta['id']}: {str(e)}")
+                self.stats['failed'] += 1
+            finally:
+                self._queue.task_done()
+
+    def _write(self, meta: Dict, screenshot: Optional[str], html: Optional[str]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, meta['id'])
+        if screenshot:
+            with open(f"{base}.jpg", 'wb') as f:
+                f.write(base64.b64decode(screenshot))
+            meta['image'] = f"{meta['id']}.jpg"
+        if html:
+            with open(f"{base}.html", 'w', encoding='utf-8') as f:
+                f.write(html)
+            meta['html'] = f"{meta['id']}.html"
+        # Metadati per ultimi: una cattura elencata ha sempre i suoi file completi
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def _evict(self) -> None:
+        """Elimina le catture più vecchie oltre i limiti del ring buffer"""
+        captures = self.list_captures(directory=self.directory)
+        sizes = [self._capture_size(meta) for meta in captures]
+        total = sum(sizes)
+        count = len(captures)
+        # list_captures restituisce prima le più recenti
+        for meta, size in zip(reversed(captures), reversed(sizes)):
+            if count <= self.max_files and total <= self.max_bytes:
+                break
+            for key in ('json', 'image', 'html'):
+                filename = f"{meta['id']}.json" if key == 'json' else meta.get(key)
+                if filename:
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except OSError:
+                        pass
+            count -= 1
+            total -= size
+            self.stats['evicted'] += 1
+
+    def _capture_size(self, meta: Dict) -> int:
+        size = 0
+        for filename in (f"{meta['id']}.json", meta.get('image'), meta.get('html')):
+            if filename:
+                try:
+                    size += os.path.getsize(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+        return size
+
+    def flush(self, timeout: float = 5) -> bool:
+        """
+        Attende la scrittura delle catture in coda
+        Returns:
+            bool: True se la coda è stata svuotata entro il timeout
+        """
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    @staticmethod
+    def list_captures(errors_only: bool = False, since: float = None, directory: str = None) -> List[Dict]:
+        """
+        Elenca le catture su disco, dalla più recente
+        Args:
+            errors_only: Solo catture di errore
+            since: Solo catture successive a questo timestamp
+        Returns:
+            List[Dict]: Metadati delle catture (senza immagini)
+        """
+        directory = directory or os.path.join(DATA_DIR, 'diagnostics')
+        captures = []
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith('.json')]
+        except OSError:
+            return []
+        for name in names:
+            try:
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if errors_only and not meta.get('error'):
+                continue
+            if since and meta.get('created_at', 0) < since:
+                continue
+            captures.append(meta)
+        return sorted(captures, key=lambda meta: meta.get('created_at', 0), reverse=True)
+
+    @staticmethod
+    def load_file(meta: Dict, key: str = 'image', directory: str = None) -> Optional[bytes]:
+        """Legge su richiesta l'immagine ('image') o l'HTML ('html') di una cattura"""
+        filename = meta.get(key)
+        if not filename:
+            return None
+        try:
+            with open(os.path.join(directory or os.path.join(DATA_DIR, 'diagnostics'), filename), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
@@ -0,0 +1,219 @@
+# scrapers/documents.py
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from scrapers.http_client import HttpClient
+from config.settings import DATA_DIR, DOCUMENT_SETTINGS
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class DocumentCache:
+    """Cache su disco indirizzata per contenuto (sha256), con indice URL -> validatori HTTP"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.path.join(DATA_DIR, 'documents')
+        self.index_path = os.path.join(self.directory, 'index.json')
+        os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Cerca un documento già scaricato
+        Returns:
+            Optional[Dict]: Voce dell'indice (sha256, path, etag, last_modified) o None
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        if entry and os.path.exists(self.object_path(entry['sha256'])):
+            return {**entry, 'path': self.object_path(entry['sha256'])}
+        return None
+
+    def store(self, url: str, content: bytes, etag: str = None, last_modified: str = None,
+              content_type: str = None) -> Dict:
+        """
+        Salva un documento; contenuti identici da URL diversi occupano un solo file
+        Returns:
+            Dict: Voce dell'indice con il percorso locale
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        entry = {
+            'sha256': digest,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'size': len(content),
+            'fetched_at': time.time()
+        }
+        with self._lock:
+            self._index[url] = entry
+            self._save_index()
+        return {**entry, 'path': path}
+
+
+class DocumentFetcher:
+    """Scarica in background le perizie dei veicoli con una sessione HTTP autenticata condivisa"""
+
+    def __init__(self, http: HttpClient, cache: DocumentCache = None, max_workers: int = None,
+                 on_document: Callable[[Dict, str, Dict], None] = None, log: Callable[..., None] = None):
+        """
+        Args:
+            http: Client HTTP autenticato dedicato ai download
+            cache: Cache su disco (default in DATA_DIR/documents)
+            max_workers: Download paralleli
+            on_document: Callback(veicolo, tipo documento, voce cache) a documento disponibile
+            log: Log dello scraper (es. scraper.log) per gli errori
+        """
+        self.http = http
+        self.cache = cache or DocumentCache()
+        self.on_document = on_document
+        self.log = log
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or DOCUMENT_SETTINGS['max_workers'],
+            thread_name_prefix='documents'
+        )
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'cached': 0, 'failed': 0}
+        self._futures: Dict[str, Future] = {}
+        self._subscribers: Dict[str, List[Tuple[Dict, str]]] = {}
+        self._results: Dict[str, Optional[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> Optional[Dict]:
+        """
+        Scarica un documento se non già in cache
+        Returns:
+            Optional[Dict]: Voce della cache con il percorso locale, None se il download fallisce
+        """
+        entry = self.cache.lookup(url)
+        if entry and not (entry.get('etag') or entry.get('last_modified')):
+            # Nessun validatore: il documento in cache è considerato definitivo
+            self._count('cached')
+            return entry
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self.http.get(url, headers=headers)
+            if response.status_code == 304 and entry:
+                self._count('not_modified')
+                return entry
+
+            stored = self.cache.store(
+                url,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                content_type=response.headers.get('Content-Type')
+            )
+            self._count('downloaded')
+            return stored
+        except Exception as e:
+            print(f"Errore download documento {url}: {str(e)}")
+            self._count('failed')
+            return entry
+
+    def submit(self, vehicle: Dict) -> List[Future]:
+        """
+        Accoda il download dei documenti di un veicolo senza bloccare lo scraping;
+        a download completato il percorso locale viene scritto in vehicle['documents_local']
+        Args:
+            vehicle: Veicolo con il dizionario 'documents' (tipo documento -> URL)
+        Returns:
+            List[Future]: Future dei download accodati
+        """
+        futures = []
+        for kind, url in (vehicle.get('documents') or {}).items():
+            if not url:
+                continue
+            ready = False
+            with self._lock:
+                # Lo stesso URL viene scaricato una sola volta anche se richiesto più volte
+                if url in self._results:
+                    ready = True
+                elif url in self._subscribers:
+                    self._subscribers[url].append((vehicle, kind))
+                else:
+                    self._subscribers[url] = [(vehicle, kind)]
+                    self._futures[url] = self.executor.submit(self._fetch_and_attach, url)
+                future = self._futures[url]
+            if ready:
+                self._attach(vehicle, kind, self._results[url])
+            futures.append(future)
+        return futures
+
+    def _fetch_and_attach(self, url: str) -> Optional[Dict]:
+        entry = self.fetch(url)
+        with self._lock:
+            self._results[url] = entry
+            subscribers = self._subscribers.pop(url, [])
+        # Il future termina solo dopo aver aggiornato tutti i veicoli interessati
+        for vehicle, kind in subscribers:
+            self._attach(vehicle, kind, entry)
+        return entry
+
+    def _attach(self, vehicle: Dict, kind: str, entry: Optional[Dict]) -> None:
+        if not entry:
+            return
+        vehicle.setdefault('documents_local', {})[kind] = entry['path']
+        if self.on_document:
+            try:
+                self.on_document(vehicle, kind, entry)
+            except Exception as e:
+                message = f"Errore elaborazione documento {kind}: {str(e)}"
+                if self.log:
+                    self.log(message, 'error')
+                else:
+                    print(message)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Attende i download in corso
+        Returns:
+            bool: True se tutti i download sono terminati entro il timeout
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+        _, pending = wait_futures(futures, timeout=timeout)
+        return not pending
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Chiude l'executor; con wait=False i download accodati proseguono in background"""
+        self.executor.shutdown(wait=wait)
+        if wait:
+            self.http.close()
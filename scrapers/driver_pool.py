@@ -0,0 +1,264 @@
+# scrapers/driver_pool.py
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from config.settings import DRIVER_POOL_SETTINGS, PORTAL_URLS
+from typing import Callable, Optional
+from urllib.parse import urlparse
+import atexit
+import threading
+import time
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+class PooledChrome(webdriver.Chrome):
+    """Driver Chrome che conta i caricamenti pagina per il riciclo nel pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_loads = 0
+        self.created_at = time.time()
+
+    def get(self, url: str) -> None:
+        self.page_loads += 1
+        super().get(url)
+
+
+def build_chrome_options(headless: bool = True) -> Options:
+    """
+    Costruisce le opzioni Chromium comuni a tutti gli scraper
+    Args:
+        headless: Esegue Chromium senza interfaccia
+    Returns:
+        Options: Opzioni Chrome configurate
+    """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless=new')
+
+    # Opzioni base necessarie
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+
+    # Opzioni anti-detection
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+
+    # Eventi Network di DevTools per le attese di rete inattiva
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Per Chromium su Debian/Ubuntu
+    chrome_options.binary_location = '/usr/bin/chromium'
+    return chrome_options
+
+
+def create_chrome_driver(headless: bool = True) -> PooledChrome:
+    """
+    Avvia un nuovo Chromium con il chromedriver di sistema
+    Args:
+        headless: Esegue Chromium senza interfaccia
+    Returns:
+        PooledChrome: Driver avviato
+    """
+    service = Service('/usr/bin/chromedriver')
+    return PooledChrome(service=service, options=build_chrome_options(headless))
+
+
+class DriverPool:
+    """Pool di driver Chromium pre-avviati, verificati e riciclati"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, headless: bool = True, size: int = None, max_page_loads: int = None,
+                 max_memory_mb: int = None, acquire_timeout: int = None):
+        self.headless = headless
+        self.size = size or DRIVER_POOL_SETTINGS['size']
+        self.max_page_loads = max_page_loads or DRIVER_POOL_SETTINGS['max_page_loads']
+        self.max_memory_mb = max_memory_mb or DRIVER_POOL_SETTINGS['max_memory_mb']
+        self.acquire_timeout = acquire_timeout or DRIVER_POOL_SETTINGS['acquire_timeout']
+
+        self._idle = []
+        self._leased = set()
+        self._starting = 0
+        self._warm = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def get_instance(cls, headless: bool = True) -> 'DriverPool':
+        """
+        Restituisce il pool del processo per la modalità richiesta
+        Returns:
+            DriverPool: Istanza unica per valore di headless
+        """
+        with cls._instances_lock:
+            if headless not in cls._instances:
+                cls._instances[headless] = cls(headless=headless)
+            return cls._instances[headless]
+
+    @property
+    def total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def warm_up(self) -> None:
+        """Avvia in background i driver mancanti fino alla dimensione del pool"""
+        with self._cond:
+            self._warm = True
+            missing = self.size - self.total
+            self._starting += max(missing, 0)
+
+        for _ in range(max(missing, 0)):
+            threading.Thread(target=self._start_driver, name='driver-pool-warmup', daemon=True).start()
+
+    def _start_driver(self) -> None:
+        driver = None
+        try:
+            driver = create_chrome_driver(self.headless)
+        except Exception as e:
+            print(f"Errore avvio driver nel pool: {str(e)}")
+
+        with self._cond:
+            self._starting -= 1
+            if driver and not self._closed:
+                self._idle.append(driver)
+            elif driver:
+                self._quit(driver)
+            self._cond.notify_all()
+
+    def acquire(self) -> PooledChrome:
+        """
+        Prende in prestito un driver sano dal pool, avviandone uno se necessario
+        Returns:
+            PooledChrome: Driver pronto all'uso
+        """
+        deadline = time.time() + self.acquire_timeout
+        while True:
+            with self._cond:
+                if not self._idle and self._starting and self.total >= self.size:
+                    # Un driver è in avvio: attende invece di avviarne un altro
+                    self._cond.wait(max(deadline - time.time(), 0))
+                driver = self._idle.pop() if self._idle else None
+                if driver:
+                    self._leased.add(driver)
+
+            if driver is None:
+                driver = create_chrome_driver(self.headless)
+                with self._cond:
+                    self._leased.add(driver)
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+
+            # Driver non più valido: scartato e sostituito
+            with self._cond:
+                self._leased.discard(driver)
+            self._quit(driver)
+            if time.time() > deadline:
+                raise TimeoutError("Nessun driver disponibile nel pool")
+
+    def release(self, driver: PooledChrome, log: Optional[Callable[..., None]] = None) -> None:
+        """
+        Restituisce un driver al pool, ripulendolo o riciclandolo
+        Args:
+            driver: Driver ottenuto con acquire()
+            log: Log dello scraper (es. scraper.log) per gli errori di reset
+        """
+        recycle = self._needs_recycle(driver) or not self._reset(driver, log)
+
+        with self._cond:
+            self._leased.discard(driver)
+            if recycle or self._closed or len(self._idle) >= self.size:
+                keep = False
+            else:
+                self._idle.append(driver)
+                keep = True
+            self._cond.notify_all()
+
+        if not keep:
+            self._quit(driver)
+            if self._warm and not self._closed:
+                self.warm_up()
+
+    def shutdown(self) -> None:
+        """Chiude tutti i driver del pool"""
+        with self._cond:
+            self._closed = True
+            drivers = self._idle + list(self._leased)
+            self._idle = []
+            self._leased.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+    def _is_healthy(self, driver: PooledChrome) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _needs_recycle(self, driver: PooledChrome) -> bool:
+        if getattr(driver, 'page_loads', 0) >= self.max_page_loads:
+            return True
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+            metrics = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+            heap = next((m['value'] for m in metrics if m['name'] == 'JSHeapTotalSize'), 0)
+            return heap / (1024 * 1024) >= self.max_memory_mb
+        except Exception:
+            return True
+
+    def _reset(self, driver: PooledChrome, log: Optional[Callable[..., None]] = None) -> bool:
+        """Azzera cookie, storage, finestre e frame tra un prestito e l'altro"""
+        try:
+            origins = {f"{urlparse(url).scheme}://{urlparse(url).netloc}" for url in PORTAL_URLS.values()}
+            current = urlparse(driver.current_url)
+            if current.scheme in ('http', 'https'):
+                origins.add(f"{current.scheme}://{current.netloc}")
+
+            # Chiude le schede aperte durante il prestito
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+
+            # Svuota il performance log del prestito precedente
+            driver.get_log('performance')
+
+            # Il profilo di blocco dipende dal portale del prestito
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in origins:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'local_storage,session_storage,indexeddb,service_workers'
+                })
+            # Navigazione diretta: non conta come caricamento pagina
+            webdriver.Chrome.get(driver, 'about:blank')
+            return True
+        except Exception as e:
+            message = f"Errore reset driver, verrà riciclato: {str(e)}"
+            if log:
+                log(message, 'warning')
+            else:
+                print(message)
+            return False
+
+    def _quit(self, driver: PooledChrome) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in list(DriverPool._instances.values()):
+        pool.shutdown()
@@ -0,0 +1,251 @@
+# scrapers/events.py
+from config.settings import DATA_DIR, EVENT_SETTINGS
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+import json
+import os
+import threading
+import time
+import uuid
+import streamlit as st
+
+# Ordine dei livelli: gli eventi sotto il livello minimo di un sink vengono ignorati
+LEVELS = {'debug': 10, 'info': 20, 'success': 25, 'warning': 30, 'error': 40}
+
+
+@dataclass
+class ScraperEvent:
+    """Evento pubblicato da uno scraper"""
+    kind: str                   # 'log' o 'progress'
+    portal: str
+    message: str = ''
+    level: str = 'info'
+    data: Dict = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+    run_id: Optional[str] = None  # Ricerca che ha avviato lo scraper (riquadro della sessione)
+
+    @property
+    def key(self) -> Optional[tuple]:
+        """Chiave di coalescenza: gli eventi progress della stessa fase si sostituiscono"""
+        if self.kind == 'progress':
+            return self.portal, self.data.get('phase')
+        return None
+
+
+def script_run_ctx():
+    """Contesto della sessione Streamlit del thread corrente, None fuori da Streamlit"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except Exception:
+        return None
+
+
+class EventSink:
+    """Destinazione degli eventi, ricevuti a blocchi"""
+    min_level = 'debug'
+
+    def accepts(self, event: ScraperEvent) -> bool:
+        return LEVELS.get(event.level, 20) >= LEVELS[self.min_level]
+
+    def write(self, events: List[ScraperEvent]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LoguruSink(EventSink):
+    """Inoltra gli eventi a loguru (stderr o handler configurati dall'applicazione)"""
+
+    def __init__(self, min_level: str = None):
+        from loguru import logger
+        self.logger = logger
+        self.min_level = min_level or EVENT_SETTINGS['loguru_level']
+
+    def write(self, events: List[ScraperEvent]) -> None:
+        for event in events:
+            if self.accepts(event):
+                self.logger.bind(portal=event.portal, **event.data).log(
+                    event.level.upper(), f"[{event.portal}] {event.message}"
+                )
+
+
+class JsonlSink(EventSink):
+    """Accoda gli eventi in un file JSONL, una riga per evento"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DATA_DIR, 'events.jsonl')
+        self._lock = threading.Lock()
+
+    def write(self, events: List[ScraperEvent]) -> None:
+        lines = ''.join(json.dumps(asdict(event), default=str) + '\n' for event in events)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+class QueueSink(EventSink):
+    """Inoltra gli eventi alla coda del ConcurrentRunner (processi worker -> pagina Streamlit)"""
+
+    def __init__(self, queue, source_name: str, min_level: str = 'info'):
+        self.queue = queue
+        self.source_name = source_name
+        self.min_level = min_level
+
+    def write(self, events: List[ScraperEvent]) -> None:
+        payload = [asdict(event) for event in events if self.accepts(event)]
+        if payload:
+            self.queue.put(('events', self.source_name, payload))
+
+
+class StreamlitSink(EventSink):
+    """
+    Riquadro Streamlit che coalesce gli eventi: ultimo avanzamento per fase, ultimi messaggi ed errori,
+    ridisegnato al più una volta ogni refresh_interval e solo dal thread della sessione.
+    Il bus è del processo: il riquadro accetta solo gli eventi con il proprio run_id, da assegnare
+    agli scraper della ricerca (BaseScraper.configure(run_id=...))
+    """
+
+    def __init__(self, placeholder, refresh_interval: float = None, max_lines: int = None,
+                 min_level: str = 'info', run_id: str = None):
+        self.placeholder = placeholder
+        self.run_id = run_id or uuid.uuid4().hex
+        self.refresh_interval = refresh_interval or EVENT_SETTINGS['streamlit_refresh']
+        self.max_lines = max_lines or EVENT_SETTINGS['streamlit_lines']
+        self.min_level = min_level
+        self.progress: Dict[tuple, ScraperEvent] = {}
+        self.lines: List[ScraperEvent] = []
+        self.errors: List[ScraperEvent] = []
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+        # Il bus è del processo: si disegna solo dal thread della sessione che ha creato il riquadro
+        self._ctx = script_run_ctx()
+
+    def accepts(self, event: ScraperEvent) -> bool:
+        # Gli eventi delle ricerche di altre sessioni restano nei rispettivi riquadri
+        return event.run_id == self.run_id and super().accepts(event)
+
+    def write(self, events: List[ScraperEvent]) -> None:
+        with self._lock:
+            for event in events:
+                if not self.accepts(event):
+                    continue
+                if event.key:
+                    self.progress[event.key] = event
+                elif event.level == 'error':
+                    self.errors.append(event)
+                else:
+                    self.lines.append(event)
+            self.lines = self.lines[-self.max_lines:]
+            self.errors = self.errors[-self.max_lines:]
+        if time.time() - self._last_render >= self.refresh_interval:
+            self.render()
+
+    def render(self) -> None:
+        ctx = script_run_ctx()
+        if ctx is None or ctx is not self._ctx:
+            return
+        with self._lock:
+            progress = list(self.progress.values())
+            lines = list(self.lines)
+            errors = list(self.errors)
+        self._last_render = time.time()
+
+        with self.placeholder.container():
+            for event in progress:
+                line = f"**{event.portal}** · {event.message}"
+                total = event.data.get('total')
+                if total:
+                    st.progress(min(event.data.get('current', 0) / total, 1.0), text=line)
+                else:
+                    st.markdown(line)
+            for event in errors:
+                st.error(f"{event.portal}: {event.message}")
+            if lines:
+                st.text('\n'.join(f"[{event.portal}] {event.message}" for event in lines))
+
+    def close(self) -> None:
+        self.render()
+
+
+class EventBus:
+    """
+    Bus degli eventi degli scraper: gli eventi vengono accumulati e consegnati ai sink a blocchi,
+    al più ogni flush_interval secondi; gli avanzamenti della stessa fase si coalescono
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, sinks: List[EventSink] = None, flush_interval: float = None, max_batch: int = None):
+        self.sinks: List[EventSink] = list(sinks or [])
+        self.flush_interval = EVENT_SETTINGS['flush_interval'] if flush_interval is None else flush_interval
+        self.max_batch = max_batch or EVENT_SETTINGS['max_batch']
+        self.stats = {'published': 0, 'coalesced': 0, 'delivered': 0}
+        self._buffer: List[ScraperEvent] = []
+        self._positions: Dict[tuple, int] = {}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'EventBus':
+        """Bus del processo con i sink di default (loguru e JSONL)"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                sinks = []
+                if EVENT_SETTINGS['loguru']:
+                    try:
+                        sinks.append(LoguruSink())
+                    except ImportError:
+                        pass
+                if EVENT_SETTINGS['jsonl']:
+                    sinks.append(JsonlSink())
+                cls._instance = cls(sinks)
+            return cls._instance
+
+    def subscribe(self, sink: EventSink) -> None:
+        with self._lock:
+            self.sinks.append(sink)
+
+    def unsubscribe(self, sink: EventSink) -> None:
+        self.flush()
+        with self._lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+
+    def publish(self, event: ScraperEvent) -> None:
+        with self._lock:
+            self.stats['published'] += 1
+            position = self._positions.get(event.key) if event.key else None
+            if position is not None:
+                # Avanzamento ancora in coda per la stessa fase: vale solo l'ultimo
+                self._buffer[position] = event
+                self.stats['coalesced'] += 1
+            else:
+                if event.key:
+                    self._positions[event.key] = len(self._buffer)
+                self._buffer.append(event)
+            due = (
+                len(self._buffer) >= self.max_batch
+                or event.level == 'error'
+                or time.time() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Consegna ai sink gli eventi accumulati"""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            self._positions = {}
+            self._last_flush = time.time()
+            sinks = list(self.sinks)
+        if not events:
+            return
+        for sink in sinks:
+            try:
+                sink.write(events)
+            except Exception as e:
+                print(f"Errore in {type(sink).__name__}: {str(e)}")
+        self.stats['delivered'] += len(events)
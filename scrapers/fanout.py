@@ -0,0 +1,100 @@
+# scrapers/fanout.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+import queue
+import threading
+
+
+class FanOutExecutor:
+    """
+    Distribuisce task su un numero limitato di worker (schede, driver o sessioni HTTP)
+    e restituisce i risultati appena ogni task termina
+    """
+
+    def __init__(self, max_workers: int, worker_factory: Callable[[], Any],
+                 worker_release: Optional[Callable[[Any], None]] = None):
+        """
+        Args:
+            max_workers: Numero massimo di worker in parallelo
+            worker_factory: Crea un worker (es. uno scraper con driver già autenticato)
+            worker_release: Rilascia un worker a fine lavoro
+        """
+        self.max_workers = max(1, max_workers)
+        self.worker_factory = worker_factory
+        self.worker_release = worker_release
+        self._idle = queue.Queue()
+        self._created = []
+        self._lock = threading.Lock()
+
+    def _acquire_worker(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        # Ogni thread del pool crea al più un worker: il numero resta limitato
+        worker = self.worker_factory()
+        with self._lock:
+            self._created.append(worker)
+        return worker
+
+    def _run(self, fn: Callable, item: Any) -> Any:
+        worker = self._acquire_worker()
+        try:
+            return fn(worker, item)
+        finally:
+            self._idle.put(worker)
+
+    def map_unordered(self, fn: Callable[[Any, Any], Any],
+                      items: Iterable) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Esegue fn(worker, item) per ogni item
+        Yields:
+            Tuple: (item, risultato, eccezione) nell'ordine di completamento
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fanout') as executor:
+                futures = {executor.submit(self._run, fn, item): item for item in items}
+                for future in as_completed(futures):
+                    try:
+                        yield futures[future], future.result(), None
+                    except Exception as e:
+                        yield futures[future], None, e
+        finally:
+            self.close()
+
+    def map_ordered(self, fn: Callable[[Any, Any], Any],
+                    items: Iterable) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Esegue fn(worker, item) per ogni item; i worker restano disponibili per chiamate
+        successive fino a close()
+        Yields:
+            Tuple: (item, risultato, eccezione) nell'ordine degli item, ognuno appena
+            terminati lui e tutti i precedenti
+        """
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)),
+                                thread_name_prefix='fanout') as executor:
+            futures = [executor.submit(self._run, fn, item) for item in items]
+            try:
+                for item, future in zip(items, futures):
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+            finally:
+                # Consumatore interrotto: i task non ancora partiti vengono annullati
+                for future in futures:
+                    future.cancel()
+
+    def close(self) -> None:
+        """Rilascia tutti i worker creati"""
+        with self._lock:
+            workers, self._created = self._created, []
+        if self.worker_release:
+            for worker in workers:
+                try:
+                    self.worker_release(worker)
+                except Exception as e:
+                    print(f"Errore rilascio worker: {str(e)}")
@@ -0,0 +1,133 @@
+# scrapers/http_client.py
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config.settings import HTTP_SETTINGS
+from scrapers.resilience import PortalGuard
+from typing import Dict, List, Optional
+import lxml.html
+import requests
+
+# Indizi di una pagina che mostra contenuti solo via JavaScript
+JS_ONLY_MARKERS = (
+    'enable javascript',
+    'abilita javascript',
+    'javascript is required',
+    'javascript non è abilitato'
+)
+
+
+class HttpClient:
+    """Sessione HTTP keep-alive che riusa i cookie e lo user agent del browser autenticato"""
+
+    def __init__(self, user_agent: str = None, pool_size: int = None, timeout: int = None,
+                 guard: PortalGuard = None):
+        self.timeout = timeout or HTTP_SETTINGS['timeout']
+        pool_size = pool_size or HTTP_SETTINGS['pool_size']
+        # Con il guard del portale i retry avvengono lì, con backoff e circuit breaker
+        self.guard = guard
+
+        self.session = requests.Session()
+        # Senza status_forcelist i 5xx arrivano come risposta e raise_for_status solleva un HTTPError
+        # con il codice, che il guard riconosce come transitorio
+        retries = Retry(
+            total=0 if guard else HTTP_SETTINGS['max_retries'],
+            backoff_factor=0.5,
+            status_forcelist=None if guard else [502, 503, 504],
+            allowed_methods=['GET', 'HEAD']
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'it-IT,it;q=0.9,en;q=0.8'
+        })
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs) -> 'HttpClient':
+        """
+        Crea un client con la sessione autenticata del browser
+        Args:
+            driver: WebDriver dopo il login
+        Returns:
+            HttpClient: Client con cookie e user agent del browser
+        """
+        client = cls(user_agent=driver.execute_script("return navigator.userAgent"), **kwargs)
+        client.load_cookies(driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', []))
+        return client
+
+    def load_cookies(self, cookies: List[Dict]) -> None:
+        """Importa cookie in formato CDP/Selenium nella sessione requests"""
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False)
+            )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET con timeout di default; solleva eccezione sugli status di errore"""
+        kwargs.setdefault('timeout', self.timeout)
+        if self.guard:
+            return self.guard.call(self._get, url, retry_if=is_transient, **kwargs)
+        return self._get(url, **kwargs)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        response = self.session.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def get_html(self, url: str, required_xpath: str = None) -> Optional[lxml.html.HtmlElement]:
+        """
+        Scarica e analizza una pagina HTML
+        Args:
+            url: URL assoluto della pagina
+            required_xpath: XPath che deve trovare almeno un nodo nella pagina renderizzata dal server
+        Returns:
+            Optional[HtmlElement]: Albero con link assoluti, None se la pagina richiede JavaScript
+        """
+        response = self.get(url)
+        tree = lxml.html.fromstring(response.content, base_url=response.url)
+        tree.make_links_absolute(response.url, resolve_base_href=True)
+
+        if self.is_js_only(tree, required_xpath):
+            return None
+        return tree
+
+    @staticmethod
+    def is_js_only(tree: lxml.html.HtmlElement, required_xpath: str = None) -> bool:
+        """Rileva pagine il cui contenuto viene generato solo lato client"""
+        if required_xpath and not tree.xpath(required_xpath):
+            return True
+
+        noscript = ' '.join(node.text_content() for node in tree.xpath('//noscript')).lower()
+        if any(marker in noscript for marker in JS_ONLY_MARKERS):
+            body = tree.find('body')
+            text = body.text_content().strip() if body is not None else ''
+            return len(text) < 200
+        return False
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def is_transient(error: Exception) -> bool:
+    """Errori per cui ha senso ripetere la richiesta: rete, timeout, 429 e 5xx"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+
+def class_xpath(class_name: str) -> str:
+    """Condizione XPath equivalente al selettore CSS .class_name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def node_text(node) -> str:
+    """Testo del nodo con spazi normalizzati, come .text di Selenium"""
+    return ' '.join(node.text_content().split()) if node is not None else ''
@@ -0,0 +1,169 @@
+# scrapers/pipeline.py
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+import time
+import pandas as pd
+import streamlit as st
+
+
+def vehicle_key(vehicle: Dict) -> Tuple[str, str]:
+    """Chiave di un veicolo: fonte e targa (o id per i portali senza targa in elenco)"""
+    return vehicle.get('fonte', ''), vehicle.get('plate') or vehicle.get('id') or ''
+
+
+class VehicleSink:
+    """Destinazione dei blocchi di veicoli prodotti dagli scraper"""
+
+    def write(self, batch: List[Dict]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class DataFrameSink(VehicleSink):
+    """
+    Raccoglie i veicoli in un DataFrame per blocco, uniti in vehicles_data della sessione alla chiusura,
+    e mostra un'anteprima live degli ultimi arrivati durante lo scraping
+    """
+
+    def __init__(self, placeholder=None, refresh_interval: float = 1.0, preview_rows: int = 50,
+                 state_key: str = 'vehicles_data'):
+        """
+        Args:
+            placeholder: st.empty() in cui mostrare gli ultimi veicoli arrivati
+            refresh_interval: Secondi minimi tra due aggiornamenti dell'anteprima
+            preview_rows: Righe mostrate nell'anteprima
+            state_key: Chiave di st.session_state con il DataFrame dei risultati
+        """
+        self.placeholder = placeholder
+        self.refresh_interval = refresh_interval
+        self.preview_rows = preview_rows
+        self.state_key = state_key
+        self.frames: List[pd.DataFrame] = []
+        self.recent: Deque[Dict] = deque(maxlen=preview_rows)
+        self._last_refresh = 0.0
+
+    def write(self, batch: List[Dict]) -> None:
+        if not batch:
+            return
+        # Copia: lo scraper può ancora aggiornare il veicolo (es. perizia) in un altro thread
+        rows = [dict(vehicle) for vehicle in batch]
+        index = pd.Index([vehicle_key(row) for row in rows], tupleize_cols=False)
+        self.frames.append(pd.DataFrame(rows, index=index))
+        self.recent.extend(rows)
+        if time.time() - self._last_refresh >= self.refresh_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Aggiorna l'anteprima con gli ultimi preview_rows veicoli, senza ricostruire la tabella"""
+        if self.placeholder is not None:
+            self.placeholder.dataframe(pd.DataFrame(list(self.recent)), hide_index=True, use_container_width=True)
+        self._last_refresh = time.time()
+
+    def dataframe(self) -> pd.DataFrame:
+        """Tabella dei veicoli ricevuti: un veicolo riproposto vale con i dati più recenti"""
+        if not self.frames:
+            return pd.DataFrame()
+        df = pd.concat(self.frames)
+        return df[~df.index.duplicated(keep='last')].reset_index(drop=True)
+
+    def close(self) -> None:
+        if self.frames:
+            # Un solo concat a fine ricerca; i blocchi uniti sostituiscono quelli separati
+            df = self.dataframe()
+            self.frames = [df]
+            st.session_state[self.state_key] = df
+        if self.placeholder is not None:
+            self.placeholder.empty()
+
+
+class FirebaseSink(VehicleSink):
+    """Salva su Firebase ogni blocco appena arriva: un crash a metà portale non perde le pagine lette"""
+
+    def __init__(self, firebase_mgr):
+        self.firebase_mgr = firebase_mgr
+        self.stats = {'success': 0, 'failed': 0, 'skipped': 0, 'written': 0, 'unchanged': 0,
+                      'price_changes': 0, 'retries': 0, 'elapsed': 0.0}
+        self.failed_ids: List[str] = []
+
+    def write(self, batch: List[Dict]) -> None:
+        # Targa, o id per i portali senza targa in elenco, è l'ID del documento;
+        # copie perché il salvataggio aggiunge i timestamp
+        vehicles = [dict(vehicle) for vehicle in batch if vehicle_key(vehicle)[1]]
+        self.stats['skipped'] += len(batch) - len(vehicles)
+        if not vehicles:
+            return
+        results = self.firebase_mgr.save_auction_batch(vehicles)
+        self.stats['success'] += results.get('success', 0)
+        self.stats['failed'] += results.get('failed', 0)
+        for key in ('written', 'unchanged', 'price_changes', 'retries'):
+            self.stats[key] += results.get(key, 0)
+        self.stats['elapsed'] = round(self.stats['elapsed'] + results.get('elapsed', 0.0), 3)
+        self.failed_ids.extend(result['doc_id'] for result in results.get('results', []) if not result['ok'])
+
+    def throughput(self) -> float:
+        """Veicoli salvati al secondo di scrittura"""
+        return round(self.stats['success'] / self.stats['elapsed'], 1) if self.stats['elapsed'] else 0.0
+
+
+class VehiclePipeline:
+    """Inoltra ai sink i blocchi di veicoli man mano che gli scraper li producono"""
+
+    def __init__(self, sinks: List[VehicleSink]):
+        self.sinks = sinks
+        self.stats = {'batches': 0, 'vehicles': 0}
+        self.counts: Dict[str, int] = {}
+        self._keys = set()
+
+    def push(self, source_name: str, batch: List[Dict]) -> int:
+        """
+        Consegna un blocco a tutti i sink
+        Args:
+            source_name: Portale di provenienza, salvato nel campo 'fonte'
+            batch: Veicoli del blocco
+        Returns:
+            int: Veicoli nuovi nel blocco (quelli riproposti con dati aggiornati non sono contati)
+        """
+        added = 0
+        for vehicle in batch:
+            vehicle['fonte'] = source_name
+            key = vehicle_key(vehicle)
+            if key not in self._keys:
+                self._keys.add(key)
+                added += 1
+
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                print(f"Errore in {type(sink).__name__}: {str(e)}")
+
+        self.stats['batches'] += 1
+        self.stats['vehicles'] += added
+        self.counts[source_name] = self.counts.get(source_name, 0) + added
+        return added
+
+    def consume(self, source_name: str, batches: Iterable[List[Dict]],
+                on_batch: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Consuma il generatore di uno scraper blocco per blocco
+        Args:
+            source_name: Portale di provenienza
+            batches: Generatore di blocchi (es. scraper.iter_vehicles(...))
+            on_batch: Callback(veicoli nuovi, totale portale) dopo ogni blocco
+        Returns:
+            int: Veicoli distinti ricevuti dal portale
+        """
+        for batch in batches:
+            added = self.push(source_name, batch)
+            if on_batch:
+                on_batch(added, self.counts[source_name])
+        return self.counts.get(source_name, 0)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Errore chiusura {type(sink).__name__}: {str(e)}")
@@ -1,13 +1,18 @@
 # scrapers/portals/ayvens.py
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from ..base import BaseScraper
+from ..http_client import class_xpath, node_text
+from ..fanout import FanOutExecutor
+from ..documents import DocumentFetcher
+from ..damage_reports import DamageReportParser
+from ..http_client import HttpClient
+from ..resilience import CircuitOpenError
+from config.settings import PORTAL_CONCURRENCY, PORTAL_URLS, DOCUMENT_SETTINGS
 import requests
-import PyPDF2
-import io
 import re
 import time
 from urllib.parse import urljoin
@@ -15,10 +20,17 @@ from urllib.parse import urljoin
 class AyvensScraper(BaseScraper):
     """Scraper specifico per il portale Ayvens/ALD/Leaseplan"""
     
-    def __init__(self, headless: bool = True):
-        super().__init__(headless)
-        self.base_url = "https://carmarket.ayvens.com"
+    def __init__(self, headless: bool = True, use_pool: bool = None, http_mode: bool = None,
+                 base_url: str = None):
+        super().__init__(headless, use_pool=use_pool, http_mode=http_mode)
+        self.portal_key = "ayvens"
+        # base_url alternativo: es. server di replay dei benchmark
+        self.base_url = base_url or PORTAL_URLS['ayvens']
         self.is_logged_in = False
+        self.concurrency = PORTAL_CONCURRENCY.get(self.portal_key, 1)
+        self.session_state = None
+        self.documents = None
+        self.damage_parser = None
 
     def login(self, username: str = "", password: str = "") -> bool:
         """
@@ -30,6 +42,11 @@ class AyvensScraper(BaseScraper):
             if not self.driver:
                 self.setup_driver()
             
+            # Sessione salvata ancora valida: login saltato
+            if self.restore_session(username):
+                self.is_logged_in = True
+                return True
+            
             # Naviga alla homepage
             self.driver.get(self.base_url)
             
@@ -56,14 +73,27 @@ class AyvensScraper(BaseScraper):
             try:
                 self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "user-menu")))
                 self.is_logged_in = True
-                print("Login effettuato con successo")
+                self.save_session(username)
+                self.log("Login effettuato con successo", 'success')
                 return True
             except TimeoutException:
-                print("Login fallito - Menu utente non trovato")
+                self.log("Login fallito - Menu utente non trovato", 'error')
+                self.capture("login_failed", error=True)
                 return False
                 
         except Exception as e:
-            print(f"Errore durante il login: {str(e)}")
+            self.log(f"Errore durante il login: {str(e)}", 'error')
+            self.capture("login_error", error=True)
+            return False
+
+    def is_session_valid(self) -> bool:
+        """Verifica rapida del login tramite il menu utente"""
+        try:
+            WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "user-menu"))
+            )
+            return True
+        except TimeoutException:
             return False
 
     def get_italian_auctions(self) -> List[Dict]:
@@ -73,9 +103,17 @@ class AyvensScraper(BaseScraper):
             List[Dict]: Lista di aste italiane con relativi dettagli
         """
         if not self.is_logged_in:
-            print("Login necessario prima di recuperare le aste")
+            self.log("Login necessario prima di recuperare le aste", 'warning')
             return []
 
+        if self.http:
+            try:
+                auctions = self._get_italian_auctions_http()
+                if auctions is not None:
+                    return auctions
+            except Exception as e:
+                self.log(f"Recupero aste via HTTP fallito, uso il browser: {str(e)}", 'warning')
+
         auctions = []
         try:
             # Trova tutte le aste con icona italiana
@@ -103,29 +141,41 @@ class AyvensScraper(BaseScraper):
                     auctions.append(auction_data)
                     
                 except Exception as e:
-                    print(f"Errore nell'estrazione dati asta: {str(e)}")
+                    self.log(f"Errore nell'estrazione dati asta: {str(e)}", 'error')
                     continue
 
             return auctions
             
         except Exception as e:
-            print(f"Errore nel recupero aste italiane: {str(e)}")
+            self.log(f"Errore nel recupero aste italiane: {str(e)}", 'error')
             return []
 
-    def get_auction_vehicles(self, auction_url: str) -> List[Dict]:
+    def get_auction_vehicles(self, auction_url: str) -> Optional[List[Dict]]:
         """
         Recupera tutti i veicoli di una specifica asta
         Args:
             auction_url: URL dell'asta
         Returns:
-            List[Dict]: Lista di veicoli con relativi dettagli
+            Optional[List[Dict]]: Lista di veicoli con relativi dettagli, None se l'asta non è stata letta
         """
         if not self.is_logged_in:
-            print("Login necessario prima di recuperare i veicoli")
-            return []
+            self.log("Login necessario prima di recuperare i veicoli", 'warning')
+            return None
+
+        if self.http:
+            try:
+                vehicles = self._get_auction_vehicles_http(urljoin(self.base_url, auction_url))
+                if vehicles is not None:
+                    return vehicles
+            except CircuitOpenError:
+                # Portale sospeso: il browser non deve ripetere le stesse richieste
+                raise
+            except Exception as e:
+                self.log(f"Recupero veicoli via HTTP fallito, uso il browser: {str(e)}", 'warning')
 
         vehicles = []
         try:
+            self._ensure_browser()
             full_url = urljoin(self.base_url, auction_url)
             self.driver.get(full_url)
             
@@ -147,14 +197,15 @@ class AyvensScraper(BaseScraper):
                     vehicles.append(vehicle_data)
                     
                 except Exception as e:
-                    print(f"Errore nell'estrazione dati veicolo: {str(e)}")
+                    self.log(f"Errore nell'estrazione dati veicolo: {str(e)}", 'error')
                     continue
 
             return vehicles
             
         except Exception as e:
-            print(f"Errore nel recupero veicoli dell'asta: {str(e)}")
-            return []
+            self.log(f"Errore nel recupero veicoli dell'asta: {str(e)}", 'error')
+            self.capture("auction_error", error=True)
+            return None
 
     def _get_vehicle_documents(self, vehicle_element) -> Dict:
         """
@@ -184,42 +235,280 @@ class AyvensScraper(BaseScraper):
             return documents
             
         except Exception as e:
-            print(f"Errore nell'estrazione documenti: {str(e)}")
+            self.log(f"Errore nell'estrazione documenti: {str(e)}", 'error')
             return {'damage_report': None, 'maintenance': None}
 
-    def scrape(self, username: str, password: str) -> List[Dict]:
+    def _get_italian_auctions_http(self) -> Optional[List[Dict]]:
         """
-        Metodo principale di scraping
+        Recupera le aste italiane dalla pagina post-login via HTTP
+        Returns:
+            Optional[List[Dict]]: Aste trovate, None se la pagina richiede JavaScript
+        """
+        auction_xpath = (
+            "//*[local-name()='use'][@*[name()='xlink:href' or name()='href']='#icon-round-ITA']"
+            f"/ancestor::div[{class_xpath('auction-item')}]"
+        )
+        tree = self.http.get_html(self.driver.current_url, required_xpath=auction_xpath)
+        if tree is None:
+            return None
+
+        auctions = []
+        for auction in tree.xpath(auction_xpath):
+            more_btn = auction.xpath(".//a[@data-show-button-sale-code]")
+            if not more_btn:
+                continue
+            auction_id = more_btn[0].get('data-show-button-saleeventid')
+            auctions.append({
+                'id': auction_id,
+                'url': f"/it-it/sales/{auction_id}/",
+                'title': self._http_text(auction, 'auction-title'),
+                'end_date': self._http_text(auction, 'auction-end-date'),
+                'vehicle_count': self._http_text(auction, 'vehicle-count')
+            })
+        return auctions
+
+    def _get_auction_vehicles_http(self, full_url: str) -> Optional[List[Dict]]:
+        """
+        Recupera i veicoli di un'asta via HTTP
+        Returns:
+            Optional[List[Dict]]: Veicoli trovati, None se la pagina richiede JavaScript
+        """
+        vehicle_xpath = f"//*[{class_xpath('vehicle-item')}]"
+        tree = self.http.get_html(full_url, required_xpath=vehicle_xpath)
+        if tree is None:
+            return None
+
+        vehicles = []
+        for vehicle in tree.xpath(vehicle_xpath):
+            images = vehicle.xpath('.//img')
+            documents = {'damage_report': None, 'maintenance': None}
+            for href in vehicle.xpath(f".//*[{class_xpath('details-documents')}]//a/@href"):
+                if 'perizia1' in href.lower():
+                    documents['damage_report'] = href
+                elif 'perizia2' in href.lower():
+                    documents['maintenance'] = href
+
+            vehicles.append({
+                'id': vehicle.get('id'),
+                'brand_model': self._http_text(vehicle, 'vehicle-title'),
+                'image_url': images[0].get('src') if images else None,
+                'details': self._http_text(vehicle, 'vehicle-details'),
+                'documents': documents
+            })
+        return vehicles
+
+    def _http_text(self, node, class_name: str) -> str:
+        """Testo del primo discendente con la classe indicata"""
+        found = node.xpath(f".//*[{class_xpath(class_name)}]")
+        return node_text(found[0]) if found else ''
+
+    def _ensure_browser(self) -> None:
+        """Avvia il browser di un worker solo se serve, con la sessione dello scraper principale"""
+        if not self.driver and self.session_state:
+            self.setup_driver()
+            self.import_session_state(self.session_state)
+
+    def _create_worker(self) -> 'AyvensScraper':
+        """Crea un worker che condivide la sessione autenticata"""
+        worker = AyvensScraper(
+            headless=self.headless, use_pool=self.use_pool, http_mode=self.http_mode, base_url=self.base_url
+        )
+        worker.is_logged_in = True
+        worker.wait_time = self.wait_time
+        worker.session_state = self.session_state
+        if self.http:
+            # Connessioni keep-alive condivise; il browser parte solo in caso di fallback
+            worker.http = self.http
+        else:
+            worker._ensure_browser()
+        return worker
+
+    def _release_worker(self, worker: 'AyvensScraper') -> None:
+        # Il client HTTP appartiene allo scraper principale
+        worker.http = None
+        worker.cleanup()
+
+    def iter_auction_vehicles(self, auctions: List[Dict]) -> Iterator[Tuple[Dict, List[Dict]]]:
+        """
+        Recupera i veicoli delle aste distribuendole su più worker
+        Args:
+            auctions: Aste da elaborare
+        Yields:
+            Tuple[Dict, Optional[List[Dict]]]: (asta, veicoli) appena ogni worker termina,
+            veicoli None se l'asta non è stata letta
+        """
+        if self.concurrency <= 1 or len(auctions) <= 1:
+            for auction in auctions:
+                yield auction, self.get_auction_vehicles(auction['url'])
+            return
+
+        # Stato di sessione esportato una volta e condiviso da tutti i worker
+        self.session_state = self.export_session_state()
+        executor = FanOutExecutor(
+            min(self.concurrency, len(auctions)),
+            self._create_worker,
+            self._release_worker
+        )
+        results = executor.map_unordered(
+            lambda worker, auction: worker.get_auction_vehicles(auction['url']),
+            auctions
+        )
+        for auction, vehicles, error in results:
+            if error:
+                self.log(f"Errore nel recupero veicoli dell'asta {auction.get('id')}: {str(error)}", 'error')
+                vehicles = None
+            yield auction, vehicles
+
+    def _start_document_fetcher(self) -> Optional[DocumentFetcher]:
+        """Avvia il download in background delle perizie con una sessione HTTP dedicata"""
+        if not DOCUMENT_SETTINGS['enabled']:
+            return None
+        try:
+            if DOCUMENT_SETTINGS['parse_damage_reports']:
+                self.damage_parser = DamageReportParser(log=self.log)
+            return DocumentFetcher(
+                HttpClient.from_driver(self.driver, timeout=self.wait_time, guard=self.guard),
+                on_document=self._on_document,
+                log=self.log
+            )
+        except Exception as e:
+            self.log(f"Download perizie non disponibile: {str(e)}", 'warning')
+            return None
+
+    def _on_document(self, vehicle: Dict, kind: str, entry: Dict) -> None:
+        """Invia le perizie danni scaricate all'analisi nel process pool"""
+        if kind == 'damage_report' and self.damage_parser:
+            self.damage_parser.submit(vehicle, entry)
+
+    def iter_vehicles(self, username: str, password: str) -> Iterator[List[Dict]]:
+        """
+        Scraping in streaming delle aste italiane
         Args:
             username: Username per il login
             password: Password per il login
-        Returns:
-            List[Dict]: Lista di tutti i veicoli trovati
+        Yields:
+            List[Dict]: Veicoli di ogni asta appena recuperata; i veicoli con perizia analizzata
+            vengono riproposti in blocchi successivi con i campi danno aggiornati
         """
         try:
             # Login
             if not self.login(username, password):
-                return []
+                return
+
+            # Dopo il login le pagine vengono scaricate via HTTP quando possibile
+            self.handoff_to_http()
+            self.documents = self._start_document_fetcher()
 
             # Recupera aste italiane
             auctions = self.get_italian_auctions()
             
-            # Recupera veicoli da ogni asta
-            all_vehicles = []
-            for auction in auctions:
-                vehicles = self.get_auction_vehicles(auction['url'])
-                all_vehicles.extend(vehicles)
+            # Run interrotto: le aste completate non vengono riscaricate, i loro veicoli sono riconsegnati
+            checkpoint = self.open_checkpoint()
+            pending = [auction for auction in auctions if not checkpoint.is_done(auction['id'])]
+            
+            # Veicoli consegnati la cui perizia è ancora in download o in analisi
+            awaiting = []
+            if checkpoint.resumed:
+                resumed = checkpoint.vehicles()
+                awaiting.extend(self._submit_documents(
+                    [vehicle for vehicle in resumed if 'damage_cost' not in vehicle]
+                ))
+                if resumed:
+                    yield resumed
+
+            completed = 0
+            for done, (auction, vehicles) in enumerate(self.iter_auction_vehicles(pending), 1):
+                if vehicles is None:
+                    # Asta fallita: resta da completare e il prossimo run la riprende
+                    self.progress('auctions', f"❌ Asta {done}/{len(pending)} non letta", done, len(pending))
+                    continue
+                self.progress(
+                    'auctions', f"🏁 Asta {done}/{len(pending)}: {len(vehicles)} veicoli", done, len(pending)
+                )
+                checkpoint.complete(auction['id'], vehicles)
+                completed += 1
+                # Le perizie vengono scaricate in parallelo mentre si passa all'asta successiva
+                awaiting.extend(self._submit_documents(vehicles))
+                if vehicles:
+                    yield vehicles
+
+                analysed, awaiting = self._split_analysed(awaiting)
+                if analysed:
+                    checkpoint.update(analysed)
+                    yield analysed
 
-            return all_vehicles
+            if self.documents:
+                deadline = time.time() + DOCUMENT_SETTINGS['wait_timeout']
+                if not self.documents.wait(DOCUMENT_SETTINGS['wait_timeout']):
+                    self.log("Download perizie ancora in corso: proseguono in background", 'warning')
+                if self.damage_parser and not self.damage_parser.wait(max(deadline - time.time(), 0)):
+                    self.log("Analisi perizie ancora in corso: proseguono in background", 'warning')
+
+                analysed, _ = self._split_analysed(awaiting)
+                if analysed:
+                    checkpoint.update(analysed)
+                    yield analysed
+
+            # Tutte le aste lette: il prossimo run riparte da zero
+            if completed == len(pending):
+                checkpoint.finish()
+            else:
+                self.log(
+                    f"{len(pending) - completed} aste non lette: il checkpoint resta per il prossimo run", 'warning'
+                )
         except Exception as e:
-            print(f"Errore nello scraping: {str(e)}")
-            return []
+            self.log(f"Errore nello scraping: {str(e)}", 'error')
+            self.capture("scrape_error", error=True)
         finally:
+            if self.documents:
+                self.log(f"Perizie: {self.documents.stats}")
+                self.documents.shutdown(wait=False)
+            if self.damage_parser:
+                self.log(f"Analisi perizie: {self.damage_parser.stats}")
+                self.damage_parser.shutdown(wait=False)
+            if self.debug:
+                self.log(f"🛡️ Resilienza: {self.guard.summary()}")
             self.cleanup()
 
+    def _submit_documents(self, vehicles: List[Dict]) -> List[Dict]:
+        """
+        Accoda il download dei documenti dei veicoli
+        Returns:
+            List[Dict]: Veicoli la cui perizia verrà analizzata
+        """
+        awaiting = []
+        if self.documents:
+            for vehicle in vehicles:
+                self.documents.submit(vehicle)
+                if self.damage_parser and (vehicle.get('documents') or {}).get('damage_report'):
+                    awaiting.append(vehicle)
+        return awaiting
+
+    def _split_analysed(self, vehicles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Separa i veicoli con perizia già analizzata da quelli ancora in attesa"""
+        analysed = [vehicle for vehicle in vehicles if 'damage_cost' in vehicle]
+        pending = [vehicle for vehicle in vehicles if 'damage_cost' not in vehicle]
+        return analysed, pending
+
+    def scrape(self, username: str, password: str) -> List[Dict]:
+        """
+        Metodo principale di scraping
+        Args:
+            username: Username per il login
+            password: Password per il login
+        Returns:
+            List[Dict]: Lista di tutti i veicoli trovati
+        """
+        # I veicoli riproposti con la perizia analizzata sono gli stessi oggetti: uno per veicolo
+        vehicles = {}
+        for batch in self.iter_vehicles(username, password):
+            for vehicle in batch:
+                vehicles[id(vehicle)] = vehicle
+        return list(vehicles.values())
+
     # Implementazione metodi astratti
     def get_auctions(self) -> List[Dict]:
         return self.get_italian_auctions()
 
     def get_vehicles(self, auction_id: str) -> List[Dict]:
-        return self.get_auction_vehicles(f"/it-it/sales/{auction_id}/")
+        return self.get_auction_vehicles(f"/it-it/sales/{auction_id}/") or []
@@ -5,38 +5,153 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver import ActionChains
 from scrapers.base import BaseScraper
+from scrapers.fanout import FanOutExecutor
+from scrapers.resilience import CircuitOpenError
+from scrapers.http_client import class_xpath, node_text
+from scrapers.row_index import RowIndex
+from config.settings import PORTAL_CONCURRENCY, PORTAL_URLS
+from typing import Callable, Dict, Generator, Iterator, List, NamedTuple, Optional, Tuple
 import time
-import streamlit as st
-import base64
-from io import BytesIO
+import json
+import re
+
+# Serializza in un solo round trip tutte le righe della tabella veicoli,
+# sia nel layout a celle td sia in quello a classi (plateCell, brandCell, ...)
+BULK_EXTRACT_SCRIPT = """
+var rowClasses = arguments[0];
+var cellClasses = arguments[1];
+var only = arguments[2] || null;
+var rows = [];
+for (var i = 0; i < rowClasses.length && rows.length === 0; i++) {
+    rows = document.getElementsByClassName(rowClasses[i]);
+}
+var data = [];
+var count = only ? only.length : rows.length;
+for (var n = 0; n < count; n++) {
+    var row = rows[only ? only[n] : n];
+    var cells = [];
+    var tds = row.getElementsByTagName('td');
+    for (var c = 0; c < tds.length; c++) {
+        cells.push(tds[c].innerText);
+    }
+    var classCells = {};
+    for (var key in cellClasses) {
+        var cell = row.getElementsByClassName(cellClasses[key])[0];
+        if (!cell) {
+            classCells = null;
+            break;
+        }
+        classCells[key] = cell.innerText;
+    }
+    data.push({cells: cells, classCells: classCells});
+}
+return [rows.length ? rows[0] : null, JSON.stringify(data)];
+"""
+
+# Targa e testo grezzo di ogni riga, per il confronto incrementale con il run precedente.
+# Accetta le righe come WebElement oppure le classi con cui cercarle.
+# Il testo è il textContent delle celle unito da spazi, come _node_fingerprint per le pagine HTTP:
+# il passaggio tra browser e HTTP non cambia le impronte.
+ROW_FINGERPRINT_SCRIPT = """
+var rows = arguments[0];
+var plateClass = arguments[1];
+if (rows.length && typeof rows[0] === 'string') {
+    var rowClasses = rows;
+    rows = [];
+    for (var i = 0; i < rowClasses.length && rows.length === 0; i++) {
+        rows = document.getElementsByClassName(rowClasses[i]);
+    }
+}
+var data = [];
+for (var r = 0; r < rows.length; r++) {
+    var tds = rows[r].getElementsByTagName('td');
+    var keyCell = tds.length >= 6 ? tds[0] : rows[r].getElementsByClassName(plateClass)[0];
+    var texts = [];
+    for (var c = 0; c < tds.length; c++) {
+        texts.push(tds[c].textContent);
+    }
+    data.push([
+        keyCell ? keyCell.textContent.replace(/\s+/g, ' ').trim() : '',
+        tds.length ? texts.join(' ') : rows[r].textContent
+    ]);
+}
+return [rows.length ? rows[0] : null, JSON.stringify(data)];
+"""
+
+# Link di paginazione: testo, href assoluto e onclick, per riconoscere il meccanismo di paginazione
+PAGE_LINKS_SELECTOR = "a[class*='pageNumber'], a[class*='page-item'], span[class*='pageNumber']"
+PAGE_LINKS_SCRIPT = """
+var links = document.querySelectorAll(arguments[0]);
+var data = [];
+for (var i = 0; i < links.length; i++) {
+    data.push([links[i].innerText, links[i].href || null, links[i].getAttribute('onclick')]);
+}
+return data;
+"""
+
+# Esegue l'onclick di un link di paginazione (es. submit AJAX RichFaces) per una pagina qualsiasi,
+# con un link dello scroller come this
+AJAX_PAGE_SCRIPT = """
+var links = document.querySelectorAll(arguments[1]);
+if (!links.length) {
+    return false;
+}
+new Function('event', arguments[0]).call(links[0], null);
+return true;
+"""
+
+# Numero di pagina dentro un href (parametro o segmento di path) o tra apici in un onclick
+URL_PAGE_RE = r'(?<=[=/]){page}(?=[&#/]|$)'
+SCRIPT_PAGE_RE = r"""(?<=['"]){page}(?=['"])"""
+
+
+class PageRequest(NamedTuple):
+    """Meccanismo con cui si richiede una pagina qualsiasi della lista Introvabili"""
+    kind: str           # 'url' (href con il numero di pagina) o 'ajax' (onclick RichFaces)
+    template: str       # href o script con il segnaposto {page}
+    last_page: int      # Ultima pagina visibile nella paginazione
+
+    def render(self, page: int) -> str:
+        return self.template.replace('{page}', str(page))
+
 
 class ClickarScraper(BaseScraper):
-    def __init__(self, headless: bool = True):
-        super().__init__(headless=headless)
-        self.base_url = "https://www.clickar.biz/private"
-        self.is_logged_in = False
+    # Elementi visibili solo da utente autenticato
+    SUCCESS_SELECTORS = [
+        (By.CLASS_NAME, "carusedred"),
+        (By.CLASS_NAME, "user-menu"),
+        (By.CLASS_NAME, "logged-user"),
+        (By.XPATH, "//span[contains(text(), 'INTROVABILI')]"),
+        (By.XPATH, "//a[contains(text(), 'INTROVABILI')]")
+    ]
 
-    def save_screenshot_st(self, name: str):
-        """Salva e mostra screenshot in Streamlit"""
-        try:
-            # Cattura screenshot
-            img_binary = self.driver.get_screenshot_as_png()
-            
-            # Mostra in Streamlit
-            st.write(f"📸 Screenshot - {name}:")
-            st.image(img_binary, caption=name)
-            
-            # Aggiungi bottone download
-            st.download_button(
-                label=f"📥 Scarica Screenshot {name}",
-                data=img_binary,
-                file_name=f"screenshot_{name}_{int(time.time())}.png",
-                mime="image/png"
-            )
-            return True
-        except Exception as e:
-            st.error(f"❌ Errore salvataggio screenshot {name}: {str(e)}")
-            return False
+    # Classi delle righe veicolo, in ordine di priorità
+    ROW_CLASSES = ["vehicleRow", "rich-table-row", "vehicle-item"]
+
+    # Layout alternativo: campo -> classe della cella
+    CELL_CLASSES = {
+        'plate': "plateCell",
+        'brand': "brandCell",
+        'model': "modelCell",
+        'year': "yearCell",
+        'km': "kmCell",
+        'location': "locationCell",
+        'base_price': "priceCell"
+    }
+
+    def __init__(self, headless: bool = True, bulk_extraction: bool = True, incremental: bool = True,
+                 use_pool: bool = None, http_mode: bool = None, base_url: str = None):
+        super().__init__(headless=headless, use_pool=use_pool, http_mode=http_mode)
+        self.portal_key = "clickar"
+        # base_url alternativo: es. server di replay dei benchmark
+        self.base_url = base_url or PORTAL_URLS['clickar']
+        self.is_logged_in = False
+        self.bulk_extraction = bulk_extraction
+        self.incremental = incremental
+        self.row_index = None
+        self.concurrency = PORTAL_CONCURRENCY.get(self.portal_key, 1)
+        self.session_state = None
+        self.on_listing = False
 
     def login(self, username: str, password: str) -> bool:
         """Gestisce il login su Clickar con form specifico"""
@@ -45,54 +160,60 @@ class ClickarScraper(BaseScraper):
                 if not self.setup_driver():
                     return False
             
-            st.write("🌐 Navigazione alla homepage...")
+            # Sessione salvata: evita iframe, credenziali e attese del login completo
+            if self.restore_session(username):
+                self.is_logged_in = True
+                return True
+            
+            self.log("🌐 Navigazione alla homepage...")
             self.driver.get(self.base_url)
-            time.sleep(5)  # Attesa caricamento iniziale
+            # Attesa caricamento iniziale: pagina completa e iframe di login presente
+            self.waits.document_ready(15)
+            self.waits.until('login_iframe', lambda driver: driver.find_elements(By.TAG_NAME, "iframe"), 15)
             
-            # Screenshot pre-login
-            self.save_screenshot_st("pre_login")
+            # Cattura diagnostica pre-login
+            self.capture("pre_login")
             
-            st.write("🔄 Gestione iframe...")
+            self.log("🔄 Gestione iframe...")
             # Trova l'iframe corretto
             iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-            st.write(f"Trovati {len(iframes)} iframe")
+            self.log(f"Trovati {len(iframes)} iframe")
             
             login_frame = None
             for frame in iframes:
                 try:
                     frame_id = frame.get_attribute('id')
                     frame_src = frame.get_attribute('src')
-                    st.write(f"Frame trovato - ID: {frame_id}, SRC: {frame_src}")
+                    self.log(f"Frame trovato - ID: {frame_id}, SRC: {frame_src}")
                     if 'sts.fiatgroup' in frame_src or 'login' in frame_src.lower():
                         login_frame = frame
-                        st.write("✅ Frame login trovato!")
+                        self.log("✅ Frame login trovato!")
                         break
                 except:
                     continue
             
             if not login_frame:
-                st.error("❌ Frame login non trovato")
-                self.save_screenshot_st("no_frame_error")
+                self.log("❌ Frame login non trovato", 'error')
+                self.capture("no_frame_error", error=True)
                 return False
             
-            st.write("🔄 Switch al frame login...")
+            self.log("🔄 Switch al frame login...")
             self.driver.switch_to.frame(login_frame)
-            time.sleep(2)
-            self.save_screenshot_st("inside_frame")
+            self.capture("inside_frame")
             
             # Verifica presenza form
             try:
                 form_area = self.wait.until(
                     EC.presence_of_element_located((By.ID, "formsAuthenticationArea"))
                 )
-                st.write("✅ Form di autenticazione trovato")
+                self.log("✅ Form di autenticazione trovato")
             except:
-                st.error("❌ Form di autenticazione non trovato")
-                self.save_screenshot_st("no_form_error")
+                self.log("❌ Form di autenticazione non trovato", 'error')
+                self.capture("no_form_error", error=True)
                 return False
             
             # Compila username usando multiple strategie
-            st.write("📝 Compilazione username...")
+            self.log("📝 Compilazione username...")
             try:
                 username_field = WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.ID, "userNameInput"))
@@ -105,23 +226,26 @@ class ClickarScraper(BaseScraper):
                 actions.click()
                 actions.send_keys(username)
                 actions.perform()
-                time.sleep(1)
                 
                 # Verifica inserimento
-                if username_field.get_attribute('value') != username:
+                if not self.waits.until(
+                    'username_value',
+                    lambda driver: username_field.get_attribute('value') == username,
+                    2
+                ):
                     # Prova metodo alternativo
                     username_field.send_keys(Keys.CONTROL + "a")  # Seleziona tutto
                     username_field.send_keys(Keys.DELETE)  # Cancella
                     username_field.send_keys(username)  # Reinserisci
                     
-                st.write("✅ Username inserito")
+                self.log("✅ Username inserito")
             except:
-                st.error("❌ Errore inserimento username")
-                self.save_screenshot_st("username_error")
+                self.log("❌ Errore inserimento username", 'error')
+                self.capture("username_error", error=True)
                 return False
             
             # Compila password
-            st.write("📝 Compilazione password...")
+            self.log("📝 Compilazione password...")
             try:
                 password_field = self.driver.find_element(
                     By.ID, "passwordInput"
@@ -134,19 +258,18 @@ class ClickarScraper(BaseScraper):
                 actions.click()
                 actions.send_keys(password)
                 actions.perform()
-                time.sleep(1)
                 
-                st.write("✅ Password inserita")
+                self.log("✅ Password inserita")
             except:
-                st.error("❌ Errore inserimento password")
-                self.save_screenshot_st("password_error")
+                self.log("❌ Errore inserimento password", 'error')
+                self.capture("password_error", error=True)
                 return False
             
-            # Screenshot pre-submit
-            self.save_screenshot_st("pre_submit")
+            # Cattura diagnostica pre-submit
+            self.capture("pre_submit")
             
             # Click sul bottone submit usando JavaScript
-            st.write("🔐 Click sul bottone login...")
+            self.log("🔐 Click sul bottone login...")
             try:
                 submit_button = self.wait.until(
                     EC.presence_of_element_located((By.ID, "submitButton"))
@@ -161,48 +284,54 @@ class ClickarScraper(BaseScraper):
                     # Se anche JavaScript fallisce, prova la funzione di login diretta
                     self.driver.execute_script("Login.submitLoginRequest();")
                 
-                time.sleep(5)  # Attesa post-click
+                # Attesa post-click: richieste di autenticazione completate
+                self.waits.network_idle(500, 15, 'login_submit')
                 
             except:
-                st.error("❌ Errore click submit")
-                self.save_screenshot_st("submit_error")
+                self.log("❌ Errore click submit", 'error')
+                self.capture("submit_error", error=True)
                 return False
             
             # Torna al contesto principale
             self.driver.switch_to.default_content()
-            time.sleep(5)  # Attesa post-login
+            # Attesa post-login: redirect completati e pagina pronta
+            self.waits.network_idle(500, 15, 'post_login')
+            self.waits.document_ready(10)
             
-            # Screenshot post-login
-            self.save_screenshot_st("post_login")
+            # Cattura diagnostica post-login
+            self.capture("post_login")
             
             # Verifica login
-            st.write("✅ Verifica login...")
-            success_selectors = [
-                (By.CLASS_NAME, "carusedred"),
-                (By.CLASS_NAME, "user-menu"),
-                (By.CLASS_NAME, "logged-user"),
-                (By.XPATH, "//span[contains(text(), 'INTROVABILI')]"),
-                (By.XPATH, "//a[contains(text(), 'INTROVABILI')]")
-            ]
-            
-            for selector_type, selector_value in success_selectors:
+            self.log("✅ Verifica login...")
+            for selector_type, selector_value in self.SUCCESS_SELECTORS:
                 try:
                     element = WebDriverWait(self.driver, 5).until(
                         EC.presence_of_element_located((selector_type, selector_value))
                     )
-                    st.success(f"✅ Login verificato! Elemento trovato: {selector_value}")
+                    self.log(f"✅ Login verificato! Elemento trovato: {selector_value}", 'success')
                     self.is_logged_in = True
+                    self.save_session(username)
                     return True
                 except:
                     continue
                     
-            st.error("❌ Login fallito - Nessun elemento di verifica trovato")
-            self.save_screenshot_st("verification_failed")
+            self.log("❌ Login fallito - Nessun elemento di verifica trovato", 'error')
+            self.capture("verification_failed", error=True)
             return False
                 
         except Exception as e:
-            st.error(f"❌ Errore durante il login: {str(e)}")
-            self.save_screenshot_st("error")
+            self.log(f"❌ Errore durante il login: {str(e)}", 'error')
+            self.capture("error", error=True)
+            return False
+
+    def is_session_valid(self) -> bool:
+        """Verifica rapida del login tramite gli elementi di successo"""
+        try:
+            WebDriverWait(self.driver, 5).until(
+                lambda driver: any(driver.find_elements(by, value) for by, value in self.SUCCESS_SELECTORS)
+            )
+            return True
+        except TimeoutException:
             return False
 
     def navigate_to_introvabili(self) -> bool:
@@ -212,11 +341,6 @@ class ClickarScraper(BaseScraper):
             bool: True se la navigazione ha successo, False altrimenti
         """
         try:
-            st.write("⌛ Attesa caricamento pagina...")
-            time.sleep(5)
-            
-            st.write("🔍 Ricerca sezione INTROVABILI...")
-            
             # Lista di possibili selettori per il link Introvabili
             selectors = [
                 "//span[contains(text(), 'INTROVABILI')]",
@@ -224,32 +348,46 @@ class ClickarScraper(BaseScraper):
                 "//a[contains(text(), 'INTROVABILI')]",
                 "//div[contains(@class, 'menu')]//a[contains(text(), 'Introvabili')]"
             ]
+            # Indicatori della pagina Introvabili caricata
+            page_markers = [
+                (By.CLASS_NAME, "vehiclesTable"),
+                (By.CLASS_NAME, "vehicleRow"),
+                (By.ID, "vehiclesList")
+            ]
+            
+            self.log("⌛ Attesa caricamento pagina...")
+            self.waits.until(
+                'introvabili_link',
+                lambda driver: any(driver.find_elements(By.XPATH, selector) for selector in selectors),
+                15
+            )
+            
+            self.log("🔍 Ricerca sezione INTROVABILI...")
             
             # Prova ogni selettore
             for selector in selectors:
                 try:
                     element = self.driver.find_element(By.XPATH, selector)
                     element.click()
-                    time.sleep(3)
                     
                     # Verifica che siamo nella pagina corretta
-                    if any([
-                        self.is_element_present(By.CLASS_NAME, "vehiclesTable"),
-                        self.is_element_present(By.CLASS_NAME, "vehicleRow"),
-                        self.is_element_present(By.ID, "vehiclesList")
-                    ]):
-                        st.success("Navigazione completata!")
+                    if self.waits.until(
+                        'introvabili_page',
+                        lambda driver: any(driver.find_elements(by, value) for by, value in page_markers),
+                        10
+                    ):
+                        self.log("Navigazione completata!", 'success')
                         return True
                 except:
                     continue
             
-            st.error("Sezione INTROVABILI non trovata")
-            self.save_screenshot_st("navigation_error")
+            self.log("Sezione INTROVABILI non trovata", 'error')
+            self.capture("navigation_error", error=True)
             return False
                 
         except Exception as e:
-            st.error(f"Errore navigazione: {str(e)}")
-            self.save_screenshot_st("navigation_error")
+            self.log(f"Errore navigazione: {str(e)}", 'error')
+            self.capture("navigation_error", error=True)
             return False
 
     def extract_vehicle_data(self, row) -> dict:
@@ -261,67 +399,211 @@ class ClickarScraper(BaseScraper):
             dict: Dati del veicolo o None se estrazione fallita
         """
         try:
-            data = {}
-            
-            # Mappatura celle -> dati (adatta in base alla struttura reale)
             try:
-                cells = row.find_elements(By.TAG_NAME, "td")
-                if len(cells) >= 6:
-                    data = {
-                        'plate': cells[0].text.strip(),
-                        'brand': cells[1].text.strip(),
-                        'model': cells[2].text.strip(),
-                        'year': cells[3].text.strip(),
-                        'km': cells[4].text.strip(),
-                        'location': cells[5].text.strip(),
-                        'base_price': cells[6].text.strip() if len(cells) > 6 else "N/D"
-                    }
+                cells = [cell.text for cell in row.find_elements(By.TAG_NAME, "td")]
             except:
-                # Tentativo alternativo con classi specifiche
+                cells = []
+            
+            # Tentativo alternativo con classi specifiche
+            class_cells = None
+            if len(cells) < 6:
                 try:
-                    data = {
-                        'plate': row.find_element(By.CLASS_NAME, "plateCell").text.strip(),
-                        'brand': row.find_element(By.CLASS_NAME, "brandCell").text.strip(),
-                        'model': row.find_element(By.CLASS_NAME, "modelCell").text.strip(),
-                        'year': row.find_element(By.CLASS_NAME, "yearCell").text.strip(),
-                        'km': row.find_element(By.CLASS_NAME, "kmCell").text.strip(),
-                        'location': row.find_element(By.CLASS_NAME, "locationCell").text.strip(),
-                        'base_price': row.find_element(By.CLASS_NAME, "priceCell").text.strip()
+                    class_cells = {
+                        key: row.find_element(By.CLASS_NAME, class_name).text
+                        for key, class_name in self.CELL_CLASSES.items()
                     }
                 except:
-                    return None
+                    class_cells = None
             
-            # Formatta e standardizza i dati
-            return {
-                'plate': data.get('plate', 'N/D'),
-                'brand_model': f"{data.get('brand', '')} {data.get('model', '')}".strip(),
-                'year': data.get('year', 'N/D'),
-                'km': data.get('km', 'N/D'),
-                'location': data.get('location', 'N/D'),
-                'base_price': data.get('base_price', 'N/D'),
-                'status': 'active',
-                'fonte': 'Clickar',
-                'last_update': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
+            return self.build_vehicle(cells, class_cells)
             
         except Exception as e:
-            st.warning(f"Errore estrazione dati: {str(e)}")
+            self.log(f"Errore estrazione dati: {str(e)}", 'warning')
             return None
 
+    def extract_table_data(self, indices: List[int] = None) -> tuple:
+        """
+        Serializza l'intera tabella veicoli con un solo execute_script
+        Args:
+            indices: Estrae solo le righe in queste posizioni (default tutte)
+        Returns:
+            tuple: (prima riga come WebElement o None, lista di righe grezze con 'cells' e 'classCells')
+        """
+        first_row, payload = self.driver.execute_script(
+            BULK_EXTRACT_SCRIPT, self.ROW_CLASSES, self.CELL_CLASSES, indices
+        )
+        return first_row, json.loads(payload)
+
+    def fingerprint_rows(self, rows) -> tuple:
+        """
+        Legge targa e testo grezzo di tutte le righe con un solo execute_script
+        Args:
+            rows: WebElement delle righe oppure classi con cui cercarle
+        Returns:
+            tuple: (prima riga come WebElement o None, lista di coppie [targa, testo])
+        """
+        first_row, payload = self.driver.execute_script(
+            ROW_FINGERPRINT_SCRIPT, rows, self.CELL_CLASSES['plate']
+        )
+        return first_row, json.loads(payload)
+
+    def extract_incremental(self, fingerprints: List[Tuple[str, str]],
+                            extract_at: Callable[[List[int]], list]) -> list:
+        """
+        Estrae completamente solo le righe nuove o modificate rispetto al run precedente
+        Args:
+            fingerprints: Coppie (targa, testo grezzo) in ordine di riga
+            extract_at: Estrae i veicoli alle posizioni indicate, nello stesso ordine
+        Returns:
+            list: Veicoli in ordine di riga (None per righe non estraibili)
+        """
+        plan = [self.row_index.classify(key, text) for key, text in fingerprints]
+        pending = [idx for idx, (_, cached) in enumerate(plan) if cached is None]
+        extracted = dict(zip(pending, extract_at(pending))) if pending else {}
+
+        vehicles = []
+        for idx, (status, cached) in enumerate(plan):
+            vehicle = cached if cached is not None else extracted.get(idx)
+            if cached is None and vehicle:
+                self.row_index.record(fingerprints[idx][1], vehicle)
+            vehicles.append(vehicle)
+        return vehicles
+
+    def extract_page(self) -> tuple:
+        """
+        Estrae i veicoli della pagina corrente nel browser
+        Returns:
+            tuple: (prima riga come WebElement o None, veicoli in ordine di riga, None se non estraibili)
+        """
+        build = lambda raw: self.build_vehicle(raw['cells'], raw['classCells'])
+
+        if self.bulk_extraction:
+            # Intera tabella in un solo round trip, parsing in Python
+            if self.row_index is None:
+                first_row, raws = self.extract_table_data()
+                return first_row, [build(raw) for raw in raws]
+            first_row, fingerprints = self.fingerprint_rows(self.ROW_CLASSES)
+            return first_row, self.extract_incremental(
+                fingerprints,
+                lambda indices: [build(raw) for raw in self.extract_table_data(indices)[1]]
+            )
+
+        # Ricerca righe veicoli con diversi selettori
+        rows = []
+        for selector in self.ROW_CLASSES:
+            rows = self.driver.find_elements(By.CLASS_NAME, selector)
+            if rows:
+                break
+        first_row = rows[0] if rows else None
+        if self.row_index is None or not rows:
+            return first_row, [self.extract_vehicle_data(row) for row in rows]
+
+        _, fingerprints = self.fingerprint_rows(rows)
+        return first_row, self.extract_incremental(
+            fingerprints,
+            lambda indices: [self.extract_vehicle_data(rows[idx]) for idx in indices]
+        )
+
+    def _page_done(self, page: int) -> bool:
+        return self.checkpoint is not None and self.checkpoint.is_done(page)
+
+    def _complete_page(self, page: int, vehicles: list, **cursor) -> None:
+        # Conteggi incrementali solo per le pagine accettate: i retry della stessa pagina non li ripetono
+        if self.row_index is not None:
+            self.row_index.accept(vehicles)
+        if self.checkpoint is not None:
+            self.checkpoint.complete(page, vehicles, **cursor)
+
+    def _resume_row_index(self) -> None:
+        """Le targhe delle pagine saltate grazie al checkpoint restano attive nell'indice incrementale"""
+        if self.row_index is not None and self.checkpoint is not None and self.checkpoint.resumed:
+            self.row_index.seen.update(vehicle.get('plate') for vehicle in self.checkpoint.vehicles())
+
+    def finish_incremental(self, complete: bool) -> list:
+        """
+        Chiude il run incrementale e riporta i conteggi; a run completo il checkpoint viene rimosso
+        Returns:
+            list: Veicoli non più presenti sul portale (status 'gone')
+        """
+        if complete and self.checkpoint is not None:
+            self.checkpoint.finish()
+        if self.row_index is None:
+            return []
+        gone = self.row_index.finish(complete)
+        stats = self.row_index.stats
+        self.log(
+            f"🔁 Incrementale: {stats['new']} nuovi, {stats['changed']} modificati, "
+            f"{stats['unchanged']} invariati, {stats['removed']} rimossi"
+        )
+        return gone
+
+    def build_vehicle(self, cells: list, class_cells: dict = None) -> dict:
+        """
+        Costruisce il record veicolo dai testi delle celle, comune a estrazione singola e bulk
+        Args:
+            cells: Testi delle celle td della riga
+            class_cells: Testi delle celle del layout a classi (None se assente)
+        Returns:
+            dict: Dati del veicolo standardizzati
+        """
+        # Mappatura celle -> dati (adatta in base alla struttura reale)
+        if len(cells) >= 6:
+            data = {
+                'plate': cells[0].strip(),
+                'brand': cells[1].strip(),
+                'model': cells[2].strip(),
+                'year': cells[3].strip(),
+                'km': cells[4].strip(),
+                'location': cells[5].strip(),
+                'base_price': cells[6].strip() if len(cells) > 6 else "N/D"
+            }
+        elif class_cells:
+            data = {key: value.strip() for key, value in class_cells.items()}
+        else:
+            data = {}
+        
+        # Formatta e standardizza i dati
+        return {
+            'plate': data.get('plate', 'N/D'),
+            'brand_model': f"{data.get('brand', '')} {data.get('model', '')}".strip(),
+            'year': data.get('year', 'N/D'),
+            'km': data.get('km', 'N/D'),
+            'location': data.get('location', 'N/D'),
+            'base_price': data.get('base_price', 'N/D'),
+            'status': 'active',
+            'fonte': 'Clickar',
+            'last_update': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
     def get_all_vehicles(self) -> list:
         """
         Recupera tutti i veicoli da tutte le pagine
         Returns:
             list: Lista dei veicoli trovati
         """
-        vehicles = []
+        return [vehicle for batch in self.iter_vehicle_pages() for vehicle in batch]
+
+    def iter_vehicle_pages(self, seen: set = None) -> Iterator[list]:
+        """
+        Scorre le pagine della sezione Introvabili nel browser
+        Args:
+            seen: Targhe già emesse da saltare, aggiornato con quelle nuove
+        Yields:
+            list: Veicoli di ogni pagina appena estratta; in coda quelli rimossi dal portale
+        """
+        seen = set() if seen is None else seen
+        total = 0
         page = 1
         retry_count = 0
-        max_retries = 3
+        # Attese tra i tentativi della pagina corrente: backoff esponenziale con jitter
+        delays = self.guard.delays()
+        complete = False
+        self.row_index = RowIndex(self.portal_key) if self.incremental else None
+        self._resume_row_index()
         
-        while retry_count < max_retries:
+        while True:
             try:
-                st.write(f"📃 Elaborazione pagina {page}...")
+                self.progress('pages', f"📃 Elaborazione pagina {page} ({total} veicoli finora)", page)
                 
                 # Attesa caricamento tabella (prova diversi selettori)
                 table_found = any([
@@ -331,42 +613,43 @@ class ClickarScraper(BaseScraper):
                 ])
                 
                 if not table_found:
-                    st.error("Tabella veicoli non trovata")
+                    self.log("Tabella veicoli non trovata", 'error')
                     break
                 
-                time.sleep(3)  # Attesa aggiuntiva per caricamento dati
+                # Attesa caricamento dati: tabella senza ulteriori mutazioni
+                self.waits.dom_stable(300, 10, 'table_stable')
                 
-                # Ricerca righe veicoli con diversi selettori
-                rows = []
-                for selector in [
-                    "vehicleRow",
-                    "rich-table-row",
-                    "vehicle-item"
-                ]:
-                    rows = self.driver.find_elements(By.CLASS_NAME, selector)
-                    if rows:
+                if self._page_done(page):
+                    # Pagina completata da un run interrotto: si passa alla successiva senza estrarla
+                    self.log(f"⏭️ Pagina {page} già completata", 'debug')
+                    first_row, _ = self.extract_table_data([])
+                else:
+                    first_row, extracted = self.extract_page()
+                    
+                    if not extracted:
+                        self.log(f"Nessun veicolo trovato nella pagina {page}", 'warning')
                         break
+                    
+                    page_vehicles = self.page_vehicles(extracted, page)
+                    total += len(page_vehicles)
+                    self._complete_page(page, page_vehicles)
+                    
+                    # Pagina consegnata subito; in caso di retry le targhe già emesse vengono saltate
+                    fresh = [vehicle for vehicle in page_vehicles if vehicle['plate'] not in seen]
+                    seen.update(vehicle['plate'] for vehicle in fresh)
+                    if fresh:
+                        yield fresh
                 
-                if not rows:
-                    st.warning(f"Nessun veicolo trovato nella pagina {page}")
-                    break
-                
-                # Estrazione dati veicoli
-                page_vehicles = []
-                for idx, row in enumerate(rows, 1):
-                    try:
-                        vehicle = self.extract_vehicle_data(row)
-                        if vehicle and vehicle.get('plate'):
-                            page_vehicles.append(vehicle)
-                            st.write(f"✅ Veicolo {idx} estratto: {vehicle['plate']}")
-                        else:
-                            st.warning(f"⚠️ Dati incompleti per veicolo {idx}")
-                    except Exception as e:
-                        st.error(f"❌ Errore estrazione veicolo {idx}: {str(e)}")
-                        continue
-                
-                vehicles.extend(page_vehicles)
-                st.success(f"Trovati {len(page_vehicles)} veicoli nella pagina {page}")
+                # Paginazione riconosciuta: le pagine successive vengono scaricate in parallelo
+                if page == 1 and self.concurrency > 1:
+                    request = self.detect_page_request(
+                        self.driver.execute_script(PAGE_LINKS_SCRIPT, PAGE_LINKS_SELECTOR),
+                        self.driver.current_url
+                    )
+                    if request:
+                        complete, count = yield from self.iter_pages_parallel(request, seen, via_http=False)
+                        total += count
+                        break
                 
                 # Gestione paginazione
                 next_page_found = False
@@ -379,83 +662,485 @@ class ClickarScraper(BaseScraper):
                         next_page = self.driver.find_element(By.XPATH, selector)
                         next_page.click()
                         next_page_found = True
-                        time.sleep(3)
+                        # Le righe della pagina corrente vengono sostituite dalla risposta AJAX
+                        if not self.waits.staleness(first_row, 15, 'pagination'):
+                            self.waits.network_idle(300, 10, 'pagination_network')
                         break
                     except:
                         continue
                 
                 if not next_page_found:
-                    st.info("Nessuna pagina successiva trovata")
+                    self.log("Nessuna pagina successiva trovata")
+                    complete = True
                     break
                 
                 page += 1
                 retry_count = 0  # Reset retry count on successful page
+                delays = self.guard.delays()
                 
             except Exception as e:
                 retry_count += 1
-                st.error(f"Errore nella pagina {page} (tentativo {retry_count}/{max_retries}): {str(e)}")
-                self.save_screenshot_st(f"page_{page}_error_{retry_count}")
-                if retry_count >= max_retries:
-                    st.error("Numero massimo di tentativi raggiunti")
+                self.log(
+                    f"Errore nella pagina {page} (tentativo {retry_count}/{self.guard.max_attempts}): {str(e)}",
+                    'error'
+                )
+                self.capture(f"page_{page}_error_{retry_count}", error=True)
+                delay = next(delays, None)
+                if delay is None:
+                    self.log("Numero massimo di tentativi raggiunti", 'error')
                     break
-                time.sleep(2)  # Attesa prima del retry
+                time.sleep(delay)  # Attesa prima del retry
                 
-        st.success(f"✅ Trovati {len(vehicles)} veicoli totali")
-        return vehicles
+        gone = self.finish_incremental(complete)
+        if gone:
+            yield gone
+        self.log(f"✅ Trovati {total} veicoli totali", 'success')
+        if self.debug:
+            self.log(f"⏱️ Tempi di attesa: {self.waits.summary()}")
+            self.log(f"🛡️ Resilienza: {self.guard.summary()}")
 
-    def scrape(self, username: str = None, password: str = None) -> list:
+    def page_vehicles(self, extracted: list, page: int) -> list:
         """
-        Metodo principale di scraping
+        Filtra i veicoli estratti da una pagina: dettaglio per riga solo a livello debug
         Args:
-            username: Username opzionale per il login
-            password: Password opzionale per il login
+            extracted: Veicoli in ordine di riga, None per righe non estraibili
+            page: Numero di pagina
         Returns:
-            list: Lista dei veicoli trovati o None se errore
+            list: Veicoli con targa
+        """
+        page_vehicles = []
+        incomplete = 0
+        for idx, vehicle in enumerate(extracted, 1):
+            if vehicle and vehicle.get('plate'):
+                page_vehicles.append(vehicle)
+                self.log(f"✅ Veicolo {idx} estratto: {vehicle['plate']}", 'debug', plate=vehicle['plate'])
+            else:
+                incomplete += 1
+                self.log(f"⚠️ Dati incompleti per veicolo {idx}", 'debug')
+        if incomplete:
+            self.log(f"⚠️ {incomplete} righe con dati incompleti nella pagina {page}", 'warning')
+        self.log(f"Trovati {len(page_vehicles)} veicoli nella pagina {page}", 'success')
+        return page_vehicles
+
+    @staticmethod
+    def detect_page_request(links: List[Tuple[str, Optional[str], Optional[str]]],
+                            page_url: str) -> Optional[PageRequest]:
+        """
+        Riconosce dai link di paginazione come richiedere direttamente una pagina qualsiasi
+        Args:
+            links: Terne (testo, href assoluto, onclick) dei link di paginazione
+            page_url: URL della pagina corrente
+        Returns:
+            Optional[PageRequest]: Meccanismo riconosciuto, None se le pagine vanno scorse una alla volta
+        """
+        numbered = {}
+        for text, href, onclick in links:
+            text = (text or '').strip()
+            if text.isdigit():
+                numbered.setdefault(int(text), (href, onclick))
+        others = sorted(number for number in numbered if number >= 2)
+        if not others:
+            return None
+        last_page = max(numbered)
+        href, onclick = numbered[others[0]]
+
+        candidates = []
+        if href and not onclick and not href.lower().startswith('javascript:') \
+                and href.split('#')[0] != page_url.split('#')[0]:
+            candidates.append(('url', href, URL_PAGE_RE, 0))
+        if onclick:
+            candidates.append(('ajax', onclick, SCRIPT_PAGE_RE, 1))
+
+        for kind, sample, pattern, field in candidates:
+            # Il numero di pagina deve comparire una sola volta nel link
+            matches = list(re.finditer(pattern.replace('{page}', str(others[0])), sample))
+            if len(matches) != 1:
+                continue
+            request = PageRequest(kind, sample[:matches[0].start()] + '{page}' + sample[matches[0].end():], last_page)
+            # Verifica sugli altri link numerati della paginazione
+            if all(request.render(number) == numbered[number][field]
+                   for number in others[1:] if numbered[number][field]):
+                return request
+        return None
+
+    def iter_pages_parallel(self, request: PageRequest, seen: set,
+                            via_http: bool) -> Generator[list, None, Tuple[bool, int]]:
+        """
+        Scarica in parallelo le pagine dalla 2 in poi e le consegna in ordine di pagina
+        Args:
+            request: Meccanismo di paginazione riconosciuto sulla prima pagina
+            seen: Targhe già emesse, aggiornato con quelle nuove
+            via_http: Pagine scaricate con il client HTTP invece che con browser dedicati
+        Yields:
+            list: Veicoli di ogni pagina
+        Returns:
+            Tuple[bool, int]: (tutte le pagine lette, veicoli trovati)
+        """
+        if via_http:
+            # Connessioni keep-alive condivise tra i thread
+            executor = FanOutExecutor(self.concurrency, lambda: self.http)
+            fetch = lambda http, page: self._fetch_page_http(http, request.render(page))
+        else:
+            # Ogni worker ha un browser con la sessione autenticata dello scraper principale
+            self.session_state = self.export_session_state()
+            executor = FanOutExecutor(self.concurrency, self._create_worker, self._release_worker)
+            fetch = lambda worker, page: self.guard.call(
+                worker.fetch_page, request, page, self.row_index is not None
+            )
+        self.log(f"⚡ Paginazione {request.kind}: pagine in parallelo su {executor.max_workers} worker")
+
+        complete = True
+        total = 0
+        next_page = 2
+        last_page = request.last_page
+        if self.checkpoint is not None:
+            # Ultima pagina già scoperta dal run interrotto, anche oltre le pagine saltate
+            last_page = max(last_page, self.checkpoint.cursor.get('last_page', 0))
+        try:
+            # A ondate: le pagine lette rivelano i numeri successivi della paginazione
+            while next_page <= last_page:
+                pages = [page for page in range(next_page, last_page + 1) if not self._page_done(page)]
+                next_page = last_page + 1
+                for page, result, error in executor.map_ordered(fetch, pages):
+                    if isinstance(error, CircuitOpenError):
+                        # Portale sospeso: le pagine rimanenti fallirebbero allo stesso modo
+                        complete = False
+                        self.log(f"⛔ {str(error)}", 'error')
+                        return complete, total
+                    if error:
+                        complete = False
+                        self.log(f"Errore nella pagina {page}: {str(error)}", 'error')
+                        continue
+                    if via_http:
+                        extracted, links = self._extract_tree(result), self._tree_page_links(result)
+                    else:
+                        extracted, links = self._extract_raws(result['raws'], result['fingerprints']), result['links']
+                    last_page = max([last_page] + [int(text.strip()) for text, _, _ in links
+                                                   if (text or '').strip().isdigit()])
+                    self.progress('pages', f"📃 Pagina {page} di {last_page} in parallelo", page, last_page)
+
+                    page_vehicles = self.page_vehicles(extracted, page)
+                    total += len(page_vehicles)
+                    self._complete_page(page, page_vehicles, last_page=last_page)
+                    fresh = [vehicle for vehicle in page_vehicles if vehicle['plate'] not in seen]
+                    seen.update(vehicle['plate'] for vehicle in fresh)
+                    if fresh:
+                        yield fresh
+        finally:
+            executor.close()
+        return complete, total
+
+    def _create_worker(self) -> 'ClickarScraper':
+        """Crea un worker con browser proprio e la sessione dello scraper principale"""
+        worker = ClickarScraper(
+            headless=self.headless, incremental=False, use_pool=self.use_pool, http_mode=False,
+            base_url=self.base_url
+        )
+        worker.wait_time = self.wait_time
+        if not worker.setup_driver():
+            raise RuntimeError("Setup driver del worker fallito")
+        try:
+            worker.import_session_state(self.session_state)
+        except Exception:
+            worker.cleanup()
+            raise
+        worker.is_logged_in = True
+        return worker
+
+    def _release_worker(self, worker: 'ClickarScraper') -> None:
+        worker.cleanup()
+
+    def fetch_page(self, request: PageRequest, page: int, fingerprints: bool = False) -> Dict:
+        """
+        Carica una pagina qualsiasi della lista nel browser del worker
+        Args:
+            request: Meccanismo di paginazione
+            page: Numero di pagina
+            fingerprints: Legge anche le impronte delle righe per l'incrementale
+        Returns:
+            Dict: Righe grezze ('raws'), impronte ('fingerprints') e link di paginazione ('links')
+        """
+        if request.kind == 'url':
+            self.driver.get(request.render(page))
+        else:
+            # Lo scroller AJAX richiede la pagina Introvabili aperta nel browser del worker
+            if not self.on_listing:
+                if not self.navigate_to_introvabili():
+                    raise RuntimeError("Sezione Introvabili non raggiungibile")
+                self.on_listing = True
+            first_row, _ = self.extract_table_data([])
+            if not self.driver.execute_script(AJAX_PAGE_SCRIPT, request.render(page), PAGE_LINKS_SELECTOR):
+                raise RuntimeError("Paginazione non trovata")
+            if not self.waits.staleness(first_row, 15, 'pagination'):
+                self.waits.network_idle(300, 10, 'pagination_network')
+
+        if not self.waits.until(
+            'vehicles_table',
+            lambda driver: any(driver.find_elements(By.CLASS_NAME, name)
+                               for name in ("vehiclesTable", "vehiclesList", "rich-table")),
+            10
+        ):
+            raise RuntimeError("Tabella veicoli non trovata")
+        self.waits.dom_stable(300, 10, 'table_stable')
+
+        _, raws = self.extract_table_data()
+        return {
+            'raws': raws,
+            'fingerprints': self.fingerprint_rows(self.ROW_CLASSES)[1] if fingerprints else None,
+            'links': self.driver.execute_script(PAGE_LINKS_SCRIPT, PAGE_LINKS_SELECTOR)
+        }
+
+    def _extract_raws(self, raws: list, fingerprints: Optional[list]) -> list:
+        """Costruisce i veicoli dalle righe grezze di un worker, con l'incrementale dello scraper principale"""
+        build = lambda raw: self.build_vehicle(raw['cells'], raw['classCells'])
+        if fingerprints is None:
+            return [build(raw) for raw in raws]
+        return self.extract_incremental(fingerprints, lambda indices: [build(raws[idx]) for idx in indices])
+
+    def _usable_href(self, link, page_url: str) -> Optional[str]:
+        """Restituisce l'href del link se porta a un'altra pagina senza JavaScript"""
+        href = (link.get('href') or '').strip()
+        if not href or href.lower().startswith('javascript:') or link.get('onclick'):
+            return None
+        if href.split('#')[0] == page_url.split('#')[0]:
+            return None
+        return href
+
+    def find_introvabili_url(self) -> Optional[str]:
+        """
+        Cerca via HTTP il link alla sezione Introvabili nella pagina post-login
+        Returns:
+            Optional[str]: URL della sezione o None se raggiungibile solo via JavaScript
+        """
+        page_url = self.driver.current_url
+        tree = self.http.get_html(page_url)
+        if tree is None:
+            return None
+
+        links = tree.xpath(
+            "//a[contains(translate(normalize-space(.), 'introvabili', 'INTROVABILI'), 'INTROVABILI')]"
+        )
+        for link in links:
+            href = self._usable_href(link, page_url)
+            if href:
+                return href
+        return None
+
+    def iter_vehicle_pages_http(self, seen: set = None) -> Generator[list, None, bool]:
+        """
+        Scorre le pagine della sezione Introvabili via HTTP
+        Args:
+            seen: Targhe già emesse, aggiornato con quelle nuove
+        Yields:
+            list: Veicoli di ogni pagina appena scaricata; in coda quelli rimossi dal portale
+        Returns:
+            bool: True se tutte le pagine sono state lette, False se serve il browser
+        """
+        seen = set() if seen is None else seen
+        url = self.find_introvabili_url()
+        if not url:
+            return False
+
+        total = 0
+        page = 1
+        complete = False
+        self.row_index = RowIndex(self.portal_key) if self.incremental else None
+        self._resume_row_index()
+
+        while url:
+            self.progress('pages', f"📃 Elaborazione pagina {page} via HTTP ({total} veicoli finora)", page)
+            tree = self.http.get_html(url, required_xpath=self._rows_xpath())
+            if tree is None:
+                return False
+
+            # Pagina completata da un run interrotto: serve solo per il link alla successiva
+            if not self._page_done(page):
+                page_vehicles = [vehicle for vehicle in self._extract_tree(tree) if vehicle and vehicle.get('plate')]
+
+                total += len(page_vehicles)
+                self.log(f"Trovati {len(page_vehicles)} veicoli nella pagina {page}", 'success')
+                self._complete_page(page, page_vehicles)
+                seen.update(vehicle['plate'] for vehicle in page_vehicles)
+                if page_vehicles:
+                    yield page_vehicles
+
+            # Pagine richiedibili per URL: le successive vengono scaricate in parallelo
+            if page == 1 and self.concurrency > 1:
+                request = self.detect_page_request(self._tree_page_links(tree), url)
+                if request and request.kind == 'url':
+                    complete, count = yield from self.iter_pages_parallel(request, seen, via_http=True)
+                    total += count
+                    if not complete:
+                        return False
+                    break
+
+            # Paginazione: solo link con href reale, altrimenti serve il browser
+            next_links = tree.xpath(
+                f"//a[({class_xpath('pageNumber')} or {class_xpath('page-item')}) "
+                f"and normalize-space(text())='{page + 1}']"
+            )
+            if not next_links:
+                complete = True
+                break
+            url = self._usable_href(next_links[0], url)
+            if not url:
+                return False
+            page += 1
+
+        gone = self.finish_incremental(complete)
+        if gone:
+            yield gone
+        self.log(f"✅ Trovati {total} veicoli totali", 'success')
+        return True
+
+    def _rows_xpath(self) -> str:
+        return ' | '.join(f"//*[{class_xpath(row_class)}]" for row_class in self.ROW_CLASSES)
+
+    def _fetch_page_http(self, http, url: str):
+        """Scarica una pagina della lista con il client HTTP condiviso"""
+        tree = http.get_html(url, required_xpath=self._rows_xpath())
+        if tree is None:
+            raise RuntimeError(f"Pagina generata solo via JavaScript: {url}")
+        return tree
+
+    def _extract_tree(self, tree) -> list:
+        """Estrae i veicoli di una pagina HTML analizzata con lxml, in ordine di riga"""
+        # Stessa priorità di classi dell'estrazione nel browser
+        rows = []
+        for row_class in self.ROW_CLASSES:
+            rows = tree.xpath(f"//*[{class_xpath(row_class)}]")
+            if rows:
+                break
+
+        if self.row_index is None:
+            return [self._build_vehicle_from_node(row) for row in rows]
+        return self.extract_incremental(
+            [(self._node_plate(row), self._node_fingerprint(row)) for row in rows],
+            lambda indices: [self._build_vehicle_from_node(rows[idx]) for idx in indices]
+        )
+
+    def _tree_page_links(self, tree) -> list:
+        """Terne (testo, href, onclick) dei link di paginazione di una pagina HTML"""
+        return [
+            (node_text(link), link.get('href'), link.get('onclick'))
+            for link in tree.xpath(
+                f"//a[{class_xpath('pageNumber')} or {class_xpath('page-item')}] | //span[{class_xpath('pageNumber')}]"
+            )
+        ]
+
+    def _build_vehicle_from_node(self, row) -> dict:
+        """Costruisce il veicolo da una riga HTML analizzata con lxml"""
+        cells = [node_text(cell) for cell in row.xpath('.//td')]
+        class_cells = None
+        if len(cells) < 6:
+            found = {
+                key: row.xpath(f".//*[{class_xpath(class_name)}]")
+                for key, class_name in self.CELL_CLASSES.items()
+            }
+            if all(found.values()):
+                class_cells = {key: node_text(nodes[0]) for key, nodes in found.items()}
+        return self.build_vehicle(cells, class_cells)
+
+    def _node_plate(self, row) -> str:
+        """Targa di una riga HTML, con la stessa regola dello script di fingerprint"""
+        cells = row.xpath('.//td')
+        if len(cells) >= 6:
+            return node_text(cells[0])
+        plate_cells = row.xpath(f".//*[{class_xpath(self.CELL_CLASSES['plate'])}]")
+        return node_text(plate_cells[0]) if plate_cells else ''
+
+    @staticmethod
+    def _node_fingerprint(row) -> str:
+        """Testo di una riga HTML per l'impronta incrementale, come ROW_FINGERPRINT_SCRIPT nel browser"""
+        cells = row.xpath('.//td')
+        if cells:
+            return ' '.join(cell.text_content() for cell in cells)
+        return row.text_content()
+
+    def iter_vehicles(self, username: str = None, password: str = None) -> Iterator[list]:
+        """
+        Scraping in streaming della sezione Introvabili
+        Args:
+            username: Username per il login
+            password: Password per il login
+        Yields:
+            list: Veicoli di ogni pagina, appena estratta
         """
         try:
             # Verifica credenziali
             if not username or not password:
-                st.error("❌ Credenziali mancanti")
-                return None
+                self.log("❌ Credenziali mancanti", 'error')
+                return
             
             # Setup iniziale se necessario
             if not self.driver:
                 if not self.setup_driver():
-                    st.error("❌ Setup driver fallito")
-                    return None
+                    self.log("❌ Setup driver fallito", 'error')
+                    return
             
             # Login
-            st.write("🔐 Tentativo login...")
+            self.log("🔐 Tentativo login...")
             if not self.login(username, password):
-                st.error("❌ Login fallito")
-                return None
+                self.log("❌ Login fallito", 'error')
+                return
             
-            # Navigazione a Introvabili
-            st.write("🔍 Navigazione a sezione Introvabili...")
-            if not self.navigate_to_introvabili():
-                st.error("❌ Navigazione fallita")
-                return None
+            # Targhe già consegnate: il fallback al browser non le ripete
+            seen = set()
+            completed = False
             
-            # Recupero veicoli
-            st.write("🚗 Recupero veicoli...")
-            vehicles = self.get_all_vehicles()
+            # Run interrotto: i veicoli delle pagine completate vengono riconsegnati subito
+            checkpoint = self.open_checkpoint()
+            if checkpoint.resumed:
+                resumed = checkpoint.vehicles()
+                seen.update(vehicle['plate'] for vehicle in resumed)
+                if resumed:
+                    yield resumed
             
-            if not vehicles:
-                st.warning("⚠️ Nessun veicolo trovato")
-                return None
+            # Modalità HTTP: il browser serve solo per il login
+            if self.handoff_to_http():
+                self.log("⚡ Recupero veicoli via HTTP...")
+                try:
+                    completed = yield from self.iter_vehicle_pages_http(seen)
+                except Exception as e:
+                    self.log(f"⚠️ Recupero HTTP fallito: {str(e)}", 'warning')
+                if not completed:
+                    self.log("↩️ Pagine dinamiche: uso il browser")
             
-            return vehicles
+            if not completed:
+                # Navigazione a Introvabili
+                self.log("🔍 Navigazione a sezione Introvabili...")
+                if not self.navigate_to_introvabili():
+                    self.log("❌ Navigazione fallita", 'error')
+                    return
+                
+                # Recupero veicoli
+                self.log("🚗 Recupero veicoli...")
+                yield from self.iter_vehicle_pages(seen)
             
         except Exception as e:
-            st.error(f"❌ Errore durante lo scraping: {str(e)}")
-            self.save_screenshot_st("scrape_error")
-            return None
+            self.log(f"❌ Errore durante lo scraping: {str(e)}", 'error')
+            self.capture("scrape_error", error=True)
         finally:
             try:
                 self.cleanup()
-                st.write("🧹 Pulizia browser completata")
+                self.log("🧹 Pulizia browser completata")
             except Exception as e:
-                st.warning(f"⚠️ Errore durante la pulizia: {str(e)}")
+                self.log(f"⚠️ Errore durante la pulizia: {str(e)}", 'warning')
+
+    def scrape(self, username: str = None, password: str = None) -> list:
+        """
+        Metodo principale di scraping
+        Args:
+            username: Username opzionale per il login
+            password: Password opzionale per il login
+        Returns:
+            list: Lista dei veicoli trovati o None se errore
+        """
+        vehicles = [vehicle for batch in self.iter_vehicles(username, password) for vehicle in batch]
+        if not vehicles:
+            self.log("⚠️ Nessun veicolo trovato", 'warning')
+            return None
+        return vehicles
 
     # Implementazione metodi astratti richiesti da BaseScraper
     def get_auctions(self) -> list:
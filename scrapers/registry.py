@@ -0,0 +1,51 @@
+# scrapers/registry.py
+"""
+Registro dei plugin dei portali dichiarati in PORTAL_PLUGINS.
+I moduli degli scraper (Selenium, lxml, requests) vengono importati al primo uso del portale,
+non all'avvio dell'app o del worker.
+"""
+from config.settings import PORTAL_PLUGINS
+from importlib import import_module
+from typing import Dict, List
+import threading
+
+_classes: Dict[str, type] = {}
+_lock = threading.Lock()
+
+
+def portal_names(enabled_only: bool = True) -> List[str]:
+    """Nomi dei portali registrati, nell'ordine di PORTAL_PLUGINS"""
+    return [name for name, plugin in PORTAL_PLUGINS.items() if plugin.get('enabled', True) or not enabled_only]
+
+
+def resolve(name: str) -> str:
+    """
+    Nome del portale registrato
+    Args:
+        name: Nome ('Clickar') o chiave ('clickar') del portale, senza distinzione di maiuscole
+    Raises:
+        KeyError: Portale non registrato
+    """
+    for portal, plugin in PORTAL_PLUGINS.items():
+        if name.lower() in (portal.lower(), plugin['key']):
+            return portal
+    raise KeyError(f"Portale sconosciuto: {name}")
+
+
+def get_plugin(name: str) -> Dict:
+    return PORTAL_PLUGINS[resolve(name)]
+
+
+def load_scraper_class(name: str) -> type:
+    """Importa (una sola volta) la classe scraper del portale"""
+    portal = resolve(name)
+    with _lock:
+        if portal not in _classes:
+            plugin = PORTAL_PLUGINS[portal]
+            _classes[portal] = getattr(import_module(plugin['module']), plugin['class'])
+        return _classes[portal]
+
+
+def create_scraper(name: str, **kwargs):
+    """Crea lo scraper del portale; kwargs passati al costruttore (es. headless)"""
+    return load_scraper_class(name)(**kwargs)
@@ -0,0 +1,248 @@
+# scrapers/resilience.py
+from config.settings import RESILIENCE_SETTINGS
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, Optional
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Circuito aperto: il portale non risponde e le richieste sono sospese"""
+
+
+def portal_settings(portal: Optional[str], **overrides) -> Dict:
+    """Impostazioni di resilienza del portale: default, poi valori del portale, poi override non nulli"""
+    settings = dict(RESILIENCE_SETTINGS['default'])
+    settings.update(RESILIENCE_SETTINGS.get(portal or '', {}))
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def backoff_delays(retries: int, base: float, cap: float) -> Iterator[float]:
+    """
+    Attese tra un tentativo e il successivo: backoff esponenziale con jitter
+    (metà fissa, metà casuale) per non sincronizzare i retry dei worker
+    """
+    for attempt in range(max(0, retries)):
+        delay = min(cap, base * 2 ** attempt)
+        yield delay / 2 + random.uniform(0, delay / 2)
+
+
+class TokenBucket:
+    """Limite di richieste al secondo con raffiche fino a burst"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Attende un token
+        Returns:
+            float: Secondi di attesa
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AimdLimiter:
+    """
+    Concorrenza adattiva: il limite cresce di circa uno per ogni giro di risposte rapide
+    e si dimezza quando la latenza supera l'obiettivo o gli errori superano la soglia
+    """
+
+    def __init__(self, minimum: int, maximum: int, initial: int, latency_target: float,
+                 error_rate: float, window: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.latency_target = latency_target
+        self.error_rate = error_rate
+        self.in_flight = 0
+        self.stats = {'increases': 0, 'decreases': 0}
+        self._results = deque(maxlen=max(1, window))
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._results.append(ok)
+            errors = self._results.count(False)
+            overloaded = latency > self.latency_target or (
+                not ok and errors / len(self._results) >= self.error_rate
+            )
+            now = time.monotonic()
+            if overloaded:
+                # Al più un dimezzamento per intervallo: le risposte lente già in volo non contano due volte
+                if now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+                    self.stats['decreases'] += 1
+            elif ok and self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.stats['increases'] += 1
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Dopo failure_threshold errori consecutivi il circuito si apre e le richieste vengono rifiutate;
+    trascorso reset_timeout passa una sola richiesta di prova che lo richiude o lo riapre
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open':
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.state = 'closed'
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class PortalGuard:
+    """Limite di richieste, concorrenza adattiva, retry con backoff e circuit breaker di un portale"""
+    _instances: Dict[str, 'PortalGuard'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, portal: Optional[str], **overrides):
+        """
+        Args:
+            portal: Chiave del portale in RESILIENCE_SETTINGS (es. 'clickar')
+            overrides: Valori che sostituiscono le impostazioni (es. max_attempts)
+        """
+        self.portal = portal
+        self.settings = portal_settings(portal, **overrides)
+        settings = self.settings
+        self.bucket = TokenBucket(settings['rate'], settings['burst'])
+        self.limiter = AimdLimiter(
+            settings['min_concurrency'], settings['max_concurrency'], settings['initial_concurrency'],
+            settings['latency_target'], settings['error_rate'], settings['window']
+        )
+        self.breaker = CircuitBreaker(settings['failure_threshold'], settings['reset_timeout'])
+        self.stats = {'calls': 0, 'failures': 0, 'retries': 0, 'rejected': 0, 'throttled': 0.0}
+
+    @classmethod
+    def for_portal(cls, portal: Optional[str]) -> 'PortalGuard':
+        """Guard del portale condiviso da tutti gli scraper e i worker del processo"""
+        with cls._instances_lock:
+            guard = cls._instances.get(portal)
+            if guard is None:
+                guard = cls._instances[portal] = cls(portal)
+            return guard
+
+    @classmethod
+    def configure(cls, portal: Optional[str], **overrides) -> 'PortalGuard':
+        """Sostituisce il guard del portale con impostazioni diverse (es. dalle Opzioni Avanzate)"""
+        with cls._instances_lock:
+            guard = cls._instances[portal] = cls(portal, **overrides)
+            return guard
+
+    @property
+    def max_attempts(self) -> int:
+        return max(1, self.settings['max_attempts'])
+
+    def delays(self) -> Iterator[float]:
+        """Attese tra i tentativi di un'operazione, al più max_attempts - 1"""
+        return backoff_delays(self.max_attempts - 1, self.settings['backoff_base'], self.settings['backoff_max'])
+
+    def call(self, fn: Callable, *args, retry_if: Callable[[Exception], bool] = None, **kwargs) -> Any:
+        """
+        Esegue fn rispettando limite di richieste, concorrenza e circuit breaker,
+        ripetendola con backoff sugli errori transitori
+        Args:
+            fn: Operazione verso il portale
+            retry_if: Riconosce gli errori transitori (default tutti)
+        Raises:
+            CircuitOpenError: Portale sospeso dopo troppi errori consecutivi
+        """
+        delays = self.delays()
+        while True:
+            if not self.breaker.allow():
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(
+                    f"{self.portal}: portale sospeso dopo {self.breaker.failures} errori consecutivi"
+                )
+            self.stats['throttled'] += self.bucket.acquire()
+            self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                transient = retry_if is None or retry_if(e)
+                # Un errore non transitorio (es. 404) è comunque una risposta del portale
+                self._record(start, not transient)
+                if not transient:
+                    raise
+                error = e
+            else:
+                self._record(start, True)
+                return result
+
+            self.stats['failures'] += 1
+            delay = next(delays, None)
+            if delay is None:
+                raise error
+            self.stats['retries'] += 1
+            time.sleep(delay)
+
+    def _record(self, start: float, ok: bool) -> None:
+        self.limiter.release(time.monotonic() - start, ok)
+        self.breaker.record(ok)
+        self.stats['calls'] += 1
+
+    def summary(self) -> str:
+        """Riepilogo per i log di fine run"""
+        return (
+            f"{self.stats['calls']} richieste, {self.stats['retries']} retry, "
+            f"{self.stats['rejected']} rifiutate, attesa limite {self.stats['throttled']:.1f}s, "
+            f"concorrenza {self.limiter.limit:.1f}, circuito {self.breaker.state}"
+        )
@@ -0,0 +1,122 @@
+# scrapers/row_index.py
+from config.settings import DATA_DIR
+from typing import Dict, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import os
+import time
+
+
+class RowIndex:
+    """Indice locale delle righe del run precedente: targa -> impronta del testo e veicolo estratto"""
+
+    def __init__(self, portal: str, path: str = None):
+        self.portal = portal
+        self.path = path or os.path.join(DATA_DIR, f"row_index_{portal}.json")
+        self.entries: Dict[str, Dict] = self._load()
+        self.seen = set()
+        # Esito del confronto delle righe estratte ma non ancora accettate: targa -> stato
+        self.pending: Dict[str, str] = {}
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def fingerprint(text: str) -> str:
+        """Impronta economica del testo grezzo della riga, indipendente dagli spazi"""
+        return hashlib.sha1(' '.join((text or '').split()).encode('utf-8')).hexdigest()
+
+    def classify(self, key: str, text: str) -> Tuple[str, Optional[Dict]]:
+        """
+        Confronta una riga con il run precedente; i conteggi arrivano solo con accept()
+        Args:
+            key: Targa letta dalla riga (può essere vuota)
+            text: Testo grezzo della riga
+        Returns:
+            Tuple[str, Optional[Dict]]: ('new' | 'changed' | 'unchanged', veicolo riutilizzabile se invariato)
+        """
+        key = (key or '').strip()
+        entry = self.entries.get(key) if key else None
+
+        if entry is None:
+            status = 'new'
+        elif entry['fingerprint'] != self.fingerprint(text):
+            status = 'changed'
+        else:
+            status = 'unchanged'
+        if key:
+            # In un retry la riga è già stata registrata: resta l'esito del primo confronto
+            self.pending.setdefault(key, status)
+        if status != 'unchanged':
+            return status, None
+
+        vehicle = copy.deepcopy(entry['vehicle'])
+        vehicle['status'] = 'active'
+        vehicle['last_update'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        return 'unchanged', vehicle
+
+    def record(self, text: str, vehicle: Dict) -> None:
+        """Registra una riga estratta completamente (nuova o modificata)"""
+        plate = vehicle.get('plate')
+        if not plate or plate == 'N/D':
+            return
+        self.pending.setdefault(plate, 'new')
+        self.entries[plate] = {
+            'fingerprint': self.fingerprint(text),
+            'vehicle': vehicle,
+            'status': 'active',
+            'seen_at': time.time()
+        }
+
+    def accept(self, vehicles: List[Dict]) -> None:
+        """
+        Conta i veicoli di una pagina accettata e li segna come presenti; va chiamato una sola volta
+        per pagina, dopo gli eventuali retry
+        """
+        now = time.time()
+        for vehicle in vehicles:
+            plate = vehicle.get('plate')
+            status = self.pending.pop(plate, None)
+            if status is None or plate in self.seen:
+                continue
+            self.stats[status] += 1
+            self.seen.add(plate)
+            entry = self.entries.get(plate)
+            if entry is not None:
+                entry['status'] = 'active'
+                entry['seen_at'] = now
+
+    def finish(self, complete: bool) -> List[Dict]:
+        """
+        Chiude il run salvando l'indice
+        Args:
+            complete: True se sono state lette tutte le pagine; solo allora le targhe mancanti sono rimosse
+        Returns:
+            List[Dict]: Veicoli non più presenti, con status 'gone'
+        """
+        gone = []
+        if complete:
+            for plate, entry in self.entries.items():
+                if plate in self.seen or entry.get('status') == 'gone':
+                    continue
+                entry['status'] = 'gone'
+                vehicle = copy.deepcopy(entry['vehicle'])
+                vehicle['status'] = 'gone'
+                vehicle['last_update'] = time.strftime('%Y-%m-%d %H:%M:%S')
+                gone.append(vehicle)
+            self.stats['removed'] = len(gone)
+        self.save()
+        return gone
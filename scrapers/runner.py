@@ -0,0 +1,120 @@
+# scrapers/runner.py
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def _portal_worker(source_name: str, username: str, password: str, headless: bool, events,
+                   options: Dict = None) -> None:
+    """
+    Esegue lo scraping di un singolo portale in un processo dedicato
+    Args:
+        source_name: Nome del portale (chiave di PORTAL_PLUGINS)
+        username: Username per il login
+        password: Password per il login
+        headless: Esegue Chromium senza interfaccia
+        events: Coda su cui pubblicare gli eventi verso la pagina Streamlit
+        options: Parametri per BaseScraper.configure (es. max_attempts, timeout)
+    """
+    bus = None
+    try:
+        events.put(('status', source_name, f"🔧 Inizializzazione {source_name}..."))
+        # Gli eventi dello scraper arrivano alla pagina a blocchi, insieme ai batch di veicoli
+        from scrapers.events import EventBus, QueueSink
+        bus = EventBus.get_instance()
+        bus.subscribe(QueueSink(events, source_name))
+        # Il modulo dello scraper viene importato solo nel processo del portale
+        from scrapers.registry import create_scraper
+        scraper = create_scraper(source_name, headless=headless)
+        if options:
+            scraper.configure(**options)
+
+        events.put(('status', source_name, f"🔐 {source_name}: scraping in corso..."))
+        # Ogni blocco viene inoltrato subito: il processo non accumula i veicoli del portale
+        for batch in scraper.iter_vehicles(username, password):
+            events.put(('batch', source_name, batch))
+    except Exception as e:
+        events.put(('error', source_name, f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"))
+    finally:
+        # Anche dopo un errore: gli avvisi e gli errori ancora nel buffer spiegano il fallimento
+        if bus is not None:
+            bus.flush()
+        events.put(('done', source_name, None))
+
+
+class ConcurrentRunner:
+    """Esegue i portali abilitati in parallelo, un processo (e un Chromium) per portale"""
+
+    def __init__(self, sources: List[Tuple[str, object]], headless: bool = True,
+                 timeout: Optional[float] = None, options: Dict = None):
+        """
+        Args:
+            sources: Lista di tuple (nome portale, credenziali con username/password)
+            headless: Esegue Chromium senza interfaccia
+            timeout: Tempo massimo in secondi per portale (None = nessun limite)
+            options: Parametri per BaseScraper.configure in ogni processo
+        """
+        self.sources = sources
+        self.headless = headless
+        self.timeout = timeout
+        self.options = options
+        # spawn: Streamlit è multi-thread, il fork del processo non è sicuro
+        self.ctx = mp.get_context('spawn')
+
+    def run(self, poll_interval: float = 0.5) -> Iterator[Tuple[str, str, object]]:
+        """
+        Avvia i worker e restituisce gli eventi man mano che arrivano
+        Yields:
+            Tuple[str, str, object]: (tipo evento, portale, payload) con tipo in
+            'status', 'events', 'batch', 'error', 'done'
+        """
+        events = self.ctx.Queue()
+        processes = {}
+        started_at = {}
+
+        for source_name, credentials in self.sources:
+            process = self.ctx.Process(
+                target=_portal_worker,
+                args=(source_name, credentials.username, credentials.password, self.headless, events,
+                      self.options),
+                name=f"scraper-{source_name}",
+                daemon=True
+            )
+            process.start()
+            processes[source_name] = process
+            started_at[source_name] = time.time()
+
+        pending = set(processes)
+        try:
+            while pending:
+                try:
+                    kind, source_name, payload = events.get(timeout=poll_interval)
+                    if kind == 'done':
+                        pending.discard(source_name)
+                    yield kind, source_name, payload
+                    continue
+                except queue.Empty:
+                    pass
+
+                # Un worker terminato senza evento 'done' è andato in crash
+                for source_name in list(pending):
+                    process = processes[source_name]
+                    elapsed = time.time() - started_at[source_name]
+
+                    if self.timeout and elapsed > self.timeout and process.is_alive():
+                        process.terminate()
+                        process.join(5)
+                        pending.discard(source_name)
+                        yield 'error', source_name, f"Timeout dopo {int(elapsed)} secondi"
+                        yield 'done', source_name, None
+                    elif not process.is_alive() and events.empty():
+                        pending.discard(source_name)
+                        yield 'error', source_name, f"Processo terminato inaspettatamente (exit code {process.exitcode})"
+                        yield 'done', source_name, None
+        finally:
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+                process.join(1)
@@ -0,0 +1,90 @@
+# scrapers/session_store.py
+from cryptography.fernet import Fernet, InvalidToken
+from config.settings import DATA_DIR, SESSION_SETTINGS
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import time
+
+
+class SessionStore:
+    """Archivio cifrato su disco delle sessioni autenticate, per portale e account"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.path.join(DATA_DIR, 'sessions')
+        os.makedirs(self.directory, exist_ok=True)
+        self.fernet = Fernet(self._load_key())
+
+    def _load_key(self) -> bytes:
+        """Chiave dalla variabile d'ambiente o, in alternativa, da file locale generato al primo uso"""
+        key = os.environ.get(SESSION_SETTINGS['key_env'])
+        if key:
+            return key.encode()
+
+        key_path = os.path.join(self.directory, '.key')
+        if not os.path.exists(key_path):
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(Fernet.generate_key())
+        with open(key_path, 'rb') as f:
+            return f.read().strip()
+
+    def _path(self, portal: str, account: str) -> str:
+        digest = hashlib.sha256(f"{portal}:{account}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.session")
+
+    def save(self, portal: str, account: str, cookies: List[Dict], local_storage: Dict) -> None:
+        """
+        Salva cookie e local storage dopo un login riuscito
+        Args:
+            portal: Chiave del portale (es. 'clickar')
+            account: Username usato per il login
+            cookies: Cookie del browser (formato CDP)
+            local_storage: Contenuto del localStorage dell'origine del portale
+        """
+        ttl = SESSION_SETTINGS['ttl_minutes'].get(portal, 60) * 60
+        now = time.time()
+        payload = {
+            'portal': portal,
+            'cookies': cookies,
+            'local_storage': local_storage,
+            'saved_at': now,
+            'expires_at': now + ttl
+        }
+        token = self.fernet.encrypt(json.dumps(payload).encode())
+
+        path = self._path(portal, account)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(token)
+        os.replace(tmp_path, path)
+
+    def load(self, portal: str, account: str) -> Optional[Dict]:
+        """
+        Recupera una sessione salvata se non scaduta
+        Returns:
+            Optional[Dict]: Dati sessione o None se assente, scaduta o illeggibile
+        """
+        path = self._path(portal, account)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                payload = json.loads(self.fernet.decrypt(f.read()))
+        except (InvalidToken, ValueError, OSError):
+            self.invalidate(portal, account)
+            return None
+
+        if payload.get('expires_at', 0) <= time.time():
+            self.invalidate(portal, account)
+            return None
+        return payload
+
+    def invalidate(self, portal: str, account: str) -> None:
+        """Elimina la sessione salvata (scaduta o non più valida)"""
+        try:
+            os.remove(self._path(portal, account))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,208 @@
+# scrapers/waits.py
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from config.settings import DATA_DIR
+from typing import Callable, Dict, List
+import json
+import os
+import time
+
+# Risolve dopo quiet_ms senza mutazioni del DOM
+DOM_STABLE_SCRIPT = """
+var quietMs = arguments[0];
+var done = arguments[arguments.length - 1];
+var timer = null;
+var observer = new MutationObserver(function() {
+    clearTimeout(timer);
+    timer = setTimeout(finish, quietMs);
+});
+function finish() {
+    observer.disconnect();
+    done(true);
+}
+observer.observe(document.documentElement || document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+timer = setTimeout(finish, quietMs);
+"""
+
+NETWORK_START = 'Network.requestWillBeSent'
+NETWORK_END = ('Network.loadingFinished', 'Network.loadingFailed')
+PAGE_LOADED = 'Page.loadEventFired'
+
+
+class WaitEngine:
+    """Attese su condizioni concrete (DOM, rete, staleness) con misura della durata effettiva"""
+
+    def __init__(self, driver, default_timeout: int = 20, portal: str = None):
+        self.driver = driver
+        self.default_timeout = default_timeout
+        self.portal = portal
+        self.stats: List[Dict] = []
+        self._inflight = set()
+        # Traffico letto dal performance log: byte ricevuti, richieste bloccate, tempi di caricamento
+        self.traffic = {'requests': 0, 'bytes': 0, 'blocked': 0, 'page_loads': 0, 'load_time': 0.0}
+        self._document_started = None
+        # Callback(messaggio DevTools) per ogni evento letto (es. registratore dei benchmark)
+        self.listeners: List[Callable[[Dict], None]] = []
+
+    def _record(self, name: str, started: float, timeout: float, success: bool) -> bool:
+        self.stats.append({
+            'name': name,
+            'duration': round(time.time() - started, 3),
+            'timeout': timeout,
+            'success': success
+        })
+        return success
+
+    def until(self, name: str, condition: Callable, timeout: float = None, poll: float = 0.1) -> bool:
+        """
+        Attende una condizione arbitraria sul driver
+        Args:
+            name: Nome dell'attesa nelle statistiche
+            condition: Callable(driver) che restituisce un valore truthy a condizione soddisfatta
+            timeout: Secondi massimi di attesa
+            poll: Intervallo di polling in secondi
+        Returns:
+            bool: True se la condizione è stata soddisfatta entro il timeout
+        """
+        timeout = timeout or self.default_timeout
+        started = time.time()
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=poll).until(condition)
+            return self._record(name, started, timeout, True)
+        except TimeoutException:
+            return self._record(name, started, timeout, False)
+
+    def document_ready(self, timeout: float = None) -> bool:
+        """Attende document.readyState == 'complete'"""
+        return self.until(
+            'document_ready',
+            lambda driver: driver.execute_script("return document.readyState") == 'complete',
+            timeout
+        )
+
+    def dom_stable(self, quiet_ms: int = 500, timeout: float = None, name: str = 'dom_stable') -> bool:
+        """
+        Attende che il DOM resti senza mutazioni per quiet_ms millisecondi
+        Returns:
+            bool: True se il DOM si è stabilizzato entro il timeout
+        """
+        timeout = timeout or self.default_timeout
+        started = time.time()
+        # Il timeout degli script è del driver: va ripristinato, i driver del pool passano ad altri scraper
+        try:
+            previous = self.driver.timeouts.script
+        except (AttributeError, WebDriverException):
+            previous = None
+        try:
+            self.driver.set_script_timeout(timeout)
+            self.driver.execute_async_script(DOM_STABLE_SCRIPT, quiet_ms)
+            return self._record(name, started, timeout, True)
+        except (TimeoutException, WebDriverException):
+            return self._record(name, started, timeout, False)
+        finally:
+            if previous is not None:
+                try:
+                    self.driver.set_script_timeout(previous)
+                except WebDriverException:
+                    pass
+
+    def network_idle(self, idle_ms: int = 500, timeout: float = None, name: str = 'network_idle') -> bool:
+        """
+        Attende che non ci siano richieste di rete in corso per idle_ms millisecondi,
+        leggendo gli eventi Network dal performance log di DevTools
+        Returns:
+            bool: True se la rete è rimasta inattiva entro il timeout
+        """
+        timeout = timeout or self.default_timeout
+        started = time.time()
+        idle_since = None
+
+        while time.time() - started < timeout:
+            try:
+                self.drain_network()
+            except WebDriverException:
+                # Performance log non disponibile: ripiego sulla stabilità del DOM
+                return self.dom_stable(idle_ms, timeout - (time.time() - started), name)
+
+            if self._inflight:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.time()
+            elif (time.time() - idle_since) * 1000 >= idle_ms:
+                return self._record(name, started, timeout, True)
+            time.sleep(0.1)
+
+        # Richieste mai completate (es. long polling) non devono bloccare le attese successive
+        self._inflight.clear()
+        return self._record(name, started, timeout, False)
+
+    def drain_network(self) -> None:
+        """
+        Legge gli eventi accumulati nel performance log (unico lettore del log durante il prestito),
+        aggiornando le richieste in corso e i contatori di traffico
+        """
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            for listener in self.listeners:
+                listener(message)
+            method = message.get('method')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == NETWORK_START:
+                self._inflight.add(request_id)
+                self.traffic['requests'] += 1
+                if params.get('type') == 'Document' and self._document_started is None:
+                    self._document_started = params.get('timestamp')
+            elif method in NETWORK_END:
+                self._inflight.discard(request_id)
+                if method == 'Network.loadingFinished':
+                    self.traffic['bytes'] += int(params.get('encodedDataLength', 0))
+                elif params.get('blockedReason'):
+                    self.traffic['blocked'] += 1
+            elif method == PAGE_LOADED and self._document_started is not None:
+                # Timestamp monotoni di DevTools, in secondi
+                self.traffic['page_loads'] += 1
+                self.traffic['load_time'] += max(params.get('timestamp', 0) - self._document_started, 0)
+                self._document_started = None
+
+    def staleness(self, element, timeout: float = None, name: str = 'staleness') -> bool:
+        """Attende che un elemento venga rimosso dal DOM (es. righe dopo un click di paginazione)"""
+        return self.until(name, EC.staleness_of(element), timeout)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Aggrega le statistiche per nome di attesa
+        Returns:
+            Dict[str, Dict]: count, totale, media, massimo e timeout per ogni attesa
+        """
+        summary = {}
+        for stat in self.stats:
+            item = summary.setdefault(stat['name'], {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            item['count'] += 1
+            item['total'] += stat['duration']
+            item['max'] = max(item['max'], stat['duration'])
+            item['timeouts'] += 0 if stat['success'] else 1
+        for item in summary.values():
+            item['avg'] = round(item['total'] / item['count'], 3)
+            item['total'] = round(item['total'], 3)
+        return summary
+
+    def save_stats(self) -> None:
+        """Accoda le misure del run in DATA_DIR/wait_stats.jsonl per la taratura dei timeout"""
+        if not self.stats:
+            return
+        try:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(os.path.join(DATA_DIR, 'wait_stats.jsonl'), 'a', encoding='utf-8') as f:
+                for stat in self.stats:
+                    f.write(json.dumps({'portal': self.portal, 'ts': time.time(), **stat}) + '\n')
+            self.stats = []
+        except OSError as e:
+            print(f"Errore salvataggio statistiche attese: {str(e)}")
@@ -0,0 +1,112 @@
+# utils/cache.py
+from collections import OrderedDict
+from config.settings import CACHE_SETTINGS
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache LRU con scadenza, condivisa tra thread (e quindi tra le sessioni Streamlit del processo).
+    I valori restituiti sono gli oggetti in cache: i chiamanti non devono modificarli
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return default
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], refresh: bool = False) -> Any:
+        """
+        Lettura read-through: il valore in cache o quello di loader(), che viene memorizzato.
+        Le eccezioni di loader non vengono memorizzate
+        Args:
+            key: Chiave (tupla con il nome dell'operazione come primo elemento)
+            loader: Lettura dal database
+            refresh: Ignora il valore in cache e lo ricarica
+        """
+        if not self.enabled:
+            return loader()
+        if not refresh:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, *prefix: Hashable) -> int:
+        """
+        Rimuove le voci la cui chiave inizia con prefix (tutte se vuoto)
+        Returns:
+            int: Voci rimosse
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[:len(prefix)] == prefix
+            ] if prefix else list(self._entries)
+            for key in keys:
+                del self._entries[key]
+            self.stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries))
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(name: str, max_entries: Optional[int] = None) -> TTLCache:
+    """Cache del processo con il nome dato, configurata da CACHE_SETTINGS"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(
+                max_entries or CACHE_SETTINGS['max_entries'],
+                CACHE_SETTINGS['expiry_minutes'] * 60,
+                CACHE_SETTINGS['enabled']
+            )
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """Contatori di tutte le cache del processo"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.summary() for name, cache in caches.items()}
@@ -0,0 +1,81 @@
+# utils/change_detection.py
+from config.settings import DATA_DIR, FIREBASE_SETTINGS
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Campi che cambiano a ogni scraping senza che il veicolo cambi
+VOLATILE_FIELDS = {'last_update', 'last_updated', 'created_at', 'scrape_run', 'content_hash'}
+
+
+def content_hash(vehicle: Dict) -> str:
+    """Hash del contenuto di un veicolo, esclusi i campi volatili"""
+    data = {key: value for key, value in vehicle.items() if key not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class KnownHashes:
+    """
+    Hash e prezzo dell'ultima versione salvata su Firestore di ogni veicolo, persistiti in DATA_DIR.
+    Il file è condiviso da app e worker ed è solo un'indicazione: chi decide di non riscrivere un veicolo
+    verifica l'hash su Firestore. Le voci più vecchie di max_age_days vengono ignorate e scartate al salvataggio
+    """
+
+    def __init__(self, path: str = None, max_age_days: float = None):
+        self.path = path or os.path.join(DATA_DIR, 'vehicle_hashes.json')
+        self.max_age = (max_age_days or FIREBASE_SETTINGS['hash_max_age_days']) * 86400
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, plate: str) -> Optional[Dict]:
+        """Voce del veicolo ({'hash', 'price', 'at'}) o None se sconosciuto o scaduto"""
+        with self._lock:
+            entry = self._entries.get(plate)
+        if entry and time.time() - entry.get('at', 0) <= self.max_age:
+            return entry
+        return None
+
+    def set(self, plate: str, hash_value: Optional[str], price) -> None:
+        with self._lock:
+            self._entries[plate] = {'hash': hash_value, 'price': price, 'at': time.time()}
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Unisce le voci al file su disco, che un altro processo può aver aggiornato nel frattempo:
+        per ogni veicolo vale la voce più recente e quelle scadute vengono eliminate
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            on_disk = self._load()
+            oldest = time.time() - self.max_age
+            merged = {}
+            for plate, entry in list(on_disk.items()) + list(self._entries.items()):
+                if entry.get('at', 0) < oldest:
+                    continue
+                current = merged.get(plate)
+                if current is None or entry.get('at', 0) >= current.get('at', 0):
+                    merged[plate] = entry
+            self._entries = merged
+            data = json.dumps(merged, default=str)
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Errore nel salvataggio degli hash dei veicoli: {str(e)}")
@@ -4,29 +4,39 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_admin.exceptions import FirebaseError
 from utils.firebase_manager import FirebaseManager
+from config.credentials import get_firebase_credentials
 
 class FirebaseConfig:
     @staticmethod
-    def initialize_firebase():
-        """Initialize Firebase with credentials from Streamlit secrets"""
+    def initialize_app() -> bool:
+        """
+        Initialize the Firebase app without Streamlit (worker, CLI)
+        Credentials from env, credentials file or Streamlit secrets (see config/credentials.py)
+        """
+        # Check if Firebase is already initialized
         try:
-            # Check if Firebase is already initialized
-            try:
-                firebase_admin.get_app()
-                st.session_state['firebase_mgr'] = FirebaseManager()
-                return True
-            except ValueError:
-                # Firebase not yet initialized
-                pass
+            firebase_admin.get_app()
+            return True
+        except ValueError:
+            # Firebase not yet initialized
+            pass
 
-            # Get credentials from Streamlit secrets
-            firebase_creds = dict(st.secrets["firebase"])
-            
-            # Create a temporary credential object
-            cred = credentials.Certificate(firebase_creds)
-            
-            # Initialize Firebase
-            firebase_admin.initialize_app(cred)
+        firebase_creds = get_firebase_credentials()
+        if not firebase_creds:
+            raise ValueError("Credenziali Firebase non configurate")
+
+        # Create a temporary credential object
+        cred = credentials.Certificate(firebase_creds)
+
+        # Initialize Firebase
+        firebase_admin.initialize_app(cred)
+        return True
+
+    @staticmethod
+    def initialize_firebase():
+        """Initialize Firebase and the FirebaseManager of the Streamlit session"""
+        try:
+            FirebaseConfig.initialize_app()
             
             # Initialize FirebaseManager
             st.session_state['firebase_mgr'] = FirebaseManager()
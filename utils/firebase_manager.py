@@ -1,6 +1,43 @@
 from firebase_admin import firestore
-from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import FIREBASE_SETTINGS, MIRROR_SETTINGS
+from utils.cache import shared_cache
+from utils.change_detection import KnownHashes, content_hash
+from utils.vehicle_mirror import get_mirror
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+
+# Limite di scritture di un batch Firestore; ogni veicolo ne richiede al più due (documento e storico prezzi)
+MAX_BATCH_WRITES = 500
+WRITES_PER_VEHICLE = 2
+
+# Codici gRPC per cui il BulkWriter ripete una scrittura
+TRANSIENT_CODES = {2, 4, 8, 10, 13, 14}   # UNKNOWN, DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED, INTERNAL, UNAVAILABLE
+
+
+def is_transient(error: Exception) -> bool:
+    """True per gli errori di Firestore per cui ha senso ripetere la scrittura (rete, quota, contesa)"""
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return True
+    return isinstance(error, (
+        exceptions.ServiceUnavailable, exceptions.DeadlineExceeded, exceptions.Aborted,
+        exceptions.ResourceExhausted, exceptions.InternalServerError, exceptions.Unknown,
+        ConnectionError, TimeoutError
+    ))
+
+
+def vehicle_doc_id(vehicle: Dict) -> str:
+    """ID del documento di un veicolo: la targa o, per i portali senza targa in elenco (es. Ayvens), fonte e id"""
+    if vehicle.get('plate'):
+        return str(vehicle['plate'])
+    if vehicle.get('id'):
+        return f"{str(vehicle.get('fonte') or 'unknown').lower()}-{vehicle['id']}".replace('/', '_')
+    return ''
+
 
 class FirebaseManager:
     """Gestore delle operazioni su Firebase"""
@@ -12,6 +49,10 @@ class FirebaseManager:
         except Exception as e:
             print(f"Errore nell'inizializzazione del FirebaseManager: {str(e)}")
             self.db = None
+        # Hash dei veicoli già salvati: i veicoli invariati non vengono riscritti
+        self.known = KnownHashes()
+        # Letture condivise da tutte le sessioni del processo (CACHE_SETTINGS)
+        self.cache = shared_cache('firestore')
 
     @classmethod
     def get_instance(cls):
@@ -36,28 +77,14 @@ class FirebaseManager:
             return False
             
         try:
-            # Usa la targa come ID documento
-            doc_ref = self.db.collection('vehicles').document(vehicle_data['plate'])
-            
-            # Prepara i dati del prezzo per lo storico
-            price_history = {
-                'price': vehicle_data.get('base_price'),
-                'date': datetime.now(),
-                'fonte': vehicle_data.get('fonte', 'unknown')
-            }
-            
-            # Aggiorna il veicolo principale
-            vehicle_data.update({
-                'last_updated': datetime.now(),
-                'created_at': vehicle_data.get('created_at', datetime.now())
-            })
-            
-            doc_ref.set(vehicle_data, merge=True)
-            
-            # Aggiungi il prezzo allo storico
-            history_ref = doc_ref.collection('price_history').document()
-            history_ref.set(price_history)
-            
+            stored = self._load_known([vehicle_doc_id(vehicle_data)])
+            writes = self._vehicle_writes(vehicle_data, stored)
+            for ref, data, merge in writes:
+                ref.set(data, merge=merge)
+            if writes:
+                self._remember(vehicle_data)
+                self.known.save()
+                self._invalidate([vehicle_doc_id(vehicle_data)])
             return True
         except Exception as e:
             print(f"Errore nel salvataggio del veicolo: {str(e)}")
@@ -65,63 +92,268 @@ class FirebaseManager:
     
     def save_auction_batch(self, vehicles: List[Dict]) -> Dict:
         """
-        Salva un batch di veicoli da un'asta
+        Salva un batch di veicoli da un'asta, diviso in batch Firestore entro il limite di 500 scritture
+        e inviati in parallelo; oltre bulk_writer_threshold veicoli usa il BulkWriter dell'SDK.
+        I veicoli invariati dall'ultimo salvataggio non vengono riscritti
         Args:
             vehicles (List[Dict]): Lista di veicoli da salvare
         Returns:
-            Dict: Risultati dell'operazione con conteggio successi/fallimenti
+            Dict: Conteggio successi/fallimenti, scritti/invariati, esito per veicolo ('results'),
+            batch, retry e throughput
         """
         if not self.db:
             return {'success': 0, 'failed': len(vehicles)}
-            
+        
+        start = time.time()
+        results = [
+            {'plate': vehicle.get('plate'), 'doc_id': vehicle_doc_id(vehicle), 'ok': False, 'unchanged': False,
+             'error': None}
+            for vehicle in vehicles
+        ]
+        stored = self._load_known([result['doc_id'] for result in results])
+        prepared = []
+        for index, vehicle in enumerate(vehicles):
+            try:
+                writes = self._vehicle_writes(vehicle, stored)
+            except Exception as e:
+                print(f"Errore nel processing del veicolo {results[index]['doc_id']}: {str(e)}")
+                results[index]['error'] = str(e)
+                continue
+            if writes:
+                prepared.append((index, writes))
+            else:
+                results[index].update({'ok': True, 'unchanged': True})
+        
+        threshold = FIREBASE_SETTINGS['bulk_writer_threshold']
+        if threshold and len(prepared) > threshold and hasattr(self.db, 'bulk_writer'):
+            mode = 'bulk_writer'
+            chunks, retries = self._bulk_write(prepared, results)
+        else:
+            mode = 'batch'
+            chunks, retries = self._batch_write(prepared, results)
+        
+        writes = price_changes = 0
+        for index, vehicle_writes in prepared:
+            if results[index]['ok']:
+                self._remember(vehicles[index])
+                writes += len(vehicle_writes)
+                price_changes += len(vehicle_writes) - 1
+        self.known.save()
+        if prepared:
+            self._invalidate([results[index]['doc_id'] for index, _ in prepared])
+        
+        elapsed = time.time() - start
+        success = sum(1 for result in results if result['ok'])
+        unchanged = sum(1 for result in results if result['unchanged'])
+        return {
+            'success': success,
+            'failed': len(vehicles) - success,
+            'written': success - unchanged,
+            'unchanged': unchanged,
+            'price_changes': price_changes,
+            'writes': writes,
+            'results': results,
+            'mode': mode,
+            'chunks': chunks,
+            'retries': retries,
+            'elapsed': round(elapsed, 3),
+            'vehicles_per_sec': round(success / elapsed, 1) if elapsed else 0.0,
+            'writes_per_sec': round(writes / elapsed, 1) if elapsed else 0.0
+        }
+    
+    def _vehicle_writes(self, vehicle: Dict, stored: Dict[str, Optional[Dict]]) -> List[Tuple]:
+        """
+        Scritture (riferimento, dati, merge) di un veicolo: nessuna se invariato, il documento principale
+        se cambiato e lo storico prezzi solo se è cambiato il prezzo
+        Args:
+            vehicle: Veicolo da salvare
+            stored: Hash e prezzo letti da Firestore (_load_known), None per i documenti inesistenti
+        """
+        # Documento principale del veicolo
+        doc_id = vehicle_doc_id(vehicle)
+        doc_ref = self.db.collection('vehicles').document(doc_id)
+        
+        hash_value = content_hash(vehicle)
+        if doc_id in stored:
+            known = stored[doc_id]
+            if known and known['hash'] == hash_value:
+                return []
+        else:
+            # Lettura da Firestore fallita: l'hash locale non basta per saltare la scrittura,
+            # serve solo a decidere lo storico prezzi
+            known = self.known.get(doc_id)
+        
+        # Aggiungi hash e timestamp in UTC: il mirror (utils/vehicle_mirror.py) confronta last_updated
+        # di processi con fusi orari diversi
+        vehicle.update({
+            'content_hash': hash_value,
+            'last_updated': datetime.now(timezone.utc),
+            'created_at': vehicle.get('created_at', datetime.now(timezone.utc))
+        })
+        writes = [(doc_ref, vehicle, True)]
+        
+        if known is None or str(known['price']) != str(vehicle.get('base_price')):
+            # Documento storico prezzi: uno per run, così un blocco ripetuto non lo duplica
+            history = doc_ref.collection('price_history')
+            history_ref = history.document(vehicle['scrape_run']) if vehicle.get('scrape_run') else history.document()
+            writes.append((history_ref, {
+                'price': vehicle.get('base_price'),
+                'date': datetime.now(timezone.utc),
+                'fonte': vehicle.get('fonte', 'unknown')
+            }, False))
+        return writes
+    
+    def _load_known(self, plates: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Legge da Firestore, con una sola get_all proiettata, hash e prezzo salvati dei veicoli del blocco.
+        Il file locale degli hash è condiviso con altri processi e può essere vecchio: la decisione di saltare
+        un veicolo si basa solo su questa lettura, che aggiorna anche il file
+        Returns:
+            Dict: ID documento -> {'hash', 'price'} oppure None se il documento non esiste;
+            vuoto se la lettura fallisce
+        """
+        doc_ids = [plate for plate in dict.fromkeys(plates) if plate]
+        if not doc_ids:
+            return {}
+        stored = {}
         try:
+            refs = [self.db.collection('vehicles').document(doc_id) for doc_id in doc_ids]
+            for doc in self.db.get_all(refs, field_paths=['content_hash', 'base_price']):
+                if not doc.exists:
+                    stored[doc.id] = None
+                    continue
+                data = doc.to_dict() or {}
+                stored[doc.id] = {'hash': data.get('content_hash'), 'price': data.get('base_price')}
+                self.known.set(doc.id, data.get('content_hash'), data.get('base_price'))
+        except Exception as e:
+            # Senza hash verificati i veicoli vengono semplicemente riscritti
+            print(f"Errore nel recupero degli hash dei veicoli: {str(e)}")
+            return {}
+        return stored
+    
+    def _remember(self, vehicle: Dict) -> None:
+        self.known.set(vehicle_doc_id(vehicle), vehicle.get('content_hash'), vehicle.get('base_price'))
+    
+    def _invalidate(self, plates: List[str]) -> None:
+        """Rimuove dalla cache le letture rese vecchie dalla scrittura dei veicoli"""
+        self.cache.invalidate('all_vehicles')
+        for plate in plates:
+            self.cache.invalidate('vehicle_history', plate)
+    
+    def _batch_write(self, prepared: List[Tuple[int, List[Tuple]]], results: List[Dict]) -> Tuple[int, int]:
+        """
+        Invia i veicoli in batch da al più MAX_BATCH_WRITES scritture, max_workers alla volta
+        Returns:
+            Tuple: (batch inviati, retry)
+        """
+        size = max(1, min(FIREBASE_SETTINGS['batch_vehicles'], MAX_BATCH_WRITES // WRITES_PER_VEHICLE))
+        chunks = [prepared[i:i + size] for i in range(0, len(prepared), size)]
+        if not chunks:
+            return 0, 0
+        
+        workers = max(1, min(FIREBASE_SETTINGS['max_workers'], len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='firestore') as executor:
+            retries = sum(executor.map(lambda chunk: self._commit_chunk(chunk, results), chunks))
+        return len(chunks), retries
+    
+    def _commit_chunk(self, chunk: List[Tuple[int, List[Tuple]]], results: List[Dict]) -> int:
+        """
+        Invia un batch ripetendolo con backoff sugli errori transitori; su un errore permanente
+        il batch (atomico) viene diviso a metà per isolare i veicoli che lo fanno fallire
+        Returns:
+            int: Retry eseguiti
+        """
+        max_attempts = max(1, FIREBASE_SETTINGS['max_attempts'])
+        retries = 0
+        error = None
+        for attempt in range(max_attempts):
             batch = self.db.batch()
-            results = {'success': 0, 'failed': 0}
-            
-            for vehicle in vehicles:
-                try:
-                    # Documento principale del veicolo
-                    doc_ref = self.db.collection('vehicles').document(vehicle.get('plate', ''))
-                    
-                    # Aggiungi timestamp
-                    vehicle.update({
-                        'last_updated': datetime.now(),
-                        'created_at': vehicle.get('created_at', datetime.now())
-                    })
-                    
-                    batch.set(doc_ref, vehicle, merge=True)
-                    
-                    # Documento storico prezzi
-                    history_ref = doc_ref.collection('price_history').document()
-                    batch.set(history_ref, {
-                        'price': vehicle.get('base_price'),
-                        'date': datetime.now(),
-                        'fonte': vehicle.get('fonte', 'unknown')
-                    })
-                    
-                    results['success'] += 1
-                except Exception as e:
-                    print(f"Errore nel processing del veicolo {vehicle.get('plate')}: {str(e)}")
-                    results['failed'] += 1
-            
-            batch.commit()
-            return results
+            for _, writes in chunk:
+                for ref, data, merge in writes:
+                    batch.set(ref, data, merge=merge)
+            try:
+                batch.commit()
+            except Exception as e:
+                error = e
+                if not is_transient(e) or attempt + 1 == max_attempts:
+                    break
+                retries += 1
+                time.sleep(FIREBASE_SETTINGS['backoff_base'] * 2 ** attempt)
+            else:
+                for index, _ in chunk:
+                    results[index]['ok'] = True
+                return retries
+        
+        if not is_transient(error) and len(chunk) > 1:
+            middle = len(chunk) // 2
+            return retries + self._commit_chunk(chunk[:middle], results) + self._commit_chunk(chunk[middle:], results)
+        
+        print(f"Errore nel salvataggio batch di {len(chunk)} veicoli: {str(error)}")
+        for index, _ in chunk:
+            results[index]['error'] = str(error)
+        return retries
+    
+    def _bulk_write(self, prepared: List[Tuple[int, List[Tuple]]], results: List[Dict]) -> Tuple[int, int]:
+        """
+        Grandi import con il BulkWriter: raggruppa le scritture, ne regola il ritmo
+        e ripete solo quelle fallite con errori transitori
+        Returns:
+            Tuple: (0, i batch sono gestiti dal BulkWriter; retry)
+        """
+        max_attempts = max(1, FIREBASE_SETTINGS['max_attempts'])
+        owners: Dict[str, List[int]] = {}
+        for index, writes in prepared:
+            for ref, _, _ in writes:
+                owners.setdefault(ref.path, []).append(index)
+        
+        errors: Dict[int, str] = {}
+        stats = {'retries': 0}
+        lock = threading.Lock()
+        
+        def on_error(failure, bulk_writer) -> bool:
+            with lock:
+                if failure.code in TRANSIENT_CODES and failure.attempts < max_attempts:
+                    stats['retries'] += 1
+                    return True
+                for index in owners.get(failure.operation.reference.path, []):
+                    errors[index] = failure.message
+                return False
+        
+        bulk_writer = self.db.bulk_writer()
+        bulk_writer.on_write_error(on_error)
+        try:
+            for _, writes in prepared:
+                for ref, data, merge in writes:
+                    bulk_writer.set(ref, data, merge=merge)
+            bulk_writer.close()
         except Exception as e:
-            print(f"Errore nel salvataggio batch: {str(e)}")
-            return {'success': 0, 'failed': len(vehicles)}
+            print(f"Errore nel salvataggio con BulkWriter: {str(e)}")
+            for index, _ in prepared:
+                results[index]['error'] = str(e)
+            return 0, stats['retries']
+        
+        for index, _ in prepared:
+            if index in errors:
+                results[index]['error'] = errors[index]
+            else:
+                results[index]['ok'] = True
+        if errors:
+            print(f"Errore nel salvataggio di {len(errors)} veicoli con BulkWriter")
+        return 0, stats['retries']
     
-    def get_vehicle_history(self, plate: str) -> Optional[Dict]:
+    def get_vehicle_history(self, plate: str, history_limit: Optional[int] = None) -> Optional[Dict]:
         """
-        Recupera lo storico di un veicolo con storico prezzi
+        Recupera lo storico di un veicolo con storico prezzi (in cache per CACHE_SETTINGS['expiry_minutes'])
         Args:
             plate (str): Targa del veicolo
+            history_limit (Optional[int]): Prezzi più recenti da restituire (default FIREBASE_SETTINGS)
         Returns:
             Optional[Dict]: Dati del veicolo con storico prezzi o None se non trovato
         """
         if not self.db:
             return None
             
-        try:
+        def load() -> Optional[Dict]:
             # Recupera dati principali
             doc_ref = self.db.collection('vehicles').document(plate)
             doc = doc_ref.get()
@@ -130,22 +362,77 @@ class FirebaseManager:
                 return None
                 
             vehicle_data = doc.to_dict()
-            
-            # Recupera storico prezzi
-            prices = []
-            prices_ref = doc_ref.collection('price_history').order_by('date', direction=firestore.Query.DESCENDING)
-            
-            for price_doc in prices_ref.stream():
-                price_data = price_doc.to_dict()
-                prices.append(price_data)
-            
-            vehicle_data['price_history'] = prices
+            vehicle_data['price_history'] = self._price_history(doc_ref, history_limit)
             return vehicle_data
             
+        try:
+            return self.cache.get_or_load(('vehicle_history', plate, history_limit), load)
         except Exception as e:
             print(f"Errore nel recupero storico: {str(e)}")
             return None
 
+    def get_vehicles_history(self, plates: List[str], history_limit: Optional[int] = None) -> List[Dict]:
+        """
+        Recupera più veicoli con una sola lettura multipla e i loro storici prezzi in parallelo
+        Args:
+            plates (List[str]): Targhe dei veicoli
+            history_limit (Optional[int]): Prezzi più recenti per veicolo (default FIREBASE_SETTINGS)
+        Returns:
+            List[Dict]: Veicoli trovati, nell'ordine delle targhe
+        """
+        if not self.db or not plates:
+            return []
+            
+        try:
+            refs = [self.db.collection('vehicles').document(plate) for plate in dict.fromkeys(plates)]
+            found = {doc.id: doc for doc in self.db.get_all(refs) if doc.exists}
+            docs = [found[ref.id] for ref in refs if ref.id in found]
+            
+            def with_history(doc) -> Dict:
+                vehicle_data = doc.to_dict()
+                vehicle_data['price_history'] = self._price_history(doc.reference, history_limit)
+                return vehicle_data
+            
+            if not docs:
+                return []
+            workers = max(1, min(FIREBASE_SETTINGS['read_workers'], len(docs)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='firestore') as executor:
+                return list(executor.map(with_history, docs))
+        except Exception as e:
+            print(f"Errore nel recupero dei veicoli: {str(e)}")
+            return []
+
+    def _price_history(self, doc_ref, history_limit: Optional[int] = None) -> List[Dict]:
+        """Prezzi più recenti di un veicolo, dal più nuovo"""
+        limit = FIREBASE_SETTINGS['history_limit'] if history_limit is None else history_limit
+        prices_ref = doc_ref.collection('price_history').order_by('date', direction=firestore.Query.DESCENDING)
+        if limit:
+            prices_ref = prices_ref.limit(limit)
+        return [price_doc.to_dict() for price_doc in prices_ref.stream()]
+
+    def _watchlist_items(self, user_id: str):
+        """Veicoli della watchlist: un documento per targa in watchlist/<utente>/items"""
+        return self.db.collection('watchlist').document(user_id).collection('items')
+
+    def _migrate_watchlist(self, user_id: str) -> None:
+        """Sposta l'array 'vehicles' del vecchio formato nei documenti di watchlist/<utente>/items"""
+        watchlist_ref = self.db.collection('watchlist').document(user_id)
+        watchlist_doc = watchlist_ref.get()
+        plates = (watchlist_doc.to_dict() or {}).get('vehicles') if watchlist_doc.exists else None
+        if not plates:
+            return
+        items = self._watchlist_items(user_id)
+        now = datetime.now(timezone.utc)
+        size = MAX_BATCH_WRITES - 1
+        for i in range(0, len(plates), size):
+            batch = self.db.batch()
+            for plate in plates[i:i + size]:
+                batch.set(items.document(plate), {'plate': plate, 'added_at': now}, merge=True)
+            if i + size >= len(plates):
+                # L'array viene rimosso solo con l'ultimo batch: una migrazione interrotta riparte
+                batch.update(watchlist_ref, {'vehicles': firestore.DELETE_FIELD, 'last_updated': now})
+            batch.commit()
+
     def add_to_watchlist(self, user_id: str, vehicle_plate: str) -> bool:
         """
         Aggiunge un veicolo alla watchlist dell'utente
@@ -159,10 +446,13 @@ class FirebaseManager:
             return False
             
         try:
-            watchlist_ref = self.db.collection('watchlist').document(user_id)
-            watchlist_ref.set({
-                'vehicles': firestore.ArrayUnion([vehicle_plate]),
-                'last_updated': datetime.now()
+            self._migrate_watchlist(user_id)
+            self._watchlist_items(user_id).document(vehicle_plate).set({
+                'plate': vehicle_plate,
+                'added_at': datetime.now(timezone.utc)
+            })
+            self.db.collection('watchlist').document(user_id).set({
+                'last_updated': datetime.now(timezone.utc)
             }, merge=True)
             return True
         except Exception as e:
@@ -182,55 +472,88 @@ class FirebaseManager:
             return False
             
         try:
-            watchlist_ref = self.db.collection('watchlist').document(user_id)
-            watchlist_ref.update({
-                'vehicles': firestore.ArrayRemove([vehicle_plate]),
-                'last_updated': datetime.now()
-            })
+            self._migrate_watchlist(user_id)
+            self._watchlist_items(user_id).document(vehicle_plate).delete()
+            self.db.collection('watchlist').document(user_id).set({
+                'last_updated': datetime.now(timezone.utc)
+            }, merge=True)
             return True
         except Exception as e:
             print(f"Errore nella rimozione dalla watchlist: {str(e)}")
             return False
 
-    def get_watchlist(self, user_id: str) -> List[Dict]:
+    def get_watchlist_page(self, user_id: str, page_size: Optional[int] = None, cursor: Optional[str] = None,
+                           history_limit: Optional[int] = None) -> Dict:
         """
-        Recupera tutti i veicoli nella watchlist dell'utente
+        Recupera una pagina della watchlist dell'utente, in ordine di targa
         Args:
             user_id (str): ID dell'utente
+            page_size (Optional[int]): Veicoli per pagina (default FIREBASE_SETTINGS)
+            cursor (Optional[str]): 'next_cursor' della pagina precedente
+            history_limit (Optional[int]): Prezzi più recenti per veicolo
         Returns:
-            List[Dict]: Lista di veicoli monitorati
+            Dict: {'vehicles': veicoli della pagina, 'next_cursor': cursore della pagina successiva o None}
         """
         if not self.db:
-            return []
+            return {'vehicles': [], 'next_cursor': None}
             
         try:
-            # Recupera la watchlist dell'utente
-            watchlist_doc = self.db.collection('watchlist').document(user_id).get()
-            if not watchlist_doc.exists:
-                return []
-                
-            # Recupera i dettagli di ogni veicolo
-            vehicles = []
-            for plate in watchlist_doc.to_dict().get('vehicles', []):
-                vehicle_data = self.get_vehicle_history(plate)
-                if vehicle_data:
-                    vehicles.append(vehicle_data)
-                    
-            return vehicles
+            if not cursor:
+                self._migrate_watchlist(user_id)
+            page_size = page_size or FIREBASE_SETTINGS['watchlist_page_size']
+            query = self._watchlist_items(user_id).order_by('plate')
+            if cursor:
+                query = query.start_after({'plate': cursor})
+            plates = [doc.id for doc in query.limit(page_size).stream()]
+            
+            return {
+                'vehicles': self.get_vehicles_history(plates, history_limit),
+                'next_cursor': plates[-1] if len(plates) == page_size else None
+            }
         except Exception as e:
             print(f"Errore nel recupero watchlist: {str(e)}")
-            return []
+            return {'vehicles': [], 'next_cursor': None}
 
-    def get_all_vehicles(self) -> List[Dict]:
+    def get_watchlist(self, user_id: str, history_limit: Optional[int] = None) -> List[Dict]:
         """
-        Recupera tutti i veicoli dal database
+        Recupera tutti i veicoli nella watchlist dell'utente, una pagina alla volta
+        Args:
+            user_id (str): ID dell'utente
+            history_limit (Optional[int]): Prezzi più recenti per veicolo
+        Returns:
+            List[Dict]: Lista di veicoli monitorati
+        """
+        vehicles = []
+        cursor = None
+        while True:
+            page = self.get_watchlist_page(user_id, cursor=cursor, history_limit=history_limit)
+            vehicles.extend(page['vehicles'])
+            cursor = page['next_cursor']
+            if not cursor:
+                return vehicles
+
+    def get_all_vehicles(self, refresh: bool = False) -> List[Dict]:
+        """
+        Recupera tutti i veicoli dal database (in cache per CACHE_SETTINGS['expiry_minutes']).
+        Con MIRROR_SETTINGS abilitato legge dal mirror SQLite, aggiornato con i soli documenti cambiati
+        Args:
+            refresh (bool): Ignora la cache e rilegge da Firestore
         Returns:
             List[Dict]: Lista di tutti i veicoli
         """
         if not self.db:
             return []
             
-        try:
+        def load() -> List[Dict]:
+            if MIRROR_SETTINGS['enabled']:
+                mirror = get_mirror()
+                try:
+                    mirror.sync(self.db, force=True)
+                except Exception as e:
+                    # Firestore non raggiungibile: restano i dati dell'ultima sincronizzazione
+                    print(f"Errore nella sincronizzazione del mirror: {str(e)}")
+                return mirror.vehicles()
+            
             vehicles = []
             vehicles_ref = self.db.collection('vehicles').stream()
             
@@ -240,20 +563,40 @@ class FirebaseManager:
                 vehicles.append(vehicle_data)
                 
             return vehicles
+            
+        try:
+            return self.cache.get_or_load(('all_vehicles',), load, refresh=refresh)
         except Exception as e:
             print(f"Errore nel recupero di tutti i veicoli: {str(e)}")
             return []
 
+    def get_vehicle_counts(self) -> Dict[str, int]:
+        """
+        Numero di veicoli per portale, dal mirror locale
+        Returns:
+            Dict[str, int]: Veicoli per fonte
+        """
+        if not self.db or not MIRROR_SETTINGS['enabled']:
+            return {}
+            
+        try:
+            mirror = get_mirror()
+            mirror.sync(self.db)
+            return mirror.counts_by_source()
+        except Exception as e:
+            print(f"Errore nel conteggio dei veicoli: {str(e)}")
+            return {}
+
     def get_active_auctions(self) -> List[Dict]:
         """
-        Recupera tutte le aste attive
+        Recupera tutte le aste attive (in cache per CACHE_SETTINGS['expiry_minutes'])
         Returns:
             List[Dict]: Lista delle aste attive
         """
         if not self.db:
             return []
             
-        try:
+        def load() -> List[Dict]:
             auctions = []
             now = datetime.now()
             
@@ -267,6 +610,54 @@ class FirebaseManager:
                 auctions.append(auction_data)
                 
             return auctions
+            
+        try:
+            auctions = self.cache.get_or_load(('active_auctions',), load)
+            # Le aste terminate dopo la lettura in cache non sono più attive
+            now = time.time()
+            return [
+                auction for auction in auctions
+                if not hasattr(auction.get('end_date'), 'timestamp') or auction['end_date'].timestamp() > now
+            ]
         except Exception as e:
             print(f"Errore nel recupero delle aste attive: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+    def save_run(self, run: Dict) -> bool:
+        """
+        Salva l'esito di un run del worker di scraping
+        Args:
+            run (Dict): Dati del run (id, inizio, fine, conteggi ed errori per portale)
+        Returns:
+            bool: True se l'operazione ha successo, False altrimenti
+        """
+        if not self.db:
+            return False
+            
+        try:
+            self.db.collection('scrape_runs').document(run['id']).set(run, merge=True)
+            return True
+        except Exception as e:
+            print(f"Errore nel salvataggio del run: {str(e)}")
+            return False
+
+    def get_last_run(self) -> Optional[Dict]:
+        """
+        Recupera l'ultimo run del worker di scraping
+        Returns:
+            Optional[Dict]: Dati del run o None se non presente
+        """
+        if not self.db:
+            return None
+            
+        try:
+            runs_ref = self.db.collection('scrape_runs').order_by(
+                'started_at', direction=firestore.Query.DESCENDING
+            ).limit(1)
+            
+            for doc in runs_ref.stream():
+                return doc.to_dict()
+            return None
+        except Exception as e:
+            print(f"Errore nel recupero dell'ultimo run: {str(e)}")
+            return None
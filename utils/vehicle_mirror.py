@@ -0,0 +1,154 @@
+# utils/vehicle_mirror.py
+from config.settings import DATA_DIR, MIRROR_SETTINGS
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class VehicleMirror:
+    """
+    Copia locale in SQLite della collection 'vehicles': un caricamento completo iniziale, poi solo i documenti
+    con last_updated successivo all'ultimo sincronizzato (high-water mark), letti a pagine con un cursore
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: File SQLite (default DATA_DIR/vehicles.sqlite)
+        """
+        self.path = path or os.path.join(DATA_DIR, 'vehicles.sqlite')
+        self.stats = {'syncs': 0, 'full_syncs': 0, 'pulled': 0, 'last_duration': 0.0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS vehicles ('
+                'id TEXT PRIMARY KEY, fonte TEXT, last_updated REAL, data TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS vehicles_fonte ON vehicles (fonte)')
+            conn.execute('CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value REAL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una connessione per operazione: le sessioni Streamlit leggono da thread diversi
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _state(self, conn: sqlite3.Connection, key: str) -> Optional[float]:
+        row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def high_water(self) -> Optional[float]:
+        """last_updated più recente sincronizzato (epoch) o None prima del caricamento completo"""
+        with self._connect() as conn:
+            return self._state(conn, 'high_water')
+
+    def sync(self, db, full: bool = False, force: bool = False) -> int:
+        """
+        Sincronizza il mirror con Firestore
+        Args:
+            db: Client Firestore
+            full: Ricarica l'intera collection (rimuove anche i veicoli cancellati)
+            force: Ignora l'intervallo minimo tra due sincronizzazioni
+        Returns:
+            int: Documenti letti da Firestore
+        """
+        with self._lock:
+            with self._connect() as conn:
+                high_water = self._state(conn, 'high_water')
+                last_sync = self._state(conn, 'last_sync') or 0
+                last_full = self._state(conn, 'last_full_sync') or 0
+            now = time.time()
+            if not force and not full and now - last_sync < MIRROR_SETTINGS['min_sync_interval']:
+                return 0
+            if high_water is None or now - last_full > MIRROR_SETTINGS['full_sync_hours'] * 3600:
+                full = True
+
+            start = time.time()
+            pulled = self._full_load(db) if full else self._pull_delta(db, high_water)
+            self.stats['syncs'] += 1
+            self.stats['full_syncs'] += 1 if full else 0
+            self.stats['pulled'] += pulled
+            self.stats['last_duration'] = round(time.time() - start, 3)
+            return pulled
+
+    def _full_load(self, db) -> int:
+        """Caricamento completo: sostituisce il contenuto del mirror in una sola transazione"""
+        rows = [self._row(doc) for doc in db.collection('vehicles').stream()]
+        high_water = max((row[2] for row in rows if row[2] is not None), default=0.0)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM vehicles')
+            conn.executemany('INSERT INTO vehicles VALUES (?, ?, ?, ?)', rows)
+            conn.executemany('INSERT OR REPLACE INTO sync_state VALUES (?, ?)', [
+                ('high_water', high_water), ('last_sync', now), ('last_full_sync', now)
+            ])
+        return len(rows)
+
+    def _pull_delta(self, db, high_water: float) -> int:
+        """
+        Documenti con last_updated >= high-water mark meno overlap_seconds (margine per gli orologi
+        dei processi che scrivono), a pagine di page_size con start_after sull'ultimo documento
+        """
+        since = datetime.fromtimestamp(max(0.0, high_water - MIRROR_SETTINGS['overlap_seconds']), tz=timezone.utc)
+        query = db.collection('vehicles').where('last_updated', '>=', since).order_by('last_updated')
+        page_size = MIRROR_SETTINGS['page_size']
+        pulled = 0
+        cursor = None
+        while True:
+            page = query.start_after(cursor) if cursor is not None else query
+            docs = list(page.limit(page_size).stream())
+            if docs:
+                rows = [self._row(doc) for doc in docs]
+                high_water = max([high_water] + [row[2] for row in rows if row[2] is not None])
+                with self._connect() as conn:
+                    conn.executemany('INSERT OR REPLACE INTO vehicles VALUES (?, ?, ?, ?)', rows)
+                    # High-water mark salvato pagina per pagina: una sync interrotta riprende da qui
+                    conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('high_water', ?)", (high_water,))
+                pulled += len(docs)
+                cursor = docs[-1]
+            if len(docs) < page_size:
+                break
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (time.time(),))
+        return pulled
+
+    @staticmethod
+    def _row(doc) -> tuple:
+        data = doc.to_dict() or {}
+        data['id'] = doc.id
+        last_updated = data.get('last_updated')
+        timestamp = last_updated.timestamp() if hasattr(last_updated, 'timestamp') else None
+        return doc.id, data.get('fonte'), timestamp, json.dumps(data, default=str)
+
+    def vehicles(self, fonte: str = None) -> List[Dict]:
+        """Veicoli del mirror, opzionalmente di un solo portale (i timestamp sono stringhe ISO)"""
+        with self._connect() as conn:
+            if fonte:
+                rows = conn.execute('SELECT data FROM vehicles WHERE fonte = ?', (fonte,)).fetchall()
+            else:
+                rows = conn.execute('SELECT data FROM vehicles').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def counts_by_source(self) -> Dict[str, int]:
+        """Numero di veicoli per portale"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT fonte, COUNT(*) FROM vehicles GROUP BY fonte ORDER BY fonte').fetchall()
+        return {fonte or 'N/D': count for fonte, count in rows}
+
+
+_mirror: Optional[VehicleMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> VehicleMirror:
+    """Mirror del processo, condiviso da tutte le sessioni"""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = VehicleMirror()
+        return _mirror
@@ -0,0 +1,168 @@
+# worker.py
+"""
+Worker di scraping fuori da Streamlit: esegue i portali e salva i veicoli direttamente su Firebase.
+
+Esempi:
+    python worker.py --once                      # un run di tutti i portali (es. da cron)
+    python worker.py --interval 30               # daemon, un run ogni 30 minuti
+    python worker.py --once --portals Clickar    # solo Clickar
+"""
+from config.settings import WORKER_SETTINGS
+from config.credentials import get_portal_credentials
+from scrapers.pipeline import VehiclePipeline, FirebaseSink
+from scrapers.registry import portal_names, resolve
+from scrapers.runner import ConcurrentRunner
+from utils.firebase_config import FirebaseConfig
+from utils.firebase_manager import FirebaseManager
+from datetime import datetime
+from typing import Dict, List
+import argparse
+import fcntl
+import os
+import signal
+import sys
+import time
+
+_stop = False
+
+
+def log(message: str) -> None:
+    print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+
+
+def run_once(portals: List[str], firebase_mgr: FirebaseManager, headless: bool = True,
+             timeout: float = None) -> Dict:
+    """
+    Esegue un run completo dei portali, un processo per portale
+    Args:
+        portals: Nomi dei portali (chiavi di PORTAL_PLUGINS)
+        firebase_mgr: Manager Firebase su cui salvare veicoli ed esito del run
+        headless: Esegue Chromium senza interfaccia
+        timeout: Secondi massimi per portale
+    Returns:
+        Dict: Esito del run salvato in scrape_runs
+    """
+    started = datetime.now()
+    run = {
+        'id': started.strftime('%Y%m%d-%H%M%S'),
+        'started_at': started,
+        'status': 'running',
+        'portals': {}
+    }
+
+    sources = []
+    for portal in portals:
+        credentials = get_portal_credentials(portal)
+        if credentials:
+            sources.append((portal, credentials))
+        else:
+            log(f"⚠️ {portal}: credenziali non configurate, portale saltato")
+            run['portals'][portal] = {'vehicles': 0, 'error': 'Credenziali mancanti'}
+    firebase_mgr.save_run(run)
+
+    firebase_sink = FirebaseSink(firebase_mgr)
+    pipeline = VehiclePipeline([firebase_sink])
+    errors = {}
+
+    if sources:
+        for kind, portal, payload in ConcurrentRunner(sources, headless=headless, timeout=timeout).run():
+            if kind == 'status':
+                log(payload)
+            elif kind == 'events':
+                # Già registrati da loguru e nel JSONL dal processo del portale
+                continue
+            elif kind == 'batch':
+                pipeline.push(portal, payload)
+                log(f"📦 {portal}: {pipeline.counts[portal]} veicoli salvati")
+            elif kind == 'error':
+                errors[portal] = payload.partition('\n')[0]
+                log(f"❌ {portal}: {payload}")
+            elif kind == 'done':
+                run['portals'][portal] = {
+                    'vehicles': pipeline.counts.get(portal, 0),
+                    'error': errors.get(portal)
+                }
+                log(f"✅ {portal}: {pipeline.counts.get(portal, 0)} veicoli")
+    pipeline.close()
+    log(
+        f"💾 Firebase: {firebase_sink.stats['written']} scritti, {firebase_sink.stats['unchanged']} invariati, "
+        f"{firebase_sink.stats['price_changes']} prezzi cambiati, {firebase_sink.stats['failed']} falliti, "
+        f"{firebase_sink.stats['retries']} retry, {firebase_sink.throughput()} veicoli/s"
+    )
+    if firebase_sink.failed_ids:
+        log(f"⚠️ Veicoli non salvati: {', '.join(firebase_sink.failed_ids[:20])}")
+
+    run.update({
+        'finished_at': datetime.now(),
+        'duration': round((datetime.now() - started).total_seconds(), 1),
+        'status': 'failed' if errors or not sources else 'completed',
+        'vehicles': pipeline.stats['vehicles'],
+        'writes': firebase_sink.stats
+    })
+    firebase_mgr.save_run(run)
+    return run
+
+
+def _handle_stop(signum, frame) -> None:
+    global _stop
+    _stop = True
+    log("Arresto richiesto: il worker termina dopo il run in corso")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Worker di scraping Auto Arbitrage")
+    parser.add_argument('--once', action='store_true', help="Esegue un solo run ed esce")
+    parser.add_argument('--interval', type=float, default=WORKER_SETTINGS['interval_minutes'],
+                        help="Minuti tra due run in modalità daemon")
+    parser.add_argument('--portals', nargs='+', default=WORKER_SETTINGS['portals'],
+                        help=f"Portali da eseguire ({', '.join(portal_names(enabled_only=False))})")
+    parser.add_argument('--timeout', type=float, default=WORKER_SETTINGS['timeout_minutes'],
+                        help="Minuti massimi per portale")
+    parser.add_argument('--show-browser', action='store_true', help="Esegue Chromium con interfaccia")
+    args = parser.parse_args()
+
+    try:
+        portals = [resolve(portal) for portal in args.portals]
+    except KeyError as e:
+        parser.error(str(e.args[0]))
+
+    # Un solo worker alla volta, anche con cron sovrapposti
+    os.makedirs(os.path.dirname(WORKER_SETTINGS['lock_file']) or '.', exist_ok=True)
+    lock = open(WORKER_SETTINGS['lock_file'], 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        log("Un altro worker è già in esecuzione")
+        return 1
+
+    try:
+        FirebaseConfig.initialize_app()
+    except Exception as e:
+        log(f"❌ Errore nell'inizializzazione di Firebase: {str(e)}")
+        return 1
+    firebase_mgr = FirebaseManager()
+
+    signal.signal(signal.SIGTERM, _handle_stop)
+    signal.signal(signal.SIGINT, _handle_stop)
+
+    headless = WORKER_SETTINGS['headless'] and not args.show_browser
+    timeout = args.timeout * 60 if args.timeout else None
+
+    while True:
+        log(f"🚀 Avvio run: {', '.join(portals)}")
+        run = run_once(portals, firebase_mgr, headless, timeout)
+        log(f"Run {run['id']} {run['status']}: {run['vehicles']} veicoli in {run['duration']}s")
+
+        if args.once or _stop:
+            return 0 if run['status'] == 'completed' else 2
+
+        next_run = time.time() + args.interval * 60
+        log(f"Prossimo run alle {datetime.fromtimestamp(next_run).strftime('%H:%M')}")
+        while time.time() < next_run and not _stop:
+            time.sleep(1)
+        if _stop:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())